@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+# Whisper models consume 16 kHz mono float32 samples.
+WHISPER_SAMPLE_RATE = 16_000
+AUDIO_SUFFIXES = {".wav", ".flac", ".ogg", ".mp3", ".m4a"}
+
+
+def to_whisper_input(samples, sample_rate: int):
+    """Downmix and resample ``samples`` to 16 kHz mono float32.
+
+    Audio already in whisper's format is returned without copying. Resampling
+    is band-limited (FFT based) so 44.1/48 kHz input does not alias.
+    """
+    import numpy as np
+
+    samples = np.asarray(samples)
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    if samples.dtype != np.float32:
+        samples = samples.astype(np.float32)
+    if sample_rate == WHISPER_SAMPLE_RATE or samples.size == 0:
+        return samples
+
+    target_len = int(round(samples.size * WHISPER_SAMPLE_RATE / float(sample_rate)))
+    spectrum = np.fft.rfft(samples)
+    bins = target_len // 2 + 1
+    if bins <= spectrum.size:
+        spectrum = spectrum[:bins]
+    else:
+        spectrum = np.pad(spectrum, (0, bins - spectrum.size))
+    resampled = np.fft.irfft(spectrum, n=target_len) * (target_len / float(samples.size))
+    return resampled.astype(np.float32)
+
+
+def load_audio(audio_path: Path, start: int = 0):
+    """Read an audio file into a 16 kHz mono float32 array without ffmpeg.
+
+    ``start`` is a frame offset in the file's native sample rate. Raises
+    ``RuntimeError`` when soundfile is missing or cannot decode the format,
+    so callers can fall back to whisper's ffmpeg loader.
+    """
+    try:
+        import soundfile as sf
+    except Exception as exc:  # pragma: no cover - import guard
+        raise RuntimeError("The 'soundfile' package is not installed.") from exc
+
+    try:
+        samples, sample_rate = sf.read(str(audio_path), start=start, dtype="float32", always_2d=False)
+    except Exception as exc:
+        raise RuntimeError(f"soundfile cannot decode {audio_path}: {exc}") from exc
+    return to_whisper_input(samples, int(sample_rate))
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable
+
+from .audio import AUDIO_SUFFIXES, WHISPER_SAMPLE_RATE, load_audio
+from .transcriber import WORKER_STATE, init_worker, transcribe_audio
+
+
+def default_workers() -> int:
+    # Each worker holds its own model copy and runs several torch threads, so
+    # fewer, fatter workers beat one per core.
+    return max(1, (os.cpu_count() or 1) // 4)
+
+
+def expand_inputs(inputs: list[str]) -> list[Path]:
+    """Resolve files, glob patterns and directories (recursively) to audio files."""
+    paths: list[Path] = []
+    for raw in inputs:
+        candidate = Path(raw).expanduser()
+        if candidate.is_dir():
+            matches = [p for p in sorted(candidate.rglob("*")) if p.suffix.lower() in AUDIO_SUFFIXES]
+        elif glob.has_magic(raw):
+            matches = [Path(p) for p in sorted(glob.glob(os.path.expanduser(raw), recursive=True))]
+            matches = [p for p in matches if p.is_file()]
+        else:
+            matches = [candidate]
+        paths.extend(matches)
+
+    unique: dict[str, Path] = {}
+    for path in paths:
+        unique.setdefault(str(path.resolve()), path.resolve())
+    return list(unique.values())
+
+
+def load_completed(output_path: Path) -> set[str]:
+    """Paths already finished in an earlier (possibly interrupted) run."""
+    if not output_path.exists():
+        return set()
+    completed: set[str] = set()
+    for line in output_path.read_text(encoding="utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if record.get("result") in {"ok", "no_speech"} and record.get("path"):
+            completed.add(record["path"])
+    return completed
+
+
+def _transcribe_one(path: str) -> dict[str, Any]:
+    from .glossary_correction import correct_transcript, glossary_prompt
+    from .vad import trim_silence, vad_enabled
+
+    record: dict[str, Any] = {"path": path, "worker_pid": os.getpid()}
+    start = time.time()
+    try:
+        audio: Any = Path(path)
+        try:
+            samples = load_audio(Path(path))
+        except RuntimeError:
+            samples = None
+        if samples is not None:
+            record["duration_sec"] = round(samples.size / WHISPER_SAMPLE_RATE, 3)
+            audio = samples
+            if vad_enabled():
+                audio, vad_info = trim_silence(samples)
+                if not vad_info["speech"]:
+                    record.update(result="no_speech", text="", vad=vad_info)
+                    return record
+
+        result = transcribe_audio(
+            audio=audio,
+            model_name=WORKER_STATE["model_name"],
+            model_dir=WORKER_STATE["model_dir"],
+            language=WORKER_STATE["language"],
+            cache_dir=WORKER_STATE["cache_dir"],
+            preset=WORKER_STATE["preset"],
+            initial_prompt=glossary_prompt(),
+        )
+        text, corrections = correct_transcript(result["text"])
+        record.update(result="ok", text=text, language=result["language"], latency_ms=result["latency_ms"])
+        if corrections:
+            record["glossary_corrections"] = corrections
+        if "cache_hit" in result:
+            record["cache_hit"] = result["cache_hit"]
+    except Exception as exc:
+        record.update(result="error", error=str(exc))
+    finally:
+        record["wall_ms"] = int((time.time() - start) * 1000)
+    return record
+
+
+def run_batch(
+    paths: list[Path],
+    model_name: str,
+    model_dir: Path,
+    language: str,
+    workers: int,
+    on_result: Callable[[dict[str, Any]], None],
+    cache_dir: Path | None = None,
+    preset: str | None = None,
+) -> dict[str, Any]:
+    """Transcribe ``paths`` on a process pool, reporting each file as it completes.
+
+    Every worker loads the model once in its initializer and splits the
+    machine's cores with the other workers, so torch threads do not
+    oversubscribe the CPU.
+    """
+    workers = max(1, min(workers, len(paths) or 1))
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    counts = {"transcribed": 0, "no_speech": 0, "failed": 0}
+    counter_for = {"ok": "transcribed", "no_speech": "no_speech", "error": "failed"}
+    audio_sec = 0.0
+    start = time.time()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context("spawn"),
+        initializer=init_worker,
+        initargs=(
+            model_name,
+            str(model_dir),
+            language,
+            torch_threads,
+            str(cache_dir) if cache_dir else None,
+            preset,
+        ),
+    ) as pool:
+        futures = [pool.submit(_transcribe_one, str(path)) for path in paths]
+        try:
+            for future in as_completed(futures):
+                record = future.result()
+                counts[counter_for[record["result"]]] += 1
+                audio_sec += float(record.get("duration_sec") or 0.0)
+                on_result(record)
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    wall_sec = time.time() - start
+    return {
+        "files": len(paths),
+        **counts,
+        "preset": preset,
+        "workers": workers,
+        "torch_threads": torch_threads,
+        "wall_ms": int(wall_sec * 1000),
+        "audio_sec": round(audio_sec, 3),
+        "throughput_x": round(audio_sec / wall_sec, 2) if wall_sec > 0 else None,
+    }
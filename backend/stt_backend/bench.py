@@ -0,0 +1,430 @@
+from __future__ import annotations
+
+import json
+import platform
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+from .audio import AUDIO_SUFFIXES, WHISPER_SAMPLE_RATE, load_audio
+from .decode_presets import PRESET_ACCURATE, PRESETS_BY_SPEED, dictation_preset, recommend_preset
+from .engines import DEFAULT_ENGINE, selected_engine_name
+from .model_artifacts import QUANTIZED_MODEL_SUFFIX, split_quantized_name
+
+BENCH_FORMAT_VERSION = 3
+DEFAULT_DURATIONS_SEC = (5.0, 15.0, 30.0)
+DEFAULT_REPEATS = 3
+# A metric is a regression when it is worse than the baseline by this fraction.
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+# Long enough for three chunks under the default long-audio settings.
+LONG_AUDIO_FIXTURE_SEC = 150.0
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def synthetic_fixture(duration_sec: float, seed: int = 0):
+    """Deterministic speech-like signal: voiced harmonics, syllable-rate
+    amplitude modulation and short pauses, with a low noise floor."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    sample_count = int(duration_sec * WHISPER_SAMPLE_RATE)
+    t = np.arange(sample_count, dtype=np.float64) / WHISPER_SAMPLE_RATE
+    pitch = 120.0 + 20.0 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / WHISPER_SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    syllables = 0.5 * (1 + np.sin(2 * np.pi * 4.0 * t))
+    pauses = (np.floor(t / 2.5) % 3 != 2).astype(np.float64)
+    signal = 0.2 * voiced * syllables * pauses + rng.normal(0.0, 0.003, sample_count)
+    return signal.astype(np.float32)
+
+
+def _collect_fixtures(durations: list[float], fixtures_dir: Path | None) -> list[dict[str, Any]]:
+    fixtures = [
+        {"name": f"synthetic_{int(duration)}s", "kind": "synthetic", "audio": synthetic_fixture(duration, seed=index)}
+        for index, duration in enumerate(durations)
+    ]
+    if fixtures_dir is not None:
+        for path in sorted(fixtures_dir.iterdir()):
+            if path.suffix.lower() not in AUDIO_SUFFIXES:
+                continue
+            reference_path = path.with_suffix(".txt")
+            reference = reference_path.read_text(encoding="utf-8").strip() if reference_path.exists() else None
+            fixtures.append({"name": path.name, "kind": "speech", "audio": load_audio(path), "reference": reference})
+    for fixture in fixtures:
+        fixture["duration_sec"] = round(len(fixture["audio"]) / WHISPER_SAMPLE_RATE, 3)
+    return fixtures
+
+
+def _cold_load_probe(engine_name: str, model_name: str, model_dir: str) -> dict[str, Any]:
+    """Runs in a fresh process so import cost and peak RSS are not shared."""
+    import importlib
+
+    from .engines import get_engine
+    from .transcriber import ensure_model_available
+
+    start = time.time()
+    importlib.import_module(get_engine(engine_name).module_name)
+    imported = time.time()
+    ensure_model_available(model_name=model_name, model_dir=Path(model_dir), engine=engine_name)
+    loaded = time.time()
+    return {
+        "import_ms": int((imported - start) * 1000),
+        "load_ms": int((loaded - imported) * 1000),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def measure_cold_load(engine_name: str, model_name: str, model_dir: Path) -> dict[str, Any]:
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(_cold_load_probe, engine_name, model_name, str(model_dir)).result()
+
+
+def measure_refine_latency(transcript: str, repeats: int) -> dict[str, Any]:
+    """Time the refine pipeline with ``query_llm`` stubbed out.
+
+    This isolates our own overhead (prompt building, glossary, bookkeeping)
+    from provider latency, which is not reproducible.
+    """
+    from . import smart_workflow
+    from .prompt_templates import PROMPT_TEMPLATES
+
+    original = smart_workflow.query_llm
+    smart_workflow.query_llm = lambda user_query, *args, **kwargs: transcript
+    try:
+        timings: dict[str, float] = {}
+        for mode in PROMPT_TEMPLATES:
+            samples = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                smart_workflow.refine_transcript(transcript=transcript, mode=mode, smart_refine_enabled=True)
+                samples.append((time.perf_counter() - start) * 1000)
+            timings[mode] = round(statistics.median(samples), 3)
+    finally:
+        smart_workflow.query_llm = original
+    return timings
+
+
+def _run_inference(
+    fixture: dict[str, Any],
+    engine_name: str,
+    model_name: str,
+    model_dir: Path,
+    language: str,
+    repeats: int,
+    preset: str,
+) -> dict[str, Any]:
+    from .engines import check_conformance
+    from .transcriber import transcribe_audio
+
+    latencies = []
+    result: dict[str, Any] = {}
+    for _ in range(repeats):
+        result = transcribe_audio(
+            audio=fixture["audio"],
+            model_name=model_name,
+            model_dir=model_dir,
+            language=language,
+            engine=engine_name,
+            preset=preset,
+        )
+        latencies.append(result["latency_ms"])
+    warm_ms = statistics.median(latencies)
+    row = {
+        "fixture": fixture["name"],
+        "kind": fixture["kind"],
+        "duration_sec": fixture["duration_sec"],
+        "engine": engine_name,
+        "model": model_name,
+        "language": language,
+        "preset": preset,
+        "warm_ms": warm_ms,
+        "warm_ms_min": min(latencies),
+        "rtf": round(warm_ms / 1000.0 / max(fixture["duration_sec"], 1e-6), 4),
+        "text": result.get("text", ""),
+        "conformance": check_conformance(result),
+    }
+    if fixture.get("reference") is not None:
+        row["wer"] = round(word_error_rate(fixture["reference"], row["text"]), 4)
+    return row
+
+
+def measure_long_audio(
+    model_name: str, model_dir: Path, language: str, preset: str, duration_sec: float = LONG_AUDIO_FIXTURE_SEC
+) -> dict[str, Any]:
+    """Chunked long-audio decoding against a single pass over the same clip.
+
+    Both run warm (model loaded, chunk pool started), so ``speedup`` is the
+    gain a dictation user sees from chunking, not summed chunk latencies.
+    """
+    from .engines import selected_engine_name
+    from .glossary_correction import glossary_prompt
+    from .long_audio import transcribe_long_audio, warm_chunk_pool
+    from .transcriber import transcribe_audio
+
+    audio = synthetic_fixture(duration_sec, seed=len(DEFAULT_DURATIONS_SEC))
+    single = transcribe_audio(
+        audio=audio,
+        model_name=model_name,
+        model_dir=model_dir,
+        language=language,
+        preset=preset,
+        initial_prompt=glossary_prompt(),
+    )
+    warm_chunk_pool(model_name, model_dir)
+    start = time.perf_counter()
+    chunked = transcribe_long_audio(audio, model_name=model_name, model_dir=model_dir, language=language, preset=preset)
+    chunked_ms = int((time.perf_counter() - start) * 1000)
+    return {
+        "engine": selected_engine_name(),
+        "model": model_name,
+        "language": language,
+        "preset": preset,
+        "audio_sec": duration_sec,
+        "chunks": chunked["long_audio"]["chunks"],
+        "workers": chunked["long_audio"]["workers"],
+        "single_pass_ms": single["latency_ms"],
+        "chunked_ms": chunked_ms,
+        "speedup": round(single["latency_ms"] / max(chunked_ms, 1), 2),
+        "agreement_wer": round(word_error_rate(single["text"], chunked["text"]), 4),
+    }
+
+
+def _row_key(row: dict[str, Any]) -> tuple[str, str, str, str, str]:
+    return (row.get("engine", DEFAULT_ENGINE), row["model"], row["language"], row.get("preset", ""), row["fixture"])
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def _environment() -> dict[str, Any]:
+    info: dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+    try:
+        import torch
+
+        info["torch"] = torch.__version__
+        info["torch_threads"] = torch.get_num_threads()
+    except Exception:
+        pass
+    return info
+
+
+def check_baseline_version(baseline: dict[str, Any]) -> None:
+    """Raise ValueError unless ``baseline`` uses this format, since rows of
+    another format would silently match nothing."""
+    version = baseline.get("format_version")
+    if version != BENCH_FORMAT_VERSION:
+        raise ValueError(
+            f"Baseline format_version {version!r} does not match {BENCH_FORMAT_VERSION}; "
+            "re-run bench to record a new one."
+        )
+
+
+def compare_with_baseline(report: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[dict[str, Any]]:
+    """List metrics that got worse than ``baseline`` by more than ``threshold``."""
+    check_baseline_version(baseline)
+    regressions: list[dict[str, Any]] = []
+
+    def _check(scope: str, metric: str, current: float | None, previous: float | None) -> None:
+        if current is None or not previous:
+            return
+        change = (current - previous) / previous
+        if change > threshold:
+            regressions.append(
+                {"scope": scope, "metric": metric, "baseline": previous, "current": current, "change": round(change, 4)}
+            )
+
+    for scope, load in report.get("cold_load", {}).items():
+        previous = baseline.get("cold_load", {}).get(scope, {})
+        for metric in ("load_ms", "peak_rss_mb"):
+            _check(scope, metric, load.get(metric), previous.get(metric))
+
+    previous_rows = {_row_key(row): row for row in baseline.get("inference", [])}
+    for row in report.get("inference", []):
+        previous = previous_rows.get(_row_key(row))
+        if previous:
+            scope = "/".join(_row_key(row))
+            _check(scope, "rtf", row.get("rtf"), previous.get("rtf"))
+    return regressions
+
+
+def compare_int8(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Pair each ``<model>-int8`` row with its float row: speedup and accuracy.
+
+    ``agreement_wer`` is the int8 transcript scored against the float one, so
+    it is meaningful even for fixtures without a reference transcript.
+    """
+    by_key = {_row_key(row): row for row in rows}
+    comparison: list[dict[str, Any]] = []
+    for (engine_name, model, language, preset, fixture), row in by_key.items():
+        base_name, quantized = split_quantized_name(model)
+        float_row = by_key.get((engine_name, base_name, language, preset, fixture))
+        if not quantized or float_row is None:
+            continue
+        entry = {
+            "engine": engine_name,
+            "model": base_name,
+            "language": language,
+            "preset": preset,
+            "fixture": fixture,
+            "float_rtf": float_row["rtf"],
+            "int8_rtf": row["rtf"],
+            "speedup": round(float_row["warm_ms"] / max(row["warm_ms"], 1e-6), 3),
+            "agreement_wer": round(word_error_rate(float_row["text"], row["text"]), 4),
+        }
+        if "wer" in row and "wer" in float_row:
+            entry["float_wer"] = float_row["wer"]
+            entry["int8_wer"] = row["wer"]
+        comparison.append(entry)
+    return comparison
+
+
+def compare_presets(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Per (engine, model, language): each preset's mean RTF and error.
+
+    The error is the WER against reference transcripts when every fixture has
+    one, else the agreement WER against the ``accurate`` preset's transcript.
+    ``recommended_preset`` is the fastest preset within ``PRESET_ERROR_MARGIN``.
+    """
+    groups: dict[tuple[str, str, str], dict[str, list[dict[str, Any]]]] = {}
+    for row in rows:
+        group = groups.setdefault((row["engine"], row["model"], row["language"]), {})
+        group.setdefault(row["preset"], []).append(row)
+
+    comparison: list[dict[str, Any]] = []
+    for (engine_name, model, language), by_preset in groups.items():
+        accurate = {row["fixture"]: row for row in by_preset.get(PRESET_ACCURATE, [])}
+        if not accurate or len(by_preset) < 2:
+            continue
+        with_reference = all("wer" in row for preset_rows in by_preset.values() for row in preset_rows)
+        presets: dict[str, dict[str, Any]] = {}
+        for preset in PRESETS_BY_SPEED:
+            preset_rows = by_preset.get(preset)
+            if not preset_rows:
+                continue
+            if with_reference:
+                errors = [row["wer"] for row in preset_rows]
+            else:
+                errors = [
+                    word_error_rate(accurate[row["fixture"]]["text"], row["text"])
+                    for row in preset_rows
+                    if row["fixture"] in accurate
+                ]
+            presets[preset] = {
+                "rtf": round(statistics.mean(row["rtf"] for row in preset_rows), 4),
+                "error": round(statistics.mean(errors), 4) if errors else 0.0,
+            }
+        comparison.append(
+            {
+                "engine": engine_name,
+                "model": model,
+                "language": language,
+                "error_metric": "wer" if with_reference else "agreement_wer",
+                "presets": presets,
+                "recommended_preset": recommend_preset({name: entry["error"] for name, entry in presets.items()}),
+            }
+        )
+    return comparison
+
+
+def run_bench(
+    models: list[str],
+    languages: list[str],
+    model_dir: Path,
+    durations: list[float] | None = None,
+    fixtures_dir: Path | None = None,
+    repeats: int = DEFAULT_REPEATS,
+    skip_cold: bool = False,
+    with_int8: bool = False,
+    engines: list[str] | None = None,
+    presets: list[str] | None = None,
+    with_long_audio: bool = False,
+) -> dict[str, Any]:
+    """Run every (engine, model, language, preset, fixture) combination.
+
+    Each inference row also records engine conformance problems, so one run
+    doubles as the shared harness for comparing installed engines. ``presets``
+    defaults to the dictation preset alone. ``with_long_audio`` adds
+    ``long_audio_comparison`` for the selected engine (chunk workers always
+    run it).
+    """
+    presets = presets or [dictation_preset()]
+    fixtures = _collect_fixtures(list(durations or DEFAULT_DURATIONS_SEC), fixtures_dir)
+    report: dict[str, Any] = {
+        "format_version": BENCH_FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": _environment(),
+        "fixtures": [{"name": f["name"], "kind": f["kind"], "duration_sec": f["duration_sec"]} for f in fixtures],
+        "cold_load": {},
+        "inference": [],
+    }
+
+    if with_int8:
+        models = models + [
+            f"{model}{QUANTIZED_MODEL_SUFFIX}" for model in models if not split_quantized_name(model)[1]
+        ]
+    for engine_name in engines or [selected_engine_name()]:
+        for model_name in models:
+            if not skip_cold:
+                report["cold_load"][f"{engine_name}/{model_name}"] = measure_cold_load(
+                    engine_name, model_name, model_dir
+                )
+            for language in languages:
+                for preset in presets:
+                    for fixture in fixtures:
+                        report["inference"].append(
+                            _run_inference(fixture, engine_name, model_name, model_dir, language, repeats, preset)
+                        )
+    report["conformance"] = {
+        "/".join(_row_key(row)): row["conformance"] for row in report["inference"] if row["conformance"]
+    }
+
+    if with_int8:
+        report["int8_comparison"] = compare_int8(report["inference"])
+    if PRESET_ACCURATE in presets and len(presets) > 1:
+        report["preset_comparison"] = compare_presets(report["inference"])
+    if with_long_audio:
+        report["long_audio_comparison"] = [
+            measure_long_audio(model_name, model_dir, language, presets[0])
+            for model_name in models
+            for language in languages
+        ]
+
+    sample_transcript = next((row["text"] for row in report["inference"] if row.get("text")), "benchmark transcript")
+    report["refine_ms"] = measure_refine_latency(sample_transcript, repeats=max(repeats, 5))
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def write_report(report: dict[str, Any], output_path: Path) -> None:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
@@ -1,17 +1,54 @@
 from __future__ import annotations
 
 import argparse
+import json
+import os
+import sys
+import time
 import traceback
 from pathlib import Path
 
-from .config import DEFAULT_LANGUAGE, DEFAULT_MODEL, DEFAULT_SAMPLE_RATE, default_config
-from .json_io import emit
+from .audio import load_audio
+from .batch import default_workers, expand_inputs, load_completed, run_batch
+from .bench import (
+    DEFAULT_DURATIONS_SEC,
+    DEFAULT_REGRESSION_THRESHOLD,
+    DEFAULT_REPEATS,
+    check_baseline_version,
+    compare_with_baseline,
+    run_bench,
+    write_report,
+)
+from .config import DEFAULT_SAMPLE_RATE, default_config, default_language, default_model
+from .daemon import DAEMON_COMMANDS, forward_to_daemon, serve
+from .decode_presets import DEFAULT_BATCH_PRESET, PRESETS, dictation_preset, save_recommendations
+from .engines import ENGINES, installed_engines, selected_engine_name
+from .glossary_correction import correct_transcript, glossary_prompt
+from .json_io import emit, emit_event
+from .language_prior import (
+    DETECTED_SOURCES,
+    dominant_language,
+    is_low_confidence,
+    language_prior_enabled,
+    record_language,
+    redetection_pointless,
+)
 from .logging_utils import get_logger
+from .long_audio import long_audio_threshold_sec, transcribe_long_audio, use_long_audio
+from .model_artifacts import compile_model, compiled_artifact_is_fresh, split_quantized_name
 from .prompt_templates import SMART_MODES, SMART_MODE_NORMAL
-from .recorder import capture_loop, start_recording, stop_recording
+from .recorder import capture_loop, ensure_standby, start_recording, stop_recording
+from .retention import run_retention, spawn_retention
 from .smart_workflow import refine_transcript
-from .transcriber import ensure_model_available, model_is_available_locally, transcribe_file
+from .streaming import finish_streaming_transcription
+from .tracing import StageTimer, append_history, latency_stats, load_history
+from .transcriber import ensure_model_available, model_is_available_locally, transcribe_audio
 from .user_llm_bridge import activate_codex, codex_status
+from .vad import trim_silence, vad_enabled
+
+
+def _env_flag(name: str) -> str:
+    return "true" if (os.getenv(name, "") or "").strip().lower() in {"1", "true", "yes"} else "false"
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -25,36 +62,101 @@ def _build_parser() -> argparse.ArgumentParser:
     record_parser.add_argument("--sample-rate", type=int, default=DEFAULT_SAMPLE_RATE)
     record_parser.add_argument("--channels", type=int, default=1)
     record_parser.add_argument("--state-dir", type=Path)
-    record_parser.add_argument("--model", default=DEFAULT_MODEL)
-    record_parser.add_argument("--language", default=DEFAULT_LANGUAGE)
+    record_parser.add_argument("--model", help="default: $WHISPER_MODEL or small")
+    record_parser.add_argument("--language", help="default: $WHISPER_LANGUAGE or auto")
+    record_parser.add_argument("--preset", choices=PRESETS, help="default: dictation preset (see bench --all-presets)")
     record_parser.add_argument("--smart-mode", default=SMART_MODE_NORMAL, choices=SMART_MODES)
     record_parser.add_argument("--smart-refine-enabled", default="false", choices=["true", "false"])
+    record_parser.add_argument("--streaming", default=_env_flag("WHISPER_CLIP_STREAMING"), choices=["true", "false"])
+    record_parser.add_argument(
+        "--progress-events", default=_env_flag("WHISPER_CLIP_PROGRESS_EVENTS"), choices=["true", "false"]
+    )
 
     toggle_parser = subparsers.add_parser("run", help="toggle recording state")
     toggle_parser.add_argument("--mode", default="toggle", choices=["toggle"])
     toggle_parser.add_argument("--sample-rate", type=int, default=DEFAULT_SAMPLE_RATE)
     toggle_parser.add_argument("--channels", type=int, default=1)
     toggle_parser.add_argument("--state-dir", type=Path)
-    toggle_parser.add_argument("--model", default=DEFAULT_MODEL)
-    toggle_parser.add_argument("--language", default=DEFAULT_LANGUAGE)
+    toggle_parser.add_argument("--model", help="default: $WHISPER_MODEL or small")
+    toggle_parser.add_argument("--language", help="default: $WHISPER_LANGUAGE or auto")
+    toggle_parser.add_argument("--preset", choices=PRESETS, help="default: dictation preset (see bench --all-presets)")
     toggle_parser.add_argument("--smart-mode", default=SMART_MODE_NORMAL, choices=SMART_MODES)
     toggle_parser.add_argument("--smart-refine-enabled", default="false", choices=["true", "false"])
+    toggle_parser.add_argument("--streaming", default=_env_flag("WHISPER_CLIP_STREAMING"), choices=["true", "false"])
+    toggle_parser.add_argument(
+        "--progress-events", default=_env_flag("WHISPER_CLIP_PROGRESS_EVENTS"), choices=["true", "false"]
+    )
 
     model_parser = subparsers.add_parser("model", help="model cache status/download")
     model_mode = model_parser.add_mutually_exclusive_group(required=True)
     model_mode.add_argument("--status", action="store_true")
     model_mode.add_argument("--ensure", action="store_true")
-    model_parser.add_argument("--model", default=DEFAULT_MODEL)
+    model_mode.add_argument("--compile", action="store_true", help="build a memory-mapped load artifact")
+    model_parser.add_argument("--model", help="default: $WHISPER_MODEL or small")
 
     capture_parser = subparsers.add_parser("_capture", help=argparse.SUPPRESS)
-    capture_parser.add_argument("--audio-path", type=Path, required=True)
+    capture_parser.add_argument("--audio-path", type=Path)
+    capture_parser.add_argument("--standby", action="store_true")
     capture_parser.add_argument("--sample-rate", type=int, default=DEFAULT_SAMPLE_RATE)
     capture_parser.add_argument("--channels", type=int, default=1)
+    capture_parser.add_argument("--control-socket", type=Path)
+    capture_parser.add_argument("--stream-model")
+    capture_parser.add_argument("--stream-model-dir", type=Path)
+    capture_parser.add_argument("--language", default="auto")
+    capture_parser.add_argument("--preset", choices=PRESETS)
+
+    retention_parser = subparsers.add_parser("_retention", help=argparse.SUPPRESS)
+    retention_parser.add_argument("--state-dir", type=Path)
+    retention_parser.add_argument("--keep", type=Path, action="append", default=[])
 
     llm_parser = subparsers.add_parser("llm", help="LLM backend setup and status")
     llm_mode = llm_parser.add_mutually_exclusive_group(required=True)
     llm_mode.add_argument("--codex-status", action="store_true")
     llm_mode.add_argument("--codex-login", action="store_true")
+    llm_parser.add_argument("--refresh", action="store_true", help="ignore the cached Codex auth status")
+
+    serve_parser = subparsers.add_parser("serve", help="run a warm-model backend daemon")
+    serve_parser.add_argument("--socket-path", type=Path)
+    serve_parser.add_argument("--preload-model", action="append", default=[])
+    serve_parser.add_argument("--state-dir", type=Path)
+    serve_parser.add_argument("--sample-rate", type=int, default=DEFAULT_SAMPLE_RATE)
+    serve_parser.add_argument("--channels", type=int, default=1)
+
+    stats_parser = subparsers.add_parser("stats", help="latency percentiles from the request history")
+    stats_parser.add_argument("--state-dir", type=Path)
+    stats_parser.add_argument("--limit", type=int, help="only use the most recent N requests")
+
+    transcribe_parser = subparsers.add_parser("transcribe", help="batch-transcribe audio files")
+    transcribe_parser.add_argument("inputs", nargs="+", help="audio files, glob patterns or directories")
+    transcribe_parser.add_argument("--model", help="default: $WHISPER_MODEL or small")
+    transcribe_parser.add_argument("--language", help="default: $WHISPER_LANGUAGE or auto")
+    transcribe_parser.add_argument("--preset", default=DEFAULT_BATCH_PRESET, choices=PRESETS)
+    transcribe_parser.add_argument("--workers", type=int, default=default_workers())
+    transcribe_parser.add_argument("--output", type=Path, help="JSONL results file; re-running resumes from it")
+
+    bench_parser = subparsers.add_parser("bench", help="run the performance benchmark suite")
+    bench_parser.add_argument("--model", action="append", dest="models")
+    bench_parser.add_argument("--language", action="append", dest="languages")
+    bench_parser.add_argument("--durations", default=",".join(f"{d:g}" for d in DEFAULT_DURATIONS_SEC))
+    bench_parser.add_argument("--fixtures-dir", type=Path, help="speech fixtures (audio + optional .txt reference)")
+    bench_parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    bench_parser.add_argument("--skip-cold", action="store_true", help="skip the cold-load subprocess probe")
+    bench_parser.add_argument("--compare-int8", action="store_true", help="also bench each model's int8 variant")
+    bench_parser.add_argument(
+        "--long-audio", action="store_true", help="also time chunked long-audio decoding against a single pass"
+    )
+    bench_engines = bench_parser.add_mutually_exclusive_group()
+    bench_engines.add_argument("--engine", action="append", dest="engines", choices=sorted(ENGINES))
+    bench_engines.add_argument("--all-engines", action="store_true", help="bench every installed engine")
+    bench_presets = bench_parser.add_mutually_exclusive_group()
+    bench_presets.add_argument("--preset", action="append", dest="presets", choices=PRESETS)
+    bench_presets.add_argument(
+        "--all-presets", action="store_true", help="bench every decode preset and recommend one for dictation"
+    )
+    bench_parser.add_argument("--state-dir", type=Path)
+    bench_parser.add_argument("--output", type=Path)
+    bench_parser.add_argument("--baseline", type=Path, help="earlier bench JSON to check for regressions")
+    bench_parser.add_argument("--regression-threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
 
     return parser
 
@@ -69,35 +171,222 @@ def _state_dir(cli_path: Path | None) -> Path:
     return cli_path or cfg.state_dir
 
 
+def _resolve_dictation_preset(args, state_dir: Path, model: str) -> str:
+    return args.preset or dictation_preset(state_dir, model, selected_engine_name())
+
+
 def _to_bool(value: str) -> bool:
     return (value or "").strip().lower() == "true"
 
 
+def _transcribe_recording(
+    audio_path: Path,
+    model: str,
+    model_dir: Path,
+    language: str,
+    timer: StageTimer,
+    state_dir: Path | None = None,
+    preset: str | None = None,
+    on_segment=None,
+) -> dict:
+    """Decode, trim and transcribe one recording.
+
+    With ``language == "auto"`` and a strong per-user language history in
+    ``state_dir``, the usual language is used directly (no detection pass);
+    if that decode comes out low-confidence it is redone with detection.
+    Recordings longer than ``long_audio_threshold_sec()`` are decoded as
+    parallel chunks. ``on_segment`` receives each decoded segment as it is
+    produced.
+    """
+    audio: object = audio_path
+    vad_info = None
+    if vad_enabled():
+        try:
+            with timer.span("decode"):
+                samples = load_audio(audio_path)
+        except RuntimeError:
+            samples = None
+        if samples is not None:
+            with timer.span("vad"):
+                audio, vad_info = trim_silence(samples)
+            if not vad_info["speech"]:
+                return {"no_speech": True, "vad": vad_info}
+
+    threshold_sec = long_audio_threshold_sec()
+    if threshold_sec > 0 and isinstance(audio, Path):
+        try:
+            with timer.span("decode"):
+                audio = load_audio(audio_path)
+        except RuntimeError:
+            pass
+    long_audio = not isinstance(audio, Path) and use_long_audio(audio.size, model, model_dir)
+
+    def run(run_language: str) -> dict:
+        if long_audio:
+            with timer.span("long_audio"):
+                return transcribe_long_audio(
+                    audio,
+                    model_name=model,
+                    model_dir=model_dir,
+                    language=run_language,
+                    preset=preset,
+                    on_segment=on_segment,
+                    cache_dir=state_dir,
+                )
+        run_result = transcribe_audio(
+            audio=audio,
+            model_name=model,
+            model_dir=model_dir,
+            language=run_language,
+            cache_dir=state_dir,
+            preset=preset,
+            on_segment=on_segment,
+            initial_prompt=glossary_prompt(),
+        )
+        if run_result["decoder"] != "array":
+            timer.add("decode", run_result["decode_ms"])
+        if run_result.get("cache_hit"):
+            timer.add("transcript_cache", run_result["latency_ms"])
+        else:
+            timer.add("model_load", run_result["load_ms"])
+            timer.add("inference", run_result["latency_ms"])
+        return run_result
+
+    use_prior = language == "auto" and state_dir is not None and language_prior_enabled()
+    prior = dominant_language(state_dir) if use_prior else None
+    if language != "auto":
+        result, source = run(language), "requested"
+    elif prior is not None:
+        result, source = run(prior), "prior"
+        # A long recording is not worth decoding twice.
+        if not long_audio and is_low_confidence(result["segments"]) and not redetection_pointless(state_dir, prior):
+            first_latency_ms = result["latency_ms"]
+            if on_segment is not None:
+                # Partials already sent came from the discarded decode.
+                emit_event("partial_reset", reason="redetected")
+            result, source = run("auto"), "redetected"
+            result["latency_ms"] += first_latency_ms
+    else:
+        result, source = run("auto"), "detected"
+
+    result["language_source"] = source
+    if use_prior and source in DETECTED_SOURCES and not result.get("cache_hit"):
+        record_language(state_dir, result["language"], result.get("language_probability"), source)
+    if vad_info is not None:
+        result["vad"] = vad_info
+    return result
+
+
+def _record_latency(state_dir: Path, timer: StageTimer, model: str, mode: str, status: str, logger) -> dict[str, int]:
+    spans = timer.as_dict()
+    try:
+        append_history(
+            state_dir,
+            {"ts": round(time.time(), 3), "model": model, "mode": mode, "status": status, "spans": spans},
+        )
+    except OSError as exc:
+        logger.warning("Could not append latency history: %s", exc)
+    return spans
+
+
 def _handle_stop(args, logger):
     cfg = default_config()
     state_dir = _state_dir(args.state_dir)
-    stop_result = stop_recording(state_dir)
+    timer = StageTimer()
+    started = time.perf_counter()
+    progress_events = _to_bool(args.progress_events)
+    partials = {"count": 0, "first_ms": None}
+    on_segment = None
+    if progress_events:
+
+        def on_segment(segment: dict) -> None:
+            elapsed_ms = int((time.perf_counter() - started) * 1000)
+            if partials["first_ms"] is None:
+                partials["first_ms"] = elapsed_ms
+            partials["count"] += 1
+            emit_event(
+                "partial",
+                index=segment.get("id", partials["count"] - 1),
+                start=round(float(segment["start"]), 3),
+                end=round(float(segment["end"]), 3),
+                text=str(segment.get("text") or "").strip(),
+                elapsed_ms=elapsed_ms,
+            )
+
+    with timer.span("stop_recording"):
+        stop_result = stop_recording(state_dir)
     if stop_result.get("status") != "ok":
         emit(stop_result)
         return 1
 
     model = stop_result.get("model") or args.model
     language = _normalize_language(stop_result.get("language") or args.language)
+    preset = stop_result.get("preset") or _resolve_dictation_preset(args, state_dir, model)
     audio_path = Path(stop_result["audio_path"])
-
-    text, latency_ms, model_downloaded = transcribe_file(
-        audio_path=audio_path,
-        model_name=model,
-        model_dir=cfg.model_dir,
-        language=language,
-    )
     smart_mode = args.smart_mode or SMART_MODE_NORMAL
+
+    if stop_result.get("streaming"):
+        with timer.span("model_load"):
+            model_downloaded = ensure_model_available(model_name=model, model_dir=cfg.model_dir)
+        with timer.span("stream_tail"):
+            result = finish_streaming_transcription(
+                audio_path=audio_path,
+                model_name=model,
+                model_dir=cfg.model_dir,
+                language=language,
+                preset=preset,
+                on_segment=on_segment,
+            )
+        result["model_downloaded"] = model_downloaded
+    else:
+        result = _transcribe_recording(
+            audio_path=audio_path,
+            model=model,
+            model_dir=cfg.model_dir,
+            language=language,
+            timer=timer,
+            state_dir=state_dir,
+            preset=preset,
+            on_segment=on_segment,
+        )
+
+    if result.get("no_speech"):
+        timings = _record_latency(state_dir, timer, model, smart_mode, "no_speech", logger)
+        emit(
+            {
+                "status": "no_speech",
+                "text": "",
+                "audio_path": str(audio_path),
+                "model": model,
+                "language": language,
+                "preset": preset,
+                "vad": result["vad"],
+                "timings_ms": timings,
+            }
+        )
+        logger.info("Skipped transcription audio_path=%s reason=no_speech vad=%s", audio_path, result["vad"])
+        _start_retention(state_dir, audio_path, logger)
+        return 0
+
+    with timer.span("glossary"):
+        text, corrections = correct_transcript(result["text"])
+    latency_ms = result["latency_ms"]
+    model_downloaded = result["model_downloaded"]
     smart_refine_enabled = _to_bool(args.smart_refine_enabled)
-    refined_text, refined = refine_transcript(
-        transcript=text,
-        mode=smart_mode,
-        smart_refine_enabled=smart_refine_enabled,
-    )
+    on_delta = None
+    if progress_events:
+
+        def on_delta(delta: str) -> None:
+            emit_event("refine_delta", delta=delta)
+
+    with timer.span("refine"):
+        refined_text, refined, refine_info = refine_transcript(
+            transcript=text,
+            mode=smart_mode,
+            smart_refine_enabled=smart_refine_enabled,
+            state_dir=state_dir,
+            on_delta=on_delta,
+        )
     payload = {
         "status": "ok",
         "text": refined_text,
@@ -105,33 +394,237 @@ def _handle_stop(args, logger):
         "audio_path": str(audio_path),
         "model": model,
         "language": language,
+        "preset": preset,
         "model_downloaded": model_downloaded,
         "workflow_mode": smart_mode,
         "refined": refined,
+        **refine_info,
     }
+    if stop_result.get("streaming"):
+        payload["streaming"] = True
+        payload["streamed_windows"] = result["streamed_windows"]
+        payload["tail_sec"] = result["tail_sec"]
+    if "vad" in result:
+        payload["vad"] = result["vad"]
+    if corrections:
+        payload["glossary_corrections"] = corrections
+    if "long_audio" in result:
+        payload["long_audio"] = result["long_audio"]
+    if progress_events:
+        payload["partial_events"] = partials["count"]
+        payload["first_partial_ms"] = partials["first_ms"]
+    if stop_result.get("capture"):
+        payload["capture"] = stop_result["capture"]
+    if "cache_hit" in result:
+        payload["transcript_cache_hit"] = result["cache_hit"]
+    if "language_source" in result:
+        payload["language_source"] = result["language_source"]
+        if result["language_source"] in DETECTED_SOURCES:
+            payload["detected_language"] = result["language"]
+    payload["timings_ms"] = _record_latency(state_dir, timer, model, smart_mode, "ok", logger)
     emit(payload)
     logger.info(
-        "Transcribed audio_path=%s latency_ms=%s smart_mode=%s refined=%s",
+        "Transcribed audio_path=%s latency_ms=%s preset=%s smart_mode=%s refined=%s refine_skipped=%s timings_ms=%s",
         audio_path,
         latency_ms,
+        preset,
         smart_mode,
         refined,
+        refine_info.get("refine_skipped"),
+        payload["timings_ms"],
     )
+    _start_retention(state_dir, audio_path, logger)
     return 0
 
 
-def main(argv: list[str] | None = None) -> int:
-    parser = _build_parser()
-    args = parser.parse_args(argv)
+def _start_retention(state_dir: Path, audio_path: Path, logger) -> None:
+    # After the payload is out, so pruning old recordings never delays a paste.
+    # The recording just returned as ``audio_path`` is kept as it is.
+    try:
+        spawn_retention(state_dir, keep=audio_path)
+    except OSError as exc:
+        logger.warning("Could not start recording retention: %s", exc)
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    args = _build_parser().parse_args(argv)
+    # Defaults that follow the environment are resolved per request.
+    if getattr(args, "model", "") is None:
+        args.model = default_model()
+    if getattr(args, "language", "") is None:
+        args.language = default_language()
+    return args
+
+
+def _run_in_process(argv: list[str]) -> int:
+    """Execute one CLI request in this process (used by the daemon)."""
+    try:
+        args = _parse_args(argv)
+    except SystemExit as exc:
+        emit({"status": "error", "error": "invalid_arguments", "details": " ".join(argv)})
+        return int(exc.code or 1)
     cfg = default_config()
-    logger = get_logger(cfg.log_path)
+    return _dispatch(args, cfg, get_logger(cfg.log_path))
+
+
+def _handle_bench(args, cfg, logger) -> int:
+    state_dir = _state_dir(args.state_dir)
+    durations = [float(value) for value in args.durations.split(",") if value.strip()]
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        try:
+            check_baseline_version(baseline)
+        except ValueError as exc:
+            emit({"status": "error", "error": "baseline_version_mismatch", "detail": str(exc)})
+            return 1
+    report = run_bench(
+        models=args.models or [default_model()],
+        languages=[_normalize_language(language) for language in (args.languages or [default_language()])],
+        model_dir=cfg.model_dir,
+        durations=durations,
+        fixtures_dir=args.fixtures_dir,
+        repeats=max(1, args.repeats),
+        skip_cold=args.skip_cold,
+        with_int8=args.compare_int8,
+        engines=installed_engines() if args.all_engines else args.engines,
+        presets=list(PRESETS) if args.all_presets else args.presets,
+        with_long_audio=args.long_audio,
+    )
+    if baseline is not None:
+        report["baseline"] = str(args.baseline)
+        report["regressions"] = compare_with_baseline(report, baseline, args.regression_threshold)
+
+    if report.get("preset_comparison"):
+        report["saved_recommendations"] = save_recommendations(state_dir, report["preset_comparison"])
+
+    output_path = args.output or state_dir / "bench" / f"bench_{int(time.time())}.json"
+    write_report(report, output_path)
+    regressions = report.get("regressions", [])
+    failed = bool(regressions or report["conformance"])
+    emit(
+        {
+            "status": "ok" if not failed else ("regression" if regressions else "nonconformant"),
+            "output_path": str(output_path),
+            "cold_load": report["cold_load"],
+            "inference": [
+                {key: row[key] for key in ("engine", "model", "language", "preset", "fixture", "warm_ms", "rtf")}
+                for row in report["inference"]
+            ],
+            "conformance": report["conformance"],
+            "refine_ms": report["refine_ms"],
+            **({"int8_comparison": report["int8_comparison"]} if "int8_comparison" in report else {}),
+            **({"preset_comparison": report["preset_comparison"]} if "preset_comparison" in report else {}),
+            **({"long_audio_comparison": report["long_audio_comparison"]} if "long_audio_comparison" in report else {}),
+            **({"saved_recommendations": report["saved_recommendations"]} if "saved_recommendations" in report else {}),
+            "peak_rss_mb": report["peak_rss_mb"],
+            "regressions": regressions,
+        }
+    )
+    logger.info(
+        "Benchmark written output_path=%s regressions=%s nonconformant=%s",
+        output_path,
+        len(regressions),
+        len(report["conformance"]),
+    )
+    return 0 if not failed else 1
+
+
+def _handle_transcribe(args, cfg, logger) -> int:
+    paths = expand_inputs(args.inputs)
+    missing = [str(path) for path in paths if not path.is_file()]
+    if missing:
+        emit({"status": "error", "error": "input_not_found", "paths": missing})
+        return 1
+
+    completed = load_completed(args.output) if args.output else set()
+    pending = [path for path in paths if str(path) not in completed]
+    output = None
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        output = args.output.open("a", encoding="utf-8")
+
+    def on_result(record: dict) -> None:
+        emit_event("file", **record)
+        if output is not None:
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
 
+    summary: dict = {"files": 0}
     try:
+        if pending:
+            summary = run_batch(
+                paths=pending,
+                model_name=args.model,
+                model_dir=cfg.model_dir,
+                language=_normalize_language(args.language),
+                workers=args.workers,
+                on_result=on_result,
+                cache_dir=cfg.state_dir,
+                preset=args.preset,
+            )
+    finally:
+        if output is not None:
+            output.close()
+
+    summary["resumed_skipped"] = len(paths) - len(pending)
+    failed = summary.get("failed", 0)
+    emit({"status": "ok" if not failed else "partial", **summary})
+    logger.info("Batch transcription finished summary=%s", summary)
+    return 0 if not failed else 1
+
+
+def _handle_serve(args, cfg, logger) -> int:
+    for model in args.preload_model:
+        ensure_model_available(model_name=model, model_dir=cfg.model_dir)
+        logger.info("Daemon preloaded model=%s", model)
+    # Warm the first capture too; later standbys are started on each stop.
+    state_dir = _state_dir(args.state_dir)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        standby = ensure_standby(state_dir, args.sample_rate, args.channels)
+    except OSError as exc:
+        logger.warning("Could not start a standby capture worker: %s", exc)
+    else:
+        if standby is not None:
+            logger.info("Daemon standby capture worker pid=%s", standby.get("pid"))
+    return serve(socket_path=args.socket_path or cfg.socket_path, handler=_run_in_process, logger=logger)
+
+
+def _dispatch(args, cfg, logger) -> int:
+    try:
+        if args.command == "serve":
+            return _handle_serve(args, cfg, logger)
+
+        if args.command == "stats":
+            records = load_history(_state_dir(args.state_dir), limit=args.limit)
+            emit({"status": "ok", **latency_stats(records)})
+            return 0
+
+        if args.command == "bench":
+            return _handle_bench(args, cfg, logger)
+
+        if args.command == "transcribe":
+            return _handle_transcribe(args, cfg, logger)
+
+        if args.command == "_retention":
+            summary = run_retention(_state_dir(args.state_dir), keep=args.keep)
+            if summary is not None:
+                logger.info("Recording retention summary=%s", summary)
+            emit({"status": "ok", "skipped": summary is None, **(summary or {})})
+            return 0
+
         if args.command == "_capture":
             return capture_loop(
                 audio_path=args.audio_path,
                 sample_rate=args.sample_rate,
                 channels=args.channels,
+                stream_model=args.stream_model,
+                stream_model_dir=args.stream_model_dir,
+                language=args.language,
+                preset=args.preset,
+                control_path=args.control_socket,
+                standby=args.standby,
             )
 
         if args.command == "record":
@@ -143,6 +636,9 @@ def main(argv: list[str] | None = None) -> int:
                     channels=args.channels,
                     model=args.model,
                     language=_normalize_language(args.language),
+                    streaming=_to_bool(args.streaming),
+                    model_dir=cfg.model_dir,
+                    preset=_resolve_dictation_preset(args, state_dir, args.model),
                 )
                 emit(payload)
                 return 0 if payload.get("status") == "ok" else 1
@@ -160,22 +656,34 @@ def main(argv: list[str] | None = None) -> int:
                 channels=args.channels,
                 model=args.model,
                 language=_normalize_language(args.language),
+                streaming=_to_bool(args.streaming),
+                model_dir=cfg.model_dir,
+                preset=_resolve_dictation_preset(args, state_dir, args.model),
             )
             emit(payload)
             return 0 if payload.get("status") == "ok" else 1
 
         if args.command == "model":
             model = args.model
+            # Int8 variants are built from (and compiled as) their float base model.
+            base_model, _quantized = split_quantized_name(model)
             if args.status:
                 emit(
                     {
                         "status": "ok",
                         "model": model,
                         "is_available": model_is_available_locally(model_name=model, model_dir=cfg.model_dir),
+                        "compiled": compiled_artifact_is_fresh(model_name=base_model, model_dir=cfg.model_dir),
+                        "engine": selected_engine_name(),
                         "model_dir": str(cfg.model_dir),
                     }
                 )
                 return 0
+            if args.compile:
+                artifact = compile_model(model_name=base_model, model_dir=cfg.model_dir)
+                emit({"status": "ok", "model": model, "model_dir": str(cfg.model_dir), **artifact})
+                logger.info("Compiled model=%s artifact=%s", model, artifact["artifact_path"])
+                return 0
             if args.ensure:
                 downloaded = ensure_model_available(model_name=model, model_dir=cfg.model_dir)
                 emit(
@@ -191,7 +699,7 @@ def main(argv: list[str] | None = None) -> int:
 
         if args.command == "llm":
             if args.codex_status:
-                status = codex_status()
+                status = codex_status(refresh=args.refresh)
                 emit({"status": "ok", **status})
                 return 0
             if args.codex_login:
@@ -211,3 +719,16 @@ def main(argv: list[str] | None = None) -> int:
             }
         )
         return 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    args = _parse_args(argv)
+    cfg = default_config()
+
+    if args.command in DAEMON_COMMANDS:
+        exit_code = forward_to_daemon(cfg.socket_path, argv)
+        if exit_code is not None:
+            return exit_code
+
+    return _dispatch(args, cfg, get_logger(cfg.log_path))
@@ -1,11 +1,18 @@
+import json
 import os
 import shlex
 import shutil
 import subprocess
 import tempfile
+import time
 from pathlib import Path
 from typing import Any
 
+# A positive auth check is trusted for this long; failures are never cached.
+DEFAULT_AUTH_TTL_SECONDS = 600
+INVOCATION_STDIN = "stdin"
+INVOCATION_ARGV = "argv"
+
 
 def _split_command(raw_command: str) -> list[str]:
     # Windows needs non-POSIX parsing so backslashes in paths are preserved.
@@ -61,20 +68,111 @@ def is_codex_installed(codex_command: str | None = None) -> bool:
     return any(shutil.which(f"{exe}{ext}") for ext in (".cmd", ".exe", ".bat"))
 
 
+def _load_cache(cache_path: Path | None, raw_command: str) -> dict[str, Any]:
+    """Read cached facts about ``raw_command``; a different command starts empty."""
+    if cache_path is None:
+        return {}
+    try:
+        cache = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("command") != raw_command:
+        return {}
+    return cache
+
+
+def _update_cache(cache_path: Path | None, raw_command: str, **fields: Any) -> None:
+    if cache_path is None:
+        return
+    cache = _load_cache(cache_path, raw_command)
+    cache.update(fields, command=raw_command)
+    cache = {key: value for key, value in cache.items() if value is not None}
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def invalidate_codex_auth_cache(cache_path: Path | None, codex_command: str | None = None) -> None:
+    raw_command = codex_command or os.environ.get("CODEX_CMD", "codex")
+    _update_cache(cache_path, raw_command, auth_checked_at=None)
+
+
+def _auth_ttl_seconds() -> float:
+    try:
+        return float(os.getenv("WHISPER_CLIP_CODEX_AUTH_TTL_SEC", str(DEFAULT_AUTH_TTL_SECONDS)))
+    except ValueError:
+        return float(DEFAULT_AUTH_TTL_SECONDS)
+
+
+def probe_codex_login(codex_command: str | None = None, timeout_seconds: int = 5) -> bool | None:
+    """Ask ``codex login status`` without running a model turn.
+
+    Returns None when the probe is inconclusive (older CLI without the
+    subcommand, timeout), so callers can fall back to a real prompt.
+    """
+    raw_command = codex_command or os.environ.get("CODEX_CMD", "codex")
+    try:
+        base_command = _resolve_codex_base_command(raw_command)
+        result = subprocess.run(
+            base_command + ["login", "status"],
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            timeout=timeout_seconds,
+            check=False,
+        )
+    except Exception:
+        return None
+
+    output = ((result.stdout or "") + "\n" + (result.stderr or "")).lower()
+    if result.returncode == 0:
+        return "not logged in" not in output
+    if "not logged in" in output:
+        return False
+    return None
+
+
 def check_codex_authentication(
     codex_command: str | None = None,
     timeout_seconds: int = 20,
+    cache_path: Path | None = None,
+    force: bool = False,
 ) -> tuple[bool, str]:
-    """Check whether Codex CLI can run a lightweight prompt."""
+    """Check whether Codex CLI is logged in.
+
+    A recent positive result from ``cache_path`` is reused. Otherwise the cheap
+    ``codex login status`` probe is tried before falling back to a lightweight
+    prompt.
+    """
     if not is_codex_installed(codex_command=codex_command):
         return False, "Codex CLI is not installed."
 
+    raw_command = codex_command or os.environ.get("CODEX_CMD", "codex")
+    cache = _load_cache(cache_path, raw_command)
+    checked_at = cache.get("auth_checked_at")
+    if not force and checked_at is not None and time.time() - float(checked_at) < _auth_ttl_seconds():
+        return True, "Codex is active."
+
+    probed = probe_codex_login(codex_command=codex_command)
+    if probed is True:
+        _update_cache(cache_path, raw_command, auth_checked_at=time.time())
+        return True, "Codex is active."
+    if probed is False:
+        _update_cache(cache_path, raw_command, auth_checked_at=None)
+        return False, "Codex is not logged in."
+
     prompt = "Reply with a single word: ready"
     try:
         ask_codex(
             user_query=prompt,
             codex_command=codex_command,
             timeout_seconds=timeout_seconds,
+            cache_path=cache_path,
         )
         return True, "Codex is active."
     except Exception as exc:
@@ -84,6 +182,7 @@ def check_codex_authentication(
 def run_codex_login(
     codex_command: str | None = None,
     timeout_seconds: int = 300,
+    cache_path: Path | None = None,
 ) -> dict[str, Any]:
     if not is_codex_installed(codex_command=codex_command):
         return {"ok": False, "message": "Codex CLI is not installed."}
@@ -102,6 +201,7 @@ def run_codex_login(
         check=False,
     )
     output = ((result.stdout or "") + "\n" + (result.stderr or "")).strip()
+    invalidate_codex_auth_cache(cache_path, raw_command)
     return {
         "ok": result.returncode == 0,
         "message": output or "Codex login command finished.",
@@ -134,8 +234,13 @@ def ask_codex(
     timeout_seconds: int = 90,
     cwd: str | None = None,
     pure_chat_mode: bool = True,
+    cache_path: Path | None = None,
 ) -> str:
-    """Send a query to Codex CLI and return the final answer text."""
+    """Send a query to Codex CLI and return the final answer text.
+
+    With ``cache_path``, the invocation form that last worked is tried first
+    and a failed run invalidates the cached auth status.
+    """
     if not user_query.strip():
         raise ValueError("user_query cannot be empty.")
 
@@ -151,23 +256,27 @@ def ask_codex(
     if pure_chat_mode:
         exec_flags += ["--sandbox", "read-only"]
 
-    attempts: list[tuple[list[str], str | None]] = [
+    attempts: list[tuple[str, list[str], str | None]] = [
         (
+            INVOCATION_STDIN,
             base_command + exec_flags + ["--output-last-message", output_path, "-"],
             prompt + "\n",
         ),
         (
+            INVOCATION_ARGV,
             base_command
             + exec_flags
             + ["--output-last-message", output_path, single_line_prompt],
             None,
         ),
     ]
+    remembered = _load_cache(cache_path, raw_command).get("invocation")
+    attempts.sort(key=lambda attempt: attempt[0] != remembered)
 
     last_error: Exception | None = None
 
     try:
-        for command, stdin_text in attempts:
+        for invocation, command, stdin_text in attempts:
             try:
                 result = subprocess.run(
                     command,
@@ -180,6 +289,11 @@ def ask_codex(
                     cwd=cwd,
                     check=False,
                 )
+            except subprocess.TimeoutExpired as exc:
+                # A hung run is not an invocation-form problem; retrying the
+                # other form would only double the wait.
+                last_error = exc
+                break
             except Exception as exc:  # pragma: no cover - fallback path
                 last_error = exc
                 continue
@@ -190,12 +304,11 @@ def ask_codex(
             output = (result.stdout or "").strip()
             err = (result.stderr or "").strip()
 
-            if result.returncode == 0 and file_output:
-                return file_output
-            if result.returncode == 0 and output:
-                return output
-            if result.returncode == 0 and err:
-                return err
+            answer = (file_output or output or err) if result.returncode == 0 else ""
+            if answer:
+                # A completed run also proves the CLI is logged in.
+                _update_cache(cache_path, raw_command, invocation=invocation, auth_checked_at=time.time())
+                return answer
 
             last_error = RuntimeError(
                 f"Command failed ({' '.join(command)}), return code {result.returncode}, stderr: {err or '<empty>'}"
@@ -203,6 +316,7 @@ def ask_codex(
     finally:
         Path(output_path).unlink(missing_ok=True)
 
+    invalidate_codex_auth_cache(cache_path, raw_command)
     raise RuntimeError(
         f"All Codex invocation attempts failed. Last error: {last_error}"
     )
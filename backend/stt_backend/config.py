@@ -5,8 +5,18 @@ from dataclasses import dataclass
 from pathlib import Path
 
 DEFAULT_SAMPLE_RATE = 16_000
-DEFAULT_MODEL = os.getenv("WHISPER_MODEL", "small")
-DEFAULT_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "auto")
+DEFAULT_MODEL = "small"
+DEFAULT_LANGUAGE = "auto"
+
+
+# Read per call rather than at import: the daemon serves clients whose
+# forwarded environment sets these.
+def default_model() -> str:
+    return os.getenv("WHISPER_MODEL", "") or DEFAULT_MODEL
+
+
+def default_language() -> str:
+    return os.getenv("WHISPER_LANGUAGE", "") or DEFAULT_LANGUAGE
 
 
 @dataclass(frozen=True)
@@ -14,6 +24,7 @@ class BackendConfig:
     state_dir: Path
     model_dir: Path
     log_path: Path
+    socket_path: Path
 
 
 def default_config() -> BackendConfig:
@@ -21,8 +32,9 @@ def default_config() -> BackendConfig:
     state_dir = Path(os.getenv("WHISPER_CLIP_STATE_DIR", str(project_root / "backend" / "state")))
     model_dir = Path(os.getenv("WHISPER_CLIP_MODEL_DIR", str(project_root / "model")))
     log_path = Path(os.getenv("WHISPER_CLIP_BACKEND_LOG", str(project_root / "backend" / "logs" / "stt_backend.log")))
+    socket_path = Path(os.getenv("WHISPER_CLIP_SOCKET", str(state_dir / "stt_backend.sock")))
 
     state_dir.mkdir(parents=True, exist_ok=True)
     model_dir.mkdir(parents=True, exist_ok=True)
     log_path.parent.mkdir(parents=True, exist_ok=True)
-    return BackendConfig(state_dir=state_dir, model_dir=model_dir, log_path=log_path)
+    return BackendConfig(state_dir=state_dir, model_dir=model_dir, log_path=log_path, socket_path=socket_path)
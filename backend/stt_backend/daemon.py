@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import sys
+from pathlib import Path
+from typing import Callable
+
+# Commands that may be served by a running daemon. Everything else (``serve``
+# itself, the hidden ``_capture`` worker) always runs in-process.
+DAEMON_COMMANDS = frozenset({"record", "run", "model", "llm"})
+
+# Environment variables forwarded from the thin client so the daemon sees the
+# same provider/model settings the app passed to this invocation.
+FORWARDED_ENV_PREFIXES = ("WHISPER_CLIP_", "WHISPER_", "CODEX_", "OPENAI_")
+
+EXIT_KEY = "_daemon_exit"
+CONNECT_TIMEOUT_SEC = 0.5
+# A client that connects but never sends its request must not wedge the
+# single-threaded daemon.
+REQUEST_READ_TIMEOUT_SEC = 2.0
+
+
+def daemon_disabled() -> bool:
+    return (os.getenv("WHISPER_CLIP_NO_DAEMON", "") or "").strip().lower() in {"1", "true", "yes"}
+
+
+def _forwarded_env() -> dict[str, str]:
+    return {key: value for key, value in os.environ.items() if key.startswith(FORWARDED_ENV_PREFIXES)}
+
+
+def forward_to_daemon(socket_path: Path, argv: list[str]) -> int | None:
+    """Run ``argv`` on a running daemon and relay its JSON lines to stdout.
+
+    Returns the daemon's exit code, or ``None`` when no daemon is reachable so
+    the caller can fall back to in-process execution.
+    """
+    if daemon_disabled() or not hasattr(socket, "AF_UNIX") or not socket_path.exists():
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT_SEC)
+    try:
+        sock.connect(str(socket_path))
+    except OSError:
+        sock.close()
+        return None
+
+    # Requests can legitimately run for minutes (model download, LLM refine).
+    sock.settimeout(None)
+    with sock, sock.makefile("rwb") as stream:
+        # Relative paths in argv (e.g. ``transcribe ./clips``) refer to the client's cwd.
+        request = {"argv": argv, "env": _forwarded_env(), "cwd": os.getcwd()}
+        stream.write((json.dumps(request) + "\n").encode("utf-8"))
+        stream.flush()
+
+        exit_code = 1
+        for raw_line in stream:
+            line = raw_line.decode("utf-8").rstrip("\n")
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                message = None
+            if isinstance(message, dict) and EXIT_KEY in message:
+                exit_code = int(message[EXIT_KEY])
+                break
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+        else:
+            # Connection dropped before the daemon reported completion.
+            sys.stdout.write(
+                json.dumps({"status": "error", "error": "daemon_disconnected"}) + "\n"
+            )
+            sys.stdout.flush()
+        return exit_code
+
+
+@contextlib.contextmanager
+def _patched_env(overrides: dict[str, str]):
+    baseline = {key: value for key, value in os.environ.items() if key.startswith(FORWARDED_ENV_PREFIXES)}
+    for key in baseline:
+        if key not in overrides:
+            del os.environ[key]
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for key in [key for key in os.environ if key.startswith(FORWARDED_ENV_PREFIXES)]:
+            del os.environ[key]
+        os.environ.update(baseline)
+
+
+@contextlib.contextmanager
+def _working_dir(cwd: str | None):
+    if not cwd or not os.path.isdir(cwd):
+        yield
+        return
+    with contextlib.chdir(cwd):
+        yield
+
+
+def _write_line(writer: io.TextIOWrapper, payload: dict) -> None:
+    # Best effort: the client may already have hung up.
+    try:
+        writer.write(json.dumps(payload) + "\n")
+        writer.flush()
+    except OSError:
+        pass
+
+
+def _handle_connection(conn: socket.socket, handler: Callable[[list[str]], int], logger) -> None:
+    """Serve one request; a client that disconnects mid-request only ends
+    that request, never the daemon."""
+    try:
+        _serve_request(conn, handler, logger)
+    except OSError as exc:
+        logger.warning("Daemon client disconnected mid-request: %s", exc)
+
+
+def _serve_request(conn: socket.socket, handler: Callable[[list[str]], int], logger) -> None:
+    conn.settimeout(REQUEST_READ_TIMEOUT_SEC)
+    with conn, conn.makefile("rwb") as stream:
+        try:
+            raw_request = stream.readline()
+        except OSError as exc:
+            logger.warning("Dropped daemon client that sent no request: %s", exc)
+            return
+        if not raw_request:
+            return
+        # Responses stream for as long as the request runs.
+        conn.settimeout(None)
+        writer = io.TextIOWrapper(stream, encoding="utf-8", write_through=True)
+        try:
+            try:
+                request = json.loads(raw_request.decode("utf-8"))
+                argv = [str(item) for item in request.get("argv", [])]
+                env = {str(k): str(v) for k, v in (request.get("env") or {}).items()}
+                cwd = request.get("cwd")
+            except (ValueError, AttributeError) as exc:
+                _write_line(writer, {"status": "error", "error": f"invalid_request: {exc}"})
+                _write_line(writer, {EXIT_KEY: 1})
+                return
+
+            exit_code = 1
+            try:
+                with _patched_env(env), _working_dir(cwd), contextlib.redirect_stdout(writer):
+                    exit_code = handler(argv)
+            except Exception as exc:  # handler already emits its own errors; this is a last resort
+                logger.exception("Daemon request failed argv=%s: %s", argv, exc)
+                _write_line(writer, {"status": "error", "error": str(exc)})
+            _write_line(writer, {EXIT_KEY: exit_code})
+        finally:
+            with contextlib.suppress(OSError):
+                writer.detach()
+
+
+def serve(socket_path: Path, handler: Callable[[list[str]], int], logger) -> int:
+    """Serve CLI requests over a Unix domain socket until SIGTERM/SIGINT.
+
+    Requests are handled one at a time: whisper models are not safe to share
+    across concurrent ``transcribe`` calls, and the menu bar app only ever
+    issues one command at a time anyway.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Unix domain sockets are not supported on this platform.")
+
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        probe.settimeout(CONNECT_TIMEOUT_SEC)
+        try:
+            probe.connect(str(socket_path))
+        except OSError:
+            socket_path.unlink()
+        else:
+            probe.close()
+            raise RuntimeError(f"A backend daemon is already serving {socket_path}.")
+        finally:
+            probe.close()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(socket_path))
+    os.chmod(socket_path, 0o600)
+    server.listen(8)
+
+    def _stop_handler(_signum, _frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _stop_handler)
+    logger.info("Backend daemon listening socket=%s pid=%s", socket_path, os.getpid())
+
+    try:
+        while True:
+            conn, _ = server.accept()
+            _handle_connection(conn, handler, logger)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        socket_path.unlink(missing_ok=True)
+        logger.info("Backend daemon stopped socket=%s", socket_path)
+    return 0
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+PRESET_INTERACTIVE = "interactive"
+PRESET_BALANCED = "balanced"
+PRESET_ACCURATE = "accurate"
+
+# Engine-neutral decoding options; each engine translates them to its own
+# keyword arguments. ``temperature`` is the fallback ladder: a single value
+# means no re-decoding when the compression/logprob checks fail.
+DECODE_PRESETS: dict[str, dict[str, Any]] = {
+    # Greedy, one pass, no prompt carry-over: the lowest latency per window.
+    PRESET_INTERACTIVE: {
+        "temperature": [0.0],
+        "beam_size": 1,
+        "best_of": 1,
+        "condition_on_previous_text": False,
+    },
+    # Greedy first pass with a short fallback ladder for garbled windows.
+    PRESET_BALANCED: {
+        "temperature": [0.0, 0.4, 0.8],
+        "beam_size": 1,
+        "best_of": 2,
+        "condition_on_previous_text": False,
+    },
+    # Whisper's reference CLI settings.
+    PRESET_ACCURATE: {
+        "temperature": [0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+        "beam_size": 5,
+        "best_of": 5,
+        "condition_on_previous_text": True,
+    },
+}
+PRESETS = tuple(DECODE_PRESETS)
+# Ordered fastest first; ``recommend_preset`` falls back to the slowest one.
+PRESETS_BY_SPEED = (PRESET_INTERACTIVE, PRESET_BALANCED, PRESET_ACCURATE)
+
+# Hotkey dictation uses the fastest preset within the agreed error margin.
+# ``bench --all-presets`` measures that per engine/model and saves it to
+# RECOMMENDATION_FILE_NAME; the default applies until a bench has run.
+# Batch jobs are not latency bound.
+DEFAULT_DICTATION_PRESET = PRESET_INTERACTIVE
+RECOMMENDATION_FILE_NAME = "preset_recommendation.json"
+DEFAULT_BATCH_PRESET = PRESET_BALANCED
+# Allowed WER increase over ``accurate`` for a preset to count as good enough.
+PRESET_ERROR_MARGIN = 0.02
+
+
+def _recommendation_key(engine_name: str, model: str) -> str:
+    return f"{engine_name}/{model}"
+
+
+def load_recommendations(state_dir: Path) -> dict[str, str]:
+    try:
+        data = json.loads((state_dir / RECOMMENDATION_FILE_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {key: value for key, value in data.items() if value in DECODE_PRESETS}
+
+
+def save_recommendations(state_dir: Path, comparison: list[dict[str, Any]]) -> dict[str, str]:
+    """Store the bench ``recommended_preset`` per engine/model and return the
+    entries written. Across languages the slowest recommendation wins, so no
+    language falls outside the error margin."""
+    saved: dict[str, str] = {}
+    for entry in comparison:
+        key = _recommendation_key(entry["engine"], entry["model"])
+        preset = entry["recommended_preset"]
+        if key in saved and PRESETS_BY_SPEED.index(saved[key]) >= PRESETS_BY_SPEED.index(preset):
+            continue
+        saved[key] = preset
+    if not saved:
+        return saved
+    recommendations = {**load_recommendations(state_dir), **saved}
+    path = state_dir / RECOMMENDATION_FILE_NAME
+    tmp_path = path.with_suffix(".tmp")
+    state_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path.write_text(json.dumps(recommendations, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return saved
+
+
+def dictation_preset(state_dir: Path | None = None, model: str | None = None, engine_name: str | None = None) -> str:
+    """``WHISPER_CLIP_PRESET``, else the bench recommendation for the engine
+    and model, else ``DEFAULT_DICTATION_PRESET``."""
+    preset = (os.getenv("WHISPER_CLIP_PRESET", "") or "").strip().lower()
+    if preset in DECODE_PRESETS:
+        return preset
+    if state_dir is not None and model and engine_name:
+        recommended = load_recommendations(state_dir).get(_recommendation_key(engine_name, model))
+        if recommended:
+            return recommended
+    return DEFAULT_DICTATION_PRESET
+
+
+def preset_options(preset: str) -> dict[str, Any]:
+    if preset not in DECODE_PRESETS:
+        raise ValueError(f"Unknown decode preset {preset!r}; choose from {', '.join(PRESETS)}.")
+    return DECODE_PRESETS[preset]
+
+
+def recommend_preset(error_by_preset: dict[str, float], margin: float = PRESET_ERROR_MARGIN) -> str:
+    """Fastest preset whose error is within ``margin`` of ``accurate``'s."""
+    reference = error_by_preset.get(PRESET_ACCURATE, 0.0)
+    for preset in PRESETS_BY_SPEED:
+        if preset in error_by_preset and error_by_preset[preset] - reference <= margin:
+            return preset
+    return PRESET_ACCURATE
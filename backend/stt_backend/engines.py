@@ -0,0 +1,413 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable
+
+from .decode_presets import preset_options
+from .model_artifacts import checkpoint_fingerprint, load_compiled_model, load_quantized_model, split_quantized_name
+
+ENGINE_OPENAI_WHISPER = "openai-whisper"
+ENGINE_FASTER_WHISPER = "faster-whisper"
+DEFAULT_ENGINE = ENGINE_OPENAI_WHISPER
+
+SegmentCallback = Callable[[dict[str, Any]], None]
+
+
+class Engine(ABC):
+    """Interface every inference runtime implements.
+
+    ``transcribe`` takes a 16 kHz mono float32 array (or a path string for
+    formats only ffmpeg can decode) and returns ``text``, ``language``,
+    ``segments`` (dicts with at least ``start``, ``end`` and ``text``) and
+    ``language_probability`` (None unless the language was detected).
+    ``preset`` names a ``decode_presets`` entry; None keeps the runtime's
+    own defaults. ``initial_prompt`` is text the decoder is conditioned on in
+    every window, whatever the preset's ``condition_on_previous_text`` (used
+    for glossary spellings). ``on_segment`` is called with each segment
+    as soon as it is decoded, before ``transcribe`` returns.
+    """
+
+    name = ""
+    # Top-level Python package the runtime lives in.
+    module_name = ""
+
+    def installed(self) -> bool:
+        return importlib.util.find_spec(self.module_name) is not None
+
+    @abstractmethod
+    def is_available(self, model_name: str, model_dir: Path) -> bool:
+        """Whether the model files are on disk (no download needed)."""
+
+    @abstractmethod
+    def download(self, model_name: str, model_dir: Path) -> None:
+        pass
+
+    @abstractmethod
+    def load(self, model_name: str, model_dir: Path) -> Any:
+        """Load ``model_name``, downloading it into ``model_dir`` if needed."""
+
+    @abstractmethod
+    def transcribe(
+        self,
+        model: Any,
+        audio: Any,
+        language: str,
+        preset: str | None = None,
+        on_segment: SegmentCallback | None = None,
+        initial_prompt: str | None = None,
+    ) -> dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def checkpoint_fingerprint(self, model_name: str, model_dir: Path) -> dict[str, Any] | None:
+        """Identity of the model files on disk (None when not downloaded); part
+        of the transcript cache key so a replaced checkpoint is a miss."""
+
+    @abstractmethod
+    def detect_language(self, model: Any, audio: Any) -> tuple[str, float]:
+        """Language spoken in the first 30 s of ``audio`` and its probability."""
+
+    def preset_kwargs(self, preset: str | None) -> dict[str, Any]:
+        """``preset`` translated to this runtime's transcribe keyword arguments."""
+        if preset is None:
+            return {}
+        options = dict(preset_options(preset))
+        options["temperature"] = tuple(options["temperature"])
+        return options
+
+    def decode_options(
+        self, model_name: str, language: str, preset: str | None = None, initial_prompt: str | None = None
+    ) -> dict[str, Any]:
+        """Everything besides the audio that affects the transcript (cache key)."""
+        options = {"engine": self.name, "language": language, **self.preset_kwargs(preset)}
+        if initial_prompt:
+            options.update(initial_prompt=initial_prompt, carry_initial_prompt=True)
+        return options
+
+
+# Progress decoding runs whisper on one window of audio at a time (whisper's
+# own context length), so each window's segments can be reported as soon as
+# it is done.
+PROGRESS_WINDOW_SEC = 30.0
+
+
+class OpenAIWhisperEngine(Engine):
+    name = ENGINE_OPENAI_WHISPER
+    module_name = "whisper"
+
+    def is_available(self, model_name: str, model_dir: Path) -> bool:
+        import whisper
+
+        model_name, _quantized = split_quantized_name(model_name)
+        if model_name in whisper._MODELS:  # type: ignore[attr-defined]
+            url = whisper._MODELS[model_name]  # type: ignore[attr-defined]
+            return (model_dir / os.path.basename(url)).is_file()
+
+        # If user passes a local checkpoint file path, treat it as available when present.
+        return Path(model_name).expanduser().is_file()
+
+    def download(self, model_name: str, model_dir: Path) -> None:
+        import whisper
+
+        model_name, _quantized = split_quantized_name(model_name)
+        if model_name in whisper._MODELS:  # type: ignore[attr-defined]
+            whisper._download(whisper._MODELS[model_name], str(model_dir), False)  # type: ignore[attr-defined]
+
+    def checkpoint_fingerprint(self, model_name: str, model_dir: Path) -> dict[str, Any] | None:
+        return checkpoint_fingerprint(model_name, model_dir)
+
+    def load(self, model_name: str, model_dir: Path) -> Any:
+        import whisper
+
+        base_name, quantized = split_quantized_name(model_name)
+
+        def load_float():
+            loaded = load_compiled_model(model_name=base_name, model_dir=model_dir)
+            return loaded if loaded is not None else whisper.load_model(base_name, download_root=str(model_dir))
+
+        if quantized:
+            return load_quantized_model(base_name, model_dir, load_float)
+        return load_float()
+
+    def _kwargs(self, language: str) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {"fp16": False}
+        if language != "auto":
+            kwargs["language"] = language
+        return kwargs
+
+    def preset_kwargs(self, preset: str | None) -> dict[str, Any]:
+        kwargs = super().preset_kwargs(preset)
+        # whisper decodes greedily when beam_size is None; a one-beam search
+        # gives the same tokens with extra bookkeeping.
+        if kwargs.get("beam_size") == 1:
+            kwargs["beam_size"] = None
+        if kwargs.get("best_of") == 1:
+            kwargs["best_of"] = None
+        return kwargs
+
+    def decode_options(
+        self, model_name: str, language: str, preset: str | None = None, initial_prompt: str | None = None
+    ) -> dict[str, Any]:
+        return {**super().decode_options(model_name, language, preset, initial_prompt), **self._kwargs(language)}
+
+    def detect_language(self, model: Any, audio: Any) -> tuple[str, float]:
+        """Same single encoder pass whisper's ``transcribe`` would do for
+        ``auto``, but keeping the probability."""
+        import whisper
+
+        if not model.is_multilingual:
+            return "en", 1.0
+        if isinstance(audio, str):
+            audio = whisper.load_audio(audio)
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), model.dims.n_mels).to(model.device)
+        _tokens, probs = model.detect_language(mel)
+        language = max(probs, key=probs.get)
+        return language, float(probs[language])
+
+    def _transcribe_windows(
+        self, model: Any, audio: Any, kwargs: dict[str, Any], on_segment: SegmentCallback
+    ) -> dict[str, Any]:
+        """``model.transcribe`` over successive windows, reporting each
+        window's segments as it finishes.
+
+        A window's last segment may be cut off at the window edge, so unless
+        it is the final window that segment is dropped and the next window
+        starts where it began. Every window is prompted with the initial
+        prompt, preceded by the previous text when ``condition_on_previous_text``
+        (the decoder truncates prompts from the front, so the glossary stays).
+        """
+        import whisper
+
+        if isinstance(audio, str):
+            audio = whisper.load_audio(audio)
+        sample_rate = whisper.audio.SAMPLE_RATE
+        window = int(PROGRESS_WINDOW_SEC * sample_rate)
+        condition = kwargs.get("condition_on_previous_text", True)
+        initial_prompt = kwargs.get("initial_prompt")
+        segments: list[dict[str, Any]] = []
+        language = kwargs.get("language")
+        seek = 0
+        while seek < len(audio):
+            end = min(seek + window, len(audio))
+            prompt = initial_prompt
+            if segments and condition:
+                prompt = " ".join(filter(None, ["".join(s["text"] for s in segments).strip(), initial_prompt]))
+            result = model.transcribe(audio[seek:end], **{**kwargs, "initial_prompt": prompt})
+            language = language or result.get("language")
+            window_segments = result.get("segments") or []
+            next_seek = end
+            if end < len(audio) and len(window_segments) > 1 and float(window_segments[-1]["start"]) >= 1.0:
+                next_seek = seek + int(float(window_segments.pop()["start"]) * sample_rate)
+            offset = seek / sample_rate
+            for segment in window_segments:
+                shifted = {key: value for key, value in segment.items() if key != "seek"}
+                shifted.update(
+                    id=len(segments),
+                    start=offset + float(segment["start"]),
+                    end=offset + float(segment["end"]),
+                )
+                segments.append(shifted)
+                on_segment(shifted)
+            seek = next_seek
+        return {"text": "".join(segment["text"] for segment in segments), "language": language, "segments": segments}
+
+    def transcribe(
+        self,
+        model: Any,
+        audio: Any,
+        language: str,
+        preset: str | None = None,
+        on_segment: SegmentCallback | None = None,
+        initial_prompt: str | None = None,
+    ) -> dict[str, Any]:
+        probability = None
+        if language == "auto":
+            language, probability = self.detect_language(model, audio)
+        kwargs = {
+            **self._kwargs(language),
+            **self.preset_kwargs(preset),
+            "initial_prompt": initial_prompt,
+            # Without it the prompt only primes the first 30 s under presets
+            # that do not condition on previous text.
+            "carry_initial_prompt": bool(initial_prompt),
+        }
+        if on_segment is None:
+            result = model.transcribe(audio, **kwargs)
+        else:
+            result = self._transcribe_windows(model, audio, kwargs, on_segment)
+        return {
+            "text": (result.get("text") or "").strip(),
+            "language": result.get("language") or language,
+            "segments": result.get("segments") or [],
+            "language_probability": probability,
+        }
+
+
+class FasterWhisperEngine(Engine):
+    """CTranslate2 runtime; ``-int8`` model names use int8 compute."""
+
+    name = ENGINE_FASTER_WHISPER
+    module_name = "faster_whisper"
+
+    def _compute_type(self, model_name: str) -> str:
+        if split_quantized_name(model_name)[1]:
+            return "int8"
+        return (os.getenv("WHISPER_CLIP_CT2_COMPUTE_TYPE", "default") or "").strip() or "default"
+
+    def is_available(self, model_name: str, model_dir: Path) -> bool:
+        from faster_whisper.utils import download_model
+
+        base_name, _quantized = split_quantized_name(model_name)
+        if Path(base_name).expanduser().is_dir():
+            return True
+        try:
+            download_model(base_name, local_files_only=True, cache_dir=str(model_dir))
+        except Exception:
+            return False
+        return True
+
+    def download(self, model_name: str, model_dir: Path) -> None:
+        from faster_whisper.utils import download_model
+
+        base_name, _quantized = split_quantized_name(model_name)
+        if not Path(base_name).expanduser().is_dir():
+            download_model(base_name, cache_dir=str(model_dir))
+
+    def checkpoint_fingerprint(self, model_name: str, model_dir: Path) -> dict[str, Any] | None:
+        from faster_whisper.utils import download_model
+
+        base_name, _quantized = split_quantized_name(model_name)
+        path = Path(base_name).expanduser()
+        if not path.is_dir():
+            try:
+                path = Path(download_model(base_name, local_files_only=True, cache_dir=str(model_dir)))
+            except Exception:
+                return None
+        # Hub snapshots are keyed by revision, so the resolved path changes with the files.
+        weights = path.resolve() / "model.bin"
+        if not weights.is_file():
+            return None
+        stat = weights.stat()
+        return {"path": str(weights), "source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+    def load(self, model_name: str, model_dir: Path) -> Any:
+        from faster_whisper import WhisperModel
+
+        base_name, _quantized = split_quantized_name(model_name)
+        return WhisperModel(
+            base_name,
+            device="cpu",
+            compute_type=self._compute_type(model_name),
+            download_root=str(model_dir),
+        )
+
+    def decode_options(
+        self, model_name: str, language: str, preset: str | None = None, initial_prompt: str | None = None
+    ) -> dict[str, Any]:
+        return {
+            **super().decode_options(model_name, language, preset, initial_prompt),
+            "compute_type": self._compute_type(model_name),
+        }
+
+    def detect_language(self, model: Any, audio: Any) -> tuple[str, float]:
+        if isinstance(audio, str):
+            from faster_whisper import decode_audio
+
+            audio = decode_audio(audio)
+        language, probability, _all = model.detect_language(audio)
+        return language, float(probability)
+
+    def transcribe(
+        self,
+        model: Any,
+        audio: Any,
+        language: str,
+        preset: str | None = None,
+        on_segment: SegmentCallback | None = None,
+        initial_prompt: str | None = None,
+    ) -> dict[str, Any]:
+        segments_iter, info = model.transcribe(
+            audio,
+            language=None if language == "auto" else language,
+            # Hotwords go into every window's prompt; an initial prompt only
+            # primes the first one under presets that do not condition on
+            # previous text.
+            hotwords=initial_prompt or None,
+            **self.preset_kwargs(preset),
+        )
+        segments = []
+        # The iterator decodes lazily, one segment per step.
+        for segment in segments_iter:
+            segments.append(
+                {
+                    "id": segment.id,
+                    "start": segment.start,
+                    "end": segment.end,
+                    "text": segment.text,
+                    "avg_logprob": segment.avg_logprob,
+                    "no_speech_prob": segment.no_speech_prob,
+                }
+            )
+            if on_segment is not None:
+                on_segment(segments[-1])
+        return {
+            "text": "".join(segment["text"] for segment in segments).strip(),
+            "language": info.language or language,
+            "segments": segments,
+            "language_probability": info.language_probability if language == "auto" else None,
+        }
+
+
+ENGINES: dict[str, type[Engine]] = {
+    ENGINE_OPENAI_WHISPER: OpenAIWhisperEngine,
+    ENGINE_FASTER_WHISPER: FasterWhisperEngine,
+}
+_INSTANCES: dict[str, Engine] = {}
+
+
+def selected_engine_name() -> str:
+    return (os.getenv("WHISPER_CLIP_ENGINE", DEFAULT_ENGINE) or "").strip().lower() or DEFAULT_ENGINE
+
+
+def get_engine(name: str | None = None) -> Engine:
+    """Return the engine ``name`` (default: ``WHISPER_CLIP_ENGINE``)."""
+    name = name or selected_engine_name()
+    if name not in ENGINES:
+        raise ValueError(f"Unknown inference engine {name!r}; choose from {', '.join(ENGINES)}.")
+    if name not in _INSTANCES:
+        _INSTANCES[name] = ENGINES[name]()
+    engine = _INSTANCES[name]
+    if not engine.installed():
+        raise RuntimeError(f"Inference engine {name!r} is not installed.")
+    return engine
+
+
+def installed_engines() -> list[str]:
+    return [name for name, engine_cls in ENGINES.items() if engine_cls().installed()]
+
+
+def check_conformance(result: dict[str, Any]) -> list[str]:
+    """Problems with one transcription result; empty when it follows the contract."""
+    problems: list[str] = []
+    if not isinstance(result.get("text"), str):
+        problems.append("text is not a string")
+    if not isinstance(result.get("language"), str) or not result.get("language"):
+        problems.append("language is missing")
+    segments = result.get("segments")
+    if not isinstance(segments, list):
+        return problems + ["segments is not a list"]
+    previous_end = 0.0
+    for index, segment in enumerate(segments):
+        if not all(key in segment for key in ("start", "end", "text")):
+            problems.append(f"segment {index} lacks start/end/text")
+            continue
+        start, end = float(segment["start"]), float(segment["end"])
+        # End times may overshoot short clips (models see 30 s padded windows),
+        # so only ordering is checked.
+        if start > end or start < previous_end - 0.01:
+            problems.append(f"segment {index} is out of order ({start:.2f}-{end:.2f})")
+        previous_end = end
+    return problems
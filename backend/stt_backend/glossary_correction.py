@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import difflib
+import functools
+import os
+import re
+from typing import Any
+
+from .user_glossary import glossary_entries
+
+# whisper keeps at most 223 prompt tokens; stay well below that so text
+# carried over from earlier windows still fits.
+PROMPT_MAX_CHARS = 600
+# Shorter entries (letters and digits only) are just re-cased on exact matches.
+MIN_FUZZY_CHARS = 4
+MATCH_THRESHOLD = 0.86
+# Lower bar for candidates that also sound like the entry.
+PHONETIC_MATCH_THRESHOLD = 0.72
+# Entries shorter than this sit one edit away from ordinary words ("Codex" and
+# "codes"), so they need a near-identical spelling and get no phonetic bonus.
+SHORT_ENTRY_CHARS = 6
+SHORT_MATCH_THRESHOLD = 0.92
+# Candidates whose length differs from the entry by more than this share are skipped.
+MAX_LENGTH_DIFF = 0.3
+# Lowercase lines of this file are ordinary words, which are never corrected
+# (macOS ships one; ``WHISPER_CLIP_WORDS_FILE`` points elsewhere).
+DEFAULT_WORDS_FILE = "/usr/share/dict/words"
+_INFLECTIONS = ("s", "es", "ed", "ing")
+
+_PHONETIC_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def _flag(name: str, default: str = "1") -> bool:
+    return (os.getenv(name, default) or "").strip().lower() not in {"0", "false", "no"}
+
+
+def glossary_prompt_enabled() -> bool:
+    return _flag("WHISPER_CLIP_GLOSSARY_PROMPT")
+
+
+def glossary_correction_enabled() -> bool:
+    # On whenever the glossary has entries; ordinary words are protected by
+    # the words file (see ``is_common_word``).
+    return _flag("WHISPER_CLIP_GLOSSARY_CORRECT")
+
+
+@functools.lru_cache(maxsize=2)
+def _load_words(path: str) -> frozenset[str]:
+    try:
+        with open(path, encoding="utf-8", errors="ignore") as handle:
+            return frozenset(line.strip() for line in handle if line.strip().islower())
+    except OSError:
+        return frozenset()
+
+
+def is_common_word(word: str) -> bool:
+    """Whether ``word`` (or its stem without a plain inflection) is in the words file."""
+    words = _load_words(os.getenv("WHISPER_CLIP_WORDS_FILE", "") or DEFAULT_WORDS_FILE)
+    word = word.lower()
+    if not words or not word.isalpha():
+        return False
+    return word in words or any(
+        word.endswith(suffix) and word[: -len(suffix)] in words for suffix in _INFLECTIONS
+    )
+
+
+def normalize(text: str) -> str:
+    return "".join(re.findall(r"[^\W_]+", text.lower()))
+
+
+def phonetic_key(text: str) -> str:
+    """Soundex-style code of the whole phrase (no truncation, spaces ignored)."""
+    letters = [char for char in normalize(text) if char.isalpha()]
+    key: list[str] = []
+    last = None
+    for char in letters:
+        code = _PHONETIC_CODES.get(char, "0" if not key else "")
+        if code and code != last:
+            key.append(code)
+        if char not in "hw":
+            last = code
+    return "".join(key)
+
+
+@functools.lru_cache(maxsize=4)
+def _compile_prompt(entries: tuple[str, ...]) -> str | None:
+    parts: list[str] = []
+    length = 0
+    for entry in entries:
+        length += len(entry) + 2
+        if length > PROMPT_MAX_CHARS:
+            break
+        parts.append(entry)
+    return ", ".join(parts) + "." if parts else None
+
+
+def glossary_prompt() -> str | None:
+    """Glossary entries as a whisper ``initial_prompt``, biasing decoding
+    toward their spelling; None when disabled or the glossary is empty."""
+    if not glossary_prompt_enabled():
+        return None
+    return _compile_prompt(tuple(glossary_entries()))
+
+
+@functools.lru_cache(maxsize=4)
+def _compile_patterns(entries: tuple[str, ...]) -> tuple[dict[str, Any], ...]:
+    patterns = []
+    for entry in entries:
+        norm = normalize(entry)
+        if not norm:
+            continue
+        words = len(entry.split())
+        patterns.append(
+            {
+                "entry": entry,
+                "norm": norm,
+                "phonetic": phonetic_key(entry),
+                "words": words,
+                # Lowercase single words that are ordinary words themselves
+                # are only ever re-cased.
+                "fuzzy": words > 1 or entry != entry.lower() or not is_common_word(norm),
+            }
+        )
+    return tuple(patterns)
+
+
+def _ordinary(candidate: str) -> bool:
+    return all(is_common_word(word) for word in candidate.split())
+
+
+def _score(candidate: str, pattern: dict[str, Any]) -> float | None:
+    norm = normalize(candidate)
+    # Ordinary words are what the speaker said, not a misheard name; only
+    # whole multi-word entries may re-case them.
+    if norm == pattern["norm"]:
+        return 1.0 if pattern["words"] > 1 or not _ordinary(candidate) else None
+    if not pattern["fuzzy"] or min(len(norm), len(pattern["norm"])) < MIN_FUZZY_CHARS:
+        return None
+    if abs(len(norm) - len(pattern["norm"])) > MAX_LENGTH_DIFF * len(pattern["norm"]):
+        return None
+    if _ordinary(candidate):
+        return None
+    ratio = difflib.SequenceMatcher(None, norm, pattern["norm"]).ratio()
+    if len(pattern["norm"]) < SHORT_ENTRY_CHARS:
+        return ratio if ratio >= SHORT_MATCH_THRESHOLD else None
+    if ratio >= MATCH_THRESHOLD:
+        return ratio
+    if ratio >= PHONETIC_MATCH_THRESHOLD and phonetic_key(candidate) == pattern["phonetic"]:
+        return ratio
+    return None
+
+
+def _best_match(words: list[str], patterns) -> tuple[float, int, dict[str, Any]] | None:
+    """Best ``(score, word_count, pattern)`` for a phrase starting at ``words[0]``.
+
+    Entries are tried against as many words as they have, plus or minus one
+    (whisper splits and merges unfamiliar names). A multi-word candidate is
+    rejected when dropping its first or last word matches at least as well,
+    so neighbouring words are never swallowed.
+    """
+    best = None
+    for pattern in patterns:
+        for count in {pattern["words"] - 1, pattern["words"], pattern["words"] + 1}:
+            if count < 1 or count > len(words):
+                continue
+            score = _score(" ".join(words[:count]), pattern)
+            if score is None:
+                continue
+            if count > 1 and any(
+                (_score(" ".join(part), pattern) or 0.0) >= score for part in (words[1:count], words[: count - 1])
+            ):
+                continue
+            if best is None or (score, count) > best[:2]:
+                best = (score, count, pattern)
+    return best
+
+
+def correct_transcript(text: str) -> tuple[str, list[dict[str, Any]]]:
+    """Replace near-misses of glossary entries with their canonical spelling.
+
+    A local fuzzy (edit ratio) plus phonetic matcher, so names come out
+    right without an LLM round trip. Exact matches are re-cased; fuzzy ones
+    never replace ordinary words. Returns the corrected text and the list
+    of ``{"from", "to", "score"}`` replacements.
+    """
+    patterns = _compile_patterns(tuple(glossary_entries())) if glossary_correction_enabled() else ()
+    if not patterns or not text:
+        return text, []
+    from .glossary_index import candidate_entries, load_index
+
+    tokens = list(re.finditer(r"\S+", text))
+    # Punctuation around a token is kept as is; only the words are matched.
+    cores = [re.sub(r"^\W+|\W+$", "", token.group()) or token.group() for token in tokens]
+    max_words = max(pattern["words"] for pattern in patterns) + 1
+    # Only entries the glossary index relates to a position are scored there.
+    by_entry = {pattern["entry"]: pattern for pattern in patterns}
+    candidates = candidate_entries([normalize(core) for core in cores], load_index(None), max_words)
+    pieces: list[str] = []
+    corrections: list[dict[str, Any]] = []
+    cursor = 0
+    index = 0
+    while index < len(tokens):
+        nearby = [by_entry[entry] for entry in candidates[index] if entry in by_entry]
+        match = _best_match(cores[index : index + max_words], nearby) if nearby else None
+        if match is None:
+            index += 1
+            continue
+        score, count, pattern = match
+        first, last = tokens[index], tokens[index + count - 1]
+        span = text[first.start() : last.end()]
+        lead = re.match(r"^\W*", span).group()
+        trail = re.search(r"\W*$", span[len(lead) :]).group()
+        original = span[len(lead) : len(span) - len(trail)]
+        if original != pattern["entry"]:
+            pieces.append(text[cursor : first.start()] + lead + pattern["entry"] + trail)
+            cursor = last.end()
+            corrections.append({"from": original, "to": pattern["entry"], "score": round(score, 3)})
+        index += count
+    pieces.append(text[cursor:])
+    return "".join(pieces), corrections
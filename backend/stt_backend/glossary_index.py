@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+from typing import Any
+
+from .glossary_correction import normalize, phonetic_key
+from .user_glossary import GLOSSARY, build_glossary_context, glossary_entries
+
+INDEX_FILE_NAME = "glossary_index.json"
+INDEX_VERSION = 1
+# Entries sent to the refine prompt; glossaries this small are sent whole.
+DEFAULT_TOP_K = 40
+NGRAM_SIZE = 3
+# Dice similarity of character n-grams between an entry and a run of one to
+# three transcript words needed to select it; lower when the run also sounds
+# like the entry. Exact word matches are always selected.
+MATCH_THRESHOLD = 0.6
+PHONETIC_MATCH_THRESHOLD = 0.45
+MAX_WINDOW_WORDS = 3
+# Shorter phonetic codes collide with too many unrelated words.
+MIN_PHONETIC_CHARS = 3
+# Exact word hits rank above fuzzy ones, scaled by how rare the word is.
+TOKEN_WEIGHT = 3.0
+# Looser n-gram overlap that makes an entry worth edit-ratio scoring in the
+# correction pass, well below what its match thresholds imply.
+CANDIDATE_DICE = 0.3
+
+# In-process copy for the daemon, keyed by glossary hash.
+_LOADED: dict[str, Any] = {}
+
+
+def glossary_top_k() -> int:
+    """Entries kept per refine prompt; 0 always sends the full glossary."""
+    try:
+        return max(0, int(os.getenv("WHISPER_CLIP_GLOSSARY_TOP_K", "") or DEFAULT_TOP_K))
+    except ValueError:
+        return DEFAULT_TOP_K
+
+
+def glossary_hash(glossary: dict[str, list[str]] | None = None) -> str:
+    payload = json.dumps(GLOSSARY if glossary is None else glossary, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _words(text: str) -> list[str]:
+    return [word for word in (normalize(part) for part in text.split()) if word]
+
+
+def _ngrams(text: str) -> set[str]:
+    norm = normalize(text)
+    if len(norm) <= NGRAM_SIZE:
+        return {norm} if norm else set()
+    return {norm[i : i + NGRAM_SIZE] for i in range(len(norm) - NGRAM_SIZE + 1)}
+
+
+def _windows(words: list[str]) -> set[str]:
+    # Runs of words joined, since whisper splits and merges names.
+    return {
+        "".join(words[i : i + size]) for size in range(1, MAX_WINDOW_WORDS + 1) for i in range(len(words) - size + 1)
+    }
+
+
+def entry_keys(entry: str) -> dict[str, list[str]]:
+    """Index keys of one entry: its words, character n-grams and the phonetic
+    code of the whole entry."""
+    phonetic = phonetic_key(entry)
+    return {
+        "token": sorted(set(_words(entry))),
+        "ngram": sorted(_ngrams(entry)),
+        "phonetic": [phonetic] if len(phonetic) >= MIN_PHONETIC_CHARS else [],
+    }
+
+
+def build_index() -> dict[str, Any]:
+    """Inverted index from token, character n-gram and phonetic keys to the
+    glossary's entries."""
+    entries = glossary_entries()
+    postings: dict[str, dict[str, list[int]]] = {"token": {}, "ngram": {}, "phonetic": {}}
+    ngram_counts: list[int] = []
+    for entry_id, entry in enumerate(entries):
+        keys = entry_keys(entry)
+        ngram_counts.append(len(keys["ngram"]))
+        for kind, values in keys.items():
+            for value in values:
+                postings[kind].setdefault(value, []).append(entry_id)
+    return {
+        "version": INDEX_VERSION,
+        "hash": glossary_hash(),
+        "entries": entries,
+        "ngram_counts": ngram_counts,
+        "postings": postings,
+    }
+
+
+def load_index(state_dir: Path | None) -> dict[str, Any]:
+    """The index for the current glossary, rebuilt (and saved to ``state_dir``)
+    only when the glossary has changed."""
+    current = glossary_hash()
+    if _LOADED.get("hash") == current:
+        return _LOADED
+    path = state_dir / INDEX_FILE_NAME if state_dir is not None else None
+    index = None
+    if path is not None:
+        try:
+            index = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            index = None
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION or index.get("hash") != current:
+        index = build_index()
+        if path is not None:
+            tmp_path = path.with_suffix(".tmp")
+            try:
+                tmp_path.write_text(json.dumps(index, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp_path, path)
+            except OSError:
+                pass
+    _LOADED.clear()
+    _LOADED.update(index)
+    return _LOADED
+
+
+def select_entries(transcript: str, index: dict[str, Any], top_k: int) -> list[str]:
+    """Up to ``top_k`` entries relevant to ``transcript``, best first.
+
+    An entry is relevant when one of its words occurs in the transcript
+    (ranked by how rare that word is across the glossary) or when a short run
+    of transcript words is close to it in spelling or sound.
+    """
+    total = max(1, len(index["entries"]))
+    postings = index["postings"]
+    words = _words(transcript)
+    scores: dict[int, float] = {}
+    for word in set(words):
+        entry_ids = postings["token"].get(word, ())
+        for entry_id in entry_ids:
+            scores[entry_id] = scores.get(entry_id, 0.0) + TOKEN_WEIGHT * math.log(1 + total / len(entry_ids))
+
+    best: dict[int, float] = {}
+    for window in _windows(words):
+        grams = _ngrams(window)
+        shared: dict[int, int] = {}
+        for gram in grams:
+            for entry_id in postings["ngram"].get(gram, ()):
+                shared[entry_id] = shared.get(entry_id, 0) + 1
+        sounds_like = set(postings["phonetic"].get(phonetic_key(window), ()))
+        for entry_id, count in shared.items():
+            dice = 2 * count / (len(grams) + index["ngram_counts"][entry_id])
+            threshold = PHONETIC_MATCH_THRESHOLD if entry_id in sounds_like else MATCH_THRESHOLD
+            if dice >= threshold:
+                best[entry_id] = max(best.get(entry_id, 0.0), dice)
+    for entry_id, dice in best.items():
+        scores[entry_id] = scores.get(entry_id, 0.0) + dice
+
+    ranked = sorted(scores, key=lambda entry_id: (-scores[entry_id], entry_id))
+    return [index["entries"][entry_id] for entry_id in ranked[:top_k]]
+
+
+def candidate_entries(words: list[str], index: dict[str, Any], max_words: int) -> list[list[str]]:
+    """Per position of the normalized ``words``, the entries (in glossary
+    order) that a run of up to ``max_words`` words starting there might
+    match: sharing a word, the sound of the whole run or enough character
+    n-grams with it."""
+    postings = index["postings"]
+    candidates: list[list[str]] = []
+    for start in range(len(words)):
+        entry_ids = set(postings["token"].get(words[start], ()))
+        for size in range(1, min(max_words, len(words) - start) + 1):
+            window = "".join(words[start : start + size])
+            if not window:
+                continue
+            entry_ids.update(postings["phonetic"].get(phonetic_key(window), ()))
+            grams = _ngrams(window)
+            shared: dict[int, int] = {}
+            for gram in grams:
+                for entry_id in postings["ngram"].get(gram, ()):
+                    shared[entry_id] = shared.get(entry_id, 0) + 1
+            entry_ids.update(
+                entry_id
+                for entry_id, count in shared.items()
+                if 2 * count / (len(grams) + index["ngram_counts"][entry_id]) >= CANDIDATE_DICE
+            )
+        candidates.append([index["entries"][entry_id] for entry_id in sorted(entry_ids)])
+    return candidates
+
+
+def relevant_glossary_context(transcript: str, state_dir: Path | None = None) -> tuple[str, int]:
+    """Glossary context for a refine prompt and the characters it saves.
+
+    Glossaries with at most ``glossary_top_k()`` entries are sent whole;
+    larger ones are cut down to the entries relevant to ``transcript``.
+    """
+    full_context = build_glossary_context()
+    top_k = glossary_top_k()
+    if not full_context or top_k == 0:
+        return full_context, 0
+    index = load_index(state_dir)
+    if len(index["entries"]) <= top_k:
+        return full_context, 0
+    context = build_glossary_context(set(select_entries(transcript, index, top_k)))
+    return context, len(full_context) - len(context)
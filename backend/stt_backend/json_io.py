@@ -8,3 +8,8 @@ from typing import Any
 def emit(payload: dict[str, Any]) -> None:
     sys.stdout.write(json.dumps(payload, ensure_ascii=False) + "\n")
     sys.stdout.flush()
+
+
+def emit_event(event: str, **fields: Any) -> None:
+    """Emit an intermediate NDJSON progress line ahead of the final payload."""
+    emit({"event": event, **fields})
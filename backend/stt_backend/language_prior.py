@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+HISTORY_FILE_NAME = "language_history.json"
+HISTORY_LIMIT = 50
+# The prior is only trusted after this many dictations...
+MIN_SAMPLES = 5
+# ...when this share of them agree on one language...
+DOMINANT_SHARE = 0.8
+# ...with at least this mean confidence.
+MIN_MEAN_CONFIDENCE = 0.6
+# Whisper's own fallback threshold: below this the decode is considered unsure.
+LOW_CONFIDENCE_LOGPROB = -1.0
+# Recent dictations checked for redetections that only confirmed the prior.
+REDETECT_WINDOW = 5
+# Sources where the language was actually detected. Runs decoded with the
+# prior only echo it back, so they must never count as evidence for it.
+DETECTED_SOURCES = ("detected", "redetected")
+
+
+def language_prior_enabled() -> bool:
+    return (os.getenv("WHISPER_CLIP_LANGUAGE_PRIOR", "1") or "").strip().lower() not in {"0", "false", "no"}
+
+
+def _history_path(state_dir: Path) -> Path:
+    return state_dir / HISTORY_FILE_NAME
+
+
+def load_language_history(state_dir: Path) -> list[dict[str, Any]]:
+    try:
+        history = json.loads(_history_path(state_dir).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    return history if isinstance(history, list) else []
+
+
+def record_language(state_dir: Path, language: str, confidence: float | None, source: str) -> None:
+    if not language or language == "auto":
+        return
+    history = load_language_history(state_dir)
+    history.append(
+        {
+            "language": language,
+            "confidence": None if confidence is None else round(confidence, 4),
+            "source": source,
+            "ts": round(time.time(), 3),
+        }
+    )
+    path = _history_path(state_dir)
+    tmp_path = path.with_suffix(".tmp")
+    try:
+        tmp_path.write_text(json.dumps(history[-HISTORY_LIMIT:]), encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def dominant_language(state_dir: Path) -> str | None:
+    """The user's usual language when the history is strong enough, else None."""
+    history = [entry for entry in load_language_history(state_dir) if entry.get("source") in DETECTED_SOURCES]
+    if len(history) < MIN_SAMPLES:
+        return None
+    counts: dict[str, int] = {}
+    for entry in history:
+        counts[entry["language"]] = counts.get(entry["language"], 0) + 1
+    language, count = max(counts.items(), key=lambda item: item[1])
+    if count / len(history) < DOMINANT_SHARE:
+        return None
+    confidences = [e["confidence"] for e in history if e["language"] == language and e.get("confidence") is not None]
+    if confidences and sum(confidences) / len(confidences) < MIN_MEAN_CONFIDENCE:
+        return None
+    return language
+
+
+def redetection_pointless(state_dir: Path, language: str) -> bool:
+    """True when recent redetections all confirmed ``language``.
+
+    Then low confidence comes from the audio, not the language, and another
+    detection pass would only double the latency. Once those entries age out
+    of the window, redetection is tried again.
+    """
+    recent = [e for e in load_language_history(state_dir)[-REDETECT_WINDOW:] if e.get("source") == "redetected"]
+    return len(recent) >= 2 and all(entry["language"] == language for entry in recent)
+
+
+def decode_confidence(segments: list[dict[str, Any]]) -> float | None:
+    """Duration-weighted mean token probability of a transcript, in 0..1."""
+    total = 0.0
+    weighted = 0.0
+    for segment in segments:
+        if segment.get("avg_logprob") is None:
+            continue
+        duration = max(float(segment.get("end", 0.0)) - float(segment.get("start", 0.0)), 0.01)
+        weighted += float(segment["avg_logprob"]) * duration
+        total += duration
+    if total == 0.0:
+        return None
+    return math.exp(weighted / total)
+
+
+def is_low_confidence(segments: list[dict[str, Any]]) -> bool:
+    confidence = decode_confidence(segments)
+    return confidence is not None and confidence < math.exp(LOW_CONFIDENCE_LOGPROB)
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from .prompt_templates import (
+    SMART_MODE_EMAIL,
+    SMART_MODE_NORMAL,
+    SMART_MODE_TECHNICAL_TICKET,
+    SMART_MODE_WORK_CHAT,
+)
+
+BREAKER_FILE_NAME = "llm_breaker.json"
+# How long the user waits for a refine before getting the raw transcript.
+REFINE_BUDGET_SEC: dict[str, float] = {
+    SMART_MODE_NORMAL: 8.0,
+    SMART_MODE_WORK_CHAT: 8.0,
+    SMART_MODE_EMAIL: 15.0,
+    SMART_MODE_TECHNICAL_TICKET: 20.0,
+}
+DEFAULT_HEDGE_DELAY_SEC = 3.0
+# Consecutive failures/timeouts before a provider is skipped, and for how long.
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_COOLDOWN_SEC = 120.0
+
+QueryFn = Callable[[str, Callable[[str], None]], str]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def refine_budget_sec(mode: str) -> float:
+    """Per-mode budget; ``WHISPER_CLIP_REFINE_BUDGET_<MODE>_SEC`` beats the global override."""
+    builtin = REFINE_BUDGET_SEC.get(mode, REFINE_BUDGET_SEC[SMART_MODE_NORMAL])
+    default = _env_float("WHISPER_CLIP_REFINE_BUDGET_SEC", builtin)
+    return _env_float(f"WHISPER_CLIP_REFINE_BUDGET_{mode.upper()}_SEC", default)
+
+
+def hedge_provider() -> str | None:
+    return (os.getenv("WHISPER_CLIP_LLM_HEDGE_PROVIDER", "") or "").strip().lower() or None
+
+
+def hedge_delay_sec() -> float:
+    return _env_float("WHISPER_CLIP_LLM_HEDGE_DELAY_SEC", DEFAULT_HEDGE_DELAY_SEC)
+
+
+class CircuitBreaker:
+    """Per-provider failure counter persisted in the state dir.
+
+    After ``BREAKER_FAILURE_THRESHOLD`` consecutive failures the provider is
+    skipped for a cooldown; the first request after it is a trial, and one
+    more failure reopens the breaker immediately.
+    """
+
+    def __init__(self, state_dir: Path | None) -> None:
+        self.path = state_dir / BREAKER_FILE_NAME if state_dir is not None else None
+        self.threshold = int(_env_float("WHISPER_CLIP_LLM_BREAKER_THRESHOLD", BREAKER_FAILURE_THRESHOLD))
+        self.cooldown_sec = _env_float("WHISPER_CLIP_LLM_BREAKER_COOLDOWN_SEC", BREAKER_COOLDOWN_SEC)
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self.path is None:
+            return {}
+        try:
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def _save(self, state: dict[str, dict[str, Any]]) -> None:
+        if self.path is None:
+            return
+        tmp_path = self.path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def is_open(self, provider: str) -> bool:
+        with self._lock:
+            entry = self._load().get(provider) or {}
+        return float(entry.get("open_until", 0.0)) > time.time()
+
+    def record_success(self, provider: str) -> None:
+        with self._lock:
+            state = self._load()
+            if state.pop(provider, None) is not None:
+                self._save(state)
+
+    def record_failure(self, provider: str, reason: str) -> None:
+        with self._lock:
+            state = self._load()
+            entry = state.setdefault(provider, {"failures": 0})
+            entry["failures"] = int(entry.get("failures", 0)) + 1
+            entry["last_error"] = reason
+            if entry["failures"] >= self.threshold:
+                entry["open_until"] = time.time() + self.cooldown_sec
+            self._save(state)
+
+
+def run_guarded(
+    query: QueryFn,
+    providers: list[str],
+    budget_sec: float,
+    hedge_after_sec: float,
+    breaker: CircuitBreaker,
+    on_delta: Callable[[str], None] | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """Run ``query`` against ``providers`` within ``budget_sec``.
+
+    The first provider starts immediately; the next one (if any) is started
+    as a hedge once ``hedge_after_sec`` passes without an answer. The first
+    non-empty answer wins. Returns ``("", info)`` with ``info["refine_skipped"]``
+    set when nothing usable arrived in time. Losing requests keep running on
+    daemon threads and are simply ignored.
+    """
+    info: dict[str, Any] = {}
+    candidates = [provider for provider in providers if not breaker.is_open(provider)]
+    if not candidates:
+        info["refine_skipped"] = "circuit_open"
+        return "", info
+
+    start = time.perf_counter()
+    deadline = start + budget_sec
+    done = threading.Condition()
+    results: dict[str, str | None] = {}
+    delta_owner: list[str] = []
+    abandoned: set[str] = set()
+    closed = threading.Event()
+
+    def _worker(provider: str) -> None:
+        def _delta(chunk: str) -> None:
+            if closed.is_set():
+                return
+            with done:
+                if not delta_owner:
+                    delta_owner.append(provider)
+                    info["llm_ttft_ms"] = int((time.perf_counter() - start) * 1000)
+                owns = delta_owner[0] == provider
+            if owns and on_delta is not None:
+                on_delta(chunk)
+
+        try:
+            text = (query(provider, _delta) or "").strip()
+            error = "" if text else "empty response"
+        except Exception as exc:
+            text, error = None, f"{type(exc).__name__}: {exc}"[:300]
+        with done:
+            # A timeout was already charged to an abandoned request.
+            charged = provider in abandoned
+        if not error:
+            breaker.record_success(provider)
+        elif not charged:
+            breaker.record_failure(provider, error)
+        with done:
+            results[provider] = text
+            done.notify_all()
+
+    started: list[str] = []
+
+    def _launch(provider: str) -> None:
+        started.append(provider)
+        threading.Thread(target=_worker, args=(provider,), name=f"llm-{provider}", daemon=True).start()
+
+    _launch(candidates[0])
+    winner: str | None = None
+    with done:
+        while True:
+            winner = next((p for p in started if results.get(p)), None)
+            if winner is not None or all(p in results for p in candidates):
+                break
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            pending_hedge = len(started) < len(candidates)
+            hedge_at = start + hedge_after_sec
+            if pending_hedge and (now >= hedge_at or all(p in results for p in started)):
+                _launch(candidates[len(started)])
+                continue
+            wake_at = min(deadline, hedge_at) if pending_hedge else deadline
+            done.wait(timeout=max(0.0, wake_at - now))
+
+    closed.set()
+    info["llm_ms"] = int((time.perf_counter() - start) * 1000)
+    if len(started) > 1:
+        info["llm_hedged"] = True
+    if winner is not None:
+        info["llm_provider"] = winner
+        return str(results[winner]), info
+
+    with done:
+        timed_out = [provider for provider in started if provider not in results]
+        abandoned.update(timed_out)
+    for provider in timed_out:
+        breaker.record_failure(provider, f"timed out after {budget_sec:g}s")
+    info["refine_skipped"] = "budget_exceeded" if timed_out else "llm_error"
+    return "", info
@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable
+
+from .audio import WHISPER_SAMPLE_RATE
+from .glossary_correction import glossary_prompt
+from .transcriber import WORKER_STATE, detect_language, init_worker, transcribe_audio
+
+# Recordings at least this long are split and decoded on a process pool.
+DEFAULT_THRESHOLD_SEC = 120.0
+CHUNK_SEC = 60.0
+# Each chunk is cut at the quietest point within this distance of its target
+# end and extended by OVERLAP_SEC on both sides, so words at a cut are decoded
+# whole by at least one chunk.
+CUT_SEARCH_SEC = 5.0
+OVERLAP_SEC = 1.5
+ENERGY_FRAME_SEC = 0.05
+# Longest word run repeated across a cut that is treated as a duplicate.
+MAX_REPEAT_WORDS = 8
+
+# Each worker holds its own model copy: about twice the checkpoint once loaded
+# plus the interpreter and torch. Workers share half of physical memory with
+# the daemon's own copy; a checkpoint not on disk yet is assumed medium-sized.
+WORKER_BASE_BYTES = 400 * 1024 * 1024
+MODEL_MEMORY_FACTOR = 2
+MEMORY_BUDGET_SHARE = 0.5
+UNKNOWN_MODEL_BYTES = 1536 * 1024 * 1024
+# A pool left idle this long is shut down, releasing its model copies; 0 shuts
+# it down as soon as a job is done.
+DEFAULT_POOL_IDLE_SEC = 120.0
+
+# The chunk pool outlives a request, so a daemon's workers load the model once
+# and stay warm until the pool idles out; a one-shot CLI process releases it on
+# exit. The lock guards it against the idle timer's thread.
+_POOL: dict[str, Any] = {}
+_POOL_LOCK = threading.RLock()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def long_audio_threshold_sec() -> float:
+    """Minimum duration for chunked decoding; 0 disables it."""
+    return _env_float("WHISPER_CLIP_LONG_AUDIO_SEC", DEFAULT_THRESHOLD_SEC)
+
+
+def pool_idle_sec() -> float:
+    return max(0.0, _env_float("WHISPER_CLIP_LONG_AUDIO_POOL_IDLE_SEC", DEFAULT_POOL_IDLE_SEC))
+
+
+def _physical_memory_bytes() -> int | None:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def model_memory_bytes(model_name: str, model_dir: Path) -> int:
+    """Rough resident size of one loaded copy of ``model_name``."""
+    from .engines import get_engine
+
+    checkpoint = get_engine().checkpoint_fingerprint(model_name, model_dir) or {}
+    return MODEL_MEMORY_FACTOR * int(checkpoint.get("source_size") or UNKNOWN_MODEL_BYTES)
+
+
+def long_audio_workers(model_bytes: int | None = None) -> int:
+    """Pool size: ``WHISPER_CLIP_LONG_AUDIO_WORKERS``, or by default a share of
+    the cores capped by how many model copies of ``model_bytes`` fit in memory."""
+    cores = os.cpu_count() or 1
+    # Fewer, fatter workers: each one holds a model copy and runs torch threads.
+    default = min(cores, max(2, cores // 4))
+    memory = _physical_memory_bytes()
+    if model_bytes is not None and memory:
+        budget = memory * MEMORY_BUDGET_SHARE - model_bytes
+        default = min(default, int(budget // (WORKER_BASE_BYTES + model_bytes)))
+    return max(1, int(_env_float("WHISPER_CLIP_LONG_AUDIO_WORKERS", default)))
+
+
+def use_long_audio(sample_count: int, model_name: str, model_dir: Path) -> bool:
+    """Whether a clip is long enough, and the machine big enough, to chunk."""
+    threshold_sec = long_audio_threshold_sec()
+    if threshold_sec <= 0 or sample_count < threshold_sec * WHISPER_SAMPLE_RATE:
+        return False
+    return long_audio_workers(model_memory_bytes(model_name, model_dir)) > 1
+
+
+def _chunk_pool(
+    model_name: str, model_dir: Path, workers: int, torch_threads: int
+) -> tuple[ProcessPoolExecutor, bool]:
+    """The chunk pool for this model and whether it was already running.
+    Call with ``_POOL_LOCK`` held; a pending idle shutdown is cancelled."""
+    from .engines import selected_engine_name
+
+    timer = _POOL.pop("idle_timer", None)
+    if timer is not None:
+        timer.cancel()
+    key = (selected_engine_name(), model_name, str(model_dir), workers, torch_threads)
+    if _POOL.get("key") == key:
+        return _POOL["pool"], True
+    shutdown_chunk_pool()
+    _POOL.update(
+        key=key,
+        pool=ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=init_worker,
+            initargs=(model_name, str(model_dir), "auto", torch_threads, None),
+        ),
+    )
+    return _POOL["pool"], False
+
+
+def _release_chunk_pool() -> None:
+    """Arm the idle shutdown of a pool that just finished a job."""
+    idle_sec = pool_idle_sec()
+    with _POOL_LOCK:
+        if idle_sec <= 0:
+            shutdown_chunk_pool()
+            return
+        timer = threading.Timer(idle_sec, _shutdown_idle_pool)
+        timer.daemon = True
+        _POOL["idle_timer"] = timer
+        timer.start()
+
+
+def _shutdown_idle_pool() -> None:
+    with _POOL_LOCK:
+        # A job that started meanwhile cancelled (and removed) this timer.
+        if _POOL.get("idle_timer") is threading.current_thread():
+            shutdown_chunk_pool()
+
+
+def _pool_size(model_name: str, model_dir: Path) -> tuple[int, int]:
+    """Worker count and torch threads per worker."""
+    workers = long_audio_workers(model_memory_bytes(model_name, model_dir))
+    return workers, max(1, (os.cpu_count() or 1) // workers)
+
+
+def warm_chunk_pool(model_name: str, model_dir: Path) -> None:
+    """Start every pool worker and load the model in it ahead of a request."""
+    workers, torch_threads = _pool_size(model_name, model_dir)
+    with _POOL_LOCK:
+        pool, _warm = _chunk_pool(model_name, model_dir, workers, torch_threads)
+    try:
+        for future in [pool.submit(os.getpid) for _ in range(workers)]:
+            future.result()
+    finally:
+        _release_chunk_pool()
+
+
+def shutdown_chunk_pool() -> None:
+    with _POOL_LOCK:
+        timer = _POOL.get("idle_timer")
+        pool = _POOL.get("pool")
+        _POOL.clear()
+    if timer is not None and timer is not threading.current_thread():
+        timer.cancel()
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def plan_chunks(samples, sample_rate: int = WHISPER_SAMPLE_RATE) -> list[dict[str, int]]:
+    """Split ``samples`` into overlapping chunks cut at low-energy points.
+
+    Each chunk is ``{"start", "end", "keep_start", "keep_end"}`` in samples:
+    ``start``/``end`` is the audio to decode, ``keep_*`` the part of the
+    timeline this chunk is authoritative for (the keep ranges tile the clip).
+    """
+    import numpy as np
+
+    total = int(samples.size)
+    frame = max(1, int(ENERGY_FRAME_SEC * sample_rate))
+    frame_count = total // frame
+    energy = np.square(samples[: frame_count * frame].reshape(frame_count, frame), dtype=np.float64).mean(axis=1)
+
+    cuts = [0]
+    target = int(CHUNK_SEC * sample_rate)
+    search = int(CUT_SEARCH_SEC * sample_rate)
+    while total - cuts[-1] > target + search:
+        low = (cuts[-1] + target - search) // frame
+        high = min((cuts[-1] + target + search) // frame, frame_count)
+        quietest = low + int(np.argmin(energy[low:high]))
+        cuts.append(quietest * frame + frame // 2)
+    cuts.append(total)
+
+    overlap = int(OVERLAP_SEC * sample_rate)
+    return [
+        {
+            "start": max(0, keep_start - overlap),
+            "end": min(total, keep_end + overlap),
+            "keep_start": keep_start,
+            "keep_end": keep_end,
+        }
+        for keep_start, keep_end in zip(cuts, cuts[1:])
+    ]
+
+
+def _transcribe_chunk(
+    index: int, samples, language: str, preset: str | None, initial_prompt: str | None
+) -> dict[str, Any]:
+    result = transcribe_audio(
+        audio=samples,
+        model_name=WORKER_STATE["model_name"],
+        model_dir=WORKER_STATE["model_dir"],
+        language=language,
+        preset=preset,
+        initial_prompt=initial_prompt,
+    )
+    keys = ("start", "end", "text", "avg_logprob", "no_speech_prob")
+    return {
+        "index": index,
+        "language": result["language"],
+        "latency_ms": result["latency_ms"],
+        "segments": [{key: segment[key] for key in keys if key in segment} for segment in result["segments"]],
+    }
+
+
+def _detect_chunk_language(samples) -> tuple[str, float]:
+    return detect_language(samples, WORKER_STATE["model_name"], WORKER_STATE["model_dir"])
+
+
+def _words(text: str) -> list[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def _drop_repeated_prefix(previous_text: str, segment: dict[str, Any]) -> dict[str, Any] | None:
+    """Remove words at the start of ``segment`` that repeat the end of ``previous_text``."""
+    tail = _words(previous_text)[-MAX_REPEAT_WORDS:]
+    head_tokens = segment["text"].split()
+    head = [(_words(token) or [""])[0] for token in head_tokens]
+    for size in range(min(len(tail), len(head)), 1, -1):
+        if tail[-size:] == head[:size]:
+            remaining = " ".join(head_tokens[size:])
+            return {**segment, "text": " " + remaining} if remaining else None
+    return segment
+
+
+def merge_chunk(
+    merged: list[dict[str, Any]], chunk: dict[str, int], result: dict[str, Any], sample_rate: int
+) -> list[dict[str, Any]]:
+    """Shift a chunk's segments onto the clip timeline, keep the ones centred
+    in its keep range and drop words repeated across the cut. Returns the
+    newly added segments."""
+    offset = chunk["start"] / sample_rate
+    keep_start, keep_end = chunk["keep_start"] / sample_rate, chunk["keep_end"] / sample_rate
+    added: list[dict[str, Any]] = []
+    for segment in result["segments"]:
+        start, end = offset + float(segment["start"]), offset + float(segment["end"])
+        if not keep_start <= (start + end) / 2 < keep_end:
+            continue
+        shifted: dict[str, Any] | None = {**segment, "id": len(merged) + len(added), "start": start, "end": end}
+        if not added and merged:
+            shifted = _drop_repeated_prefix(merged[-1]["text"], shifted)
+        if shifted is not None:
+            added.append(shifted)
+    merged.extend(added)
+    return added
+
+
+def transcribe_long_audio(
+    samples,
+    model_name: str,
+    model_dir: Path,
+    language: str,
+    preset: str | None = None,
+    on_segment: Callable[[dict[str, Any]], None] | None = None,
+    cache_dir: Path | None = None,
+) -> dict[str, Any]:
+    """Decode a long 16 kHz clip as overlapping chunks on a process pool.
+
+    Segments are merged (and handed to ``on_segment``) in timeline order as
+    soon as every earlier chunk is done. With ``language == "auto"`` the
+    language is detected once, on the first chunk, and every chunk is decoded
+    in it. The pool is kept for later calls with the same model until it
+    idles out (see ``bench --long-audio`` for the speedup over a single
+    pass). Results go through the transcript cache like single-pass ones.
+    """
+    from .engines import get_engine
+    from .transcript_cache import TranscriptCache, audio_cache_key, transcript_cache_enabled
+
+    runtime = get_engine()
+    cache_key = None
+    if cache_dir is not None and transcript_cache_enabled():
+        options = runtime.decode_options(model_name, language, preset, glossary_prompt())
+        checkpoint = runtime.checkpoint_fingerprint(model_name, model_dir)
+        cache_key = audio_cache_key(samples, model_name, {**options, "chunk_sec": CHUNK_SEC}, checkpoint)
+        with TranscriptCache(cache_dir) as cache:
+            cached = cache.get(cache_key)
+        if cached is not None:
+            if on_segment is not None:
+                for segment in cached["segments"]:
+                    on_segment(segment)
+            return {
+                "text": cached["text"],
+                "latency_ms": 0,
+                "model_downloaded": False,
+                "language": cached["language"] or language,
+                "segments": cached["segments"],
+                "cache_hit": True,
+            }
+
+    # Download once here rather than racing in every worker.
+    model_downloaded = not runtime.is_available(model_name=model_name, model_dir=model_dir)
+    if model_downloaded:
+        runtime.download(model_name=model_name, model_dir=model_dir)
+
+    chunks = plan_chunks(samples)
+    # Sized by configuration rather than chunk count so clips of any length
+    # share one pool.
+    workers, torch_threads = _pool_size(model_name, model_dir)
+    initial_prompt = glossary_prompt()
+    start = time.time()
+    with _POOL_LOCK:
+        pool, pool_warm = _chunk_pool(model_name, model_dir, workers, torch_threads)
+    merged: list[dict[str, Any]] = []
+    results: dict[int, dict[str, Any]] = {}
+    next_index = 0
+    probability = None
+    try:
+        if language == "auto":
+            first = samples[chunks[0]["start"] : chunks[0]["end"]]
+            language, probability = pool.submit(_detect_chunk_language, first).result()
+        pending = {
+            pool.submit(
+                _transcribe_chunk, index, samples[chunk["start"] : chunk["end"]], language, preset, initial_prompt
+            )
+            for index, chunk in enumerate(chunks)
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results[result["index"]] = result
+            while next_index in results:
+                added = merge_chunk(merged, chunks[next_index], results[next_index], WHISPER_SAMPLE_RATE)
+                if on_segment is not None:
+                    for segment in added:
+                        on_segment(segment)
+                next_index += 1
+    except BaseException:
+        # A failed or interrupted run may leave workers busy or dead.
+        shutdown_chunk_pool()
+        raise
+    _release_chunk_pool()
+    wall_ms = int((time.time() - start) * 1000)
+
+    inference_ms = sum(result["latency_ms"] for result in results.values())
+    payload = {
+        "text": "".join(segment["text"] for segment in merged).strip(),
+        "latency_ms": wall_ms,
+        "model_downloaded": model_downloaded,
+        "language": language,
+        "segments": merged,
+        "language_probability": probability,
+        "long_audio": {
+            "chunks": len(chunks),
+            "workers": workers,
+            "torch_threads": torch_threads,
+            "cpu_count": os.cpu_count(),
+            "audio_sec": round(samples.size / WHISPER_SAMPLE_RATE, 3),
+            "chunk_inference_ms": inference_ms,
+            "wall_ms": wall_ms,
+            "pool_warm": pool_warm,
+        },
+    }
+    if cache_key is not None:
+        payload["cache_hit"] = False
+        with TranscriptCache(cache_dir) as cache:
+            cache.put(cache_key, payload["text"], payload["language"], payload["segments"])
+    return payload
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pickle
+import time
+import warnings
+from pathlib import Path
+from typing import Any
+
+from .logging_utils import LOGGER_NAME
+
+ARTIFACT_SUFFIX = ".mmap.pt"
+META_SUFFIX = ".mmap.json"
+# Version 2 dropped float16 artifacts: CPU inference needs float32, and
+# upcasting on load copied every mapped tensor into anonymous memory.
+ARTIFACT_FORMAT_VERSION = 2
+# ``--model small-int8`` selects the dynamically quantized variant of ``small``.
+QUANTIZED_MODEL_SUFFIX = "-int8"
+QUANTIZED_ARTIFACT_SUFFIX = ".int8.pt"
+QUANTIZED_META_SUFFIX = ".int8.json"
+# Version 2 stores a state dict instead of a pickled module.
+QUANTIZED_FORMAT_VERSION = 2
+
+
+def checkpoint_path(model_name: str, model_dir: Path) -> Path:
+    """Return where whisper keeps the ``.pt`` checkpoint for ``model_name``."""
+    import whisper
+
+    if model_name in whisper._MODELS:  # type: ignore[attr-defined]
+        return model_dir / os.path.basename(whisper._MODELS[model_name])  # type: ignore[attr-defined]
+    return Path(model_name).expanduser()
+
+
+def split_quantized_name(model_name: str) -> tuple[str, bool]:
+    """Return ``(base_model_name, is_int8)`` for names like ``small-int8``."""
+    if model_name.endswith(QUANTIZED_MODEL_SUFFIX):
+        return model_name[: -len(QUANTIZED_MODEL_SUFFIX)], True
+    return model_name, False
+
+
+def artifact_paths(model_name: str, model_dir: Path) -> tuple[Path, Path]:
+    stem = checkpoint_path(model_name, model_dir).stem
+    return model_dir / f"{stem}{ARTIFACT_SUFFIX}", model_dir / f"{stem}{META_SUFFIX}"
+
+
+def _source_fingerprint(source: Path) -> dict[str, int]:
+    stat = source.stat()
+    return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+
+def checkpoint_fingerprint(model_name: str, model_dir: Path) -> dict[str, Any] | None:
+    """Size and mtime of the checkpoint behind ``model_name`` (None when missing),
+    so anything derived from it can tell when it was replaced."""
+    source = checkpoint_path(split_quantized_name(model_name)[0], model_dir)
+    return {"path": str(source), **_source_fingerprint(source)} if source.is_file() else None
+
+
+def _read_meta(meta_path: Path) -> dict[str, Any] | None:
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def compiled_artifact_is_fresh(model_name: str, model_dir: Path) -> bool:
+    source = checkpoint_path(model_name, model_dir)
+    artifact_path, meta_path = artifact_paths(model_name, model_dir)
+    if not source.is_file() or not artifact_path.is_file():
+        return False
+    meta = _read_meta(meta_path)
+    if not meta or meta.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        return False
+    fingerprint = _source_fingerprint(source)
+    return all(meta.get(key) == value for key, value in fingerprint.items())
+
+
+def compile_model(model_name: str, model_dir: Path) -> dict[str, Any]:
+    """Convert a whisper checkpoint into a memory-mappable artifact.
+
+    The original ``.pt`` files use legacy pickle serialization that has to be
+    read and copied in full. The artifact is a float32 zipfile-format state
+    dict that ``torch.load(mmap=True)`` can map straight into the model's
+    parameters; float32 is what CPU inference runs in, so nothing is copied.
+    """
+    import torch
+    import whisper
+
+    source = checkpoint_path(model_name, model_dir)
+    if model_name in whisper._MODELS and not source.is_file():  # type: ignore[attr-defined]
+        whisper._download(whisper._MODELS[model_name], str(model_dir), False)  # type: ignore[attr-defined]
+    if not source.is_file():
+        raise RuntimeError(f"Model checkpoint not found: {source}")
+
+    start = time.time()
+    checkpoint = torch.load(str(source), map_location="cpu", weights_only=True)
+    state_dict = {
+        key: (tensor.float() if tensor.is_floating_point() else tensor).contiguous()
+        for key, tensor in checkpoint["model_state_dict"].items()
+    }
+
+    artifact_path, meta_path = artifact_paths(model_name, model_dir)
+    tmp_path = artifact_path.with_suffix(artifact_path.suffix + ".tmp")
+    torch.save({"dims": checkpoint["dims"], "model_state_dict": state_dict}, str(tmp_path))
+    os.replace(tmp_path, artifact_path)
+
+    meta = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "model": model_name,
+        "source": str(source),
+        "dtype": "float32",
+        "torch_version": torch.__version__,
+        **_source_fingerprint(source),
+    }
+    meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return {
+        "artifact_path": str(artifact_path),
+        "dtype": "float32",
+        "size_bytes": artifact_path.stat().st_size,
+        "source_size_bytes": meta["source_size"],
+        "compile_ms": int((time.time() - start) * 1000),
+    }
+
+
+def _materialize_runtime_buffers(model, dims) -> None:
+    """Recreate non-persistent buffers that are not part of the state dict."""
+    import torch
+
+    mask = torch.empty(dims.n_text_ctx, dims.n_text_ctx).fill_(-float("inf")).triu_(1)
+    model.decoder.register_buffer("mask", mask, persistent=False)
+
+    all_heads = torch.zeros(dims.n_text_layer, dims.n_text_head, dtype=torch.bool)
+    all_heads[dims.n_text_layer // 2 :] = True
+    model.register_buffer("alignment_heads", all_heads.to_sparse(), persistent=False)
+
+
+def _build_meta_skeleton(dims):
+    """Mirror ``Whisper.__init__`` with encoder/decoder weights on the meta device.
+
+    ``Whisper(dims)`` itself cannot be built under ``torch.device("meta")``
+    because it sparsifies the alignment-head mask, which has no meta kernel.
+    """
+    import torch
+    from whisper.model import AudioEncoder, TextDecoder, Whisper
+
+    model = Whisper.__new__(Whisper)
+    torch.nn.Module.__init__(model)
+    model.dims = dims
+    with torch.device("meta"):
+        model.encoder = AudioEncoder(
+            dims.n_mels, dims.n_audio_ctx, dims.n_audio_state, dims.n_audio_head, dims.n_audio_layer
+        )
+        model.decoder = TextDecoder(
+            dims.n_vocab, dims.n_text_ctx, dims.n_text_state, dims.n_text_head, dims.n_text_layer
+        )
+    return model
+
+
+def load_compiled_model(model_name: str, model_dir: Path):
+    """Load the memory-mapped artifact, or return ``None`` if it is missing/stale.
+
+    Stale artifacts (the source checkpoint changed since compilation) are
+    removed so the caller falls back to ``whisper.load_model``.
+    """
+    artifact_path, meta_path = artifact_paths(model_name, model_dir)
+    if not artifact_path.is_file():
+        return None
+    if not compiled_artifact_is_fresh(model_name, model_dir):
+        artifact_path.unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
+        return None
+
+    import torch
+    import whisper
+    from whisper.model import ModelDimensions, Whisper
+
+    checkpoint = torch.load(str(artifact_path), map_location="cpu", mmap=True, weights_only=True)
+    dims = ModelDimensions(**checkpoint["dims"])
+
+    # Build the module skeleton without allocating weights, then adopt the
+    # mapped tensors directly instead of copying them into fresh parameters.
+    model = None
+    try:
+        model = _build_meta_skeleton(dims)
+        model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+        _materialize_runtime_buffers(model, dims)
+        if any(tensor.is_meta for tensor in list(model.parameters()) + list(model.buffers())):
+            raise RuntimeError("tensors left on the meta device")
+    except Exception as exc:
+        logging.getLogger(LOGGER_NAME).warning(
+            "Memory-mapped load of %s failed, allocating the model in full: %s: %s",
+            artifact_path,
+            type(exc).__name__,
+            exc,
+        )
+        model = Whisper(dims)
+        model.load_state_dict(checkpoint["model_state_dict"])
+
+    alignment_heads = whisper._ALIGNMENT_HEADS.get(model_name)  # type: ignore[attr-defined]
+    if alignment_heads is not None:
+        model.set_alignment_heads(alignment_heads)
+    return model
+
+
+def quantized_artifact_paths(model_name: str, model_dir: Path) -> tuple[Path, Path]:
+    stem = checkpoint_path(model_name, model_dir).stem
+    return model_dir / f"{stem}{QUANTIZED_ARTIFACT_SUFFIX}", model_dir / f"{stem}{QUANTIZED_META_SUFFIX}"
+
+
+def quantized_engine() -> str:
+    """Select torch's quantized engine (once, when none is set) and return it.
+
+    Both the artifact's freshness check and quantization go through here, so
+    the engine recorded in the meta is the one the weights were packed for.
+    """
+    import torch
+
+    if torch.backends.quantized.engine == "none":
+        engines = torch.backends.quantized.supported_engines
+        torch.backends.quantized.engine = "qnnpack" if "qnnpack" in engines else engines[0]
+    return torch.backends.quantized.engine
+
+
+def quantize_model(model):
+    """Int8 dynamic quantization of every linear layer (weights int8, activations
+    quantized on the fly). Convolutions and the tied token embedding stay float32.
+    """
+    import torch
+    from whisper.model import Linear as WhisperLinear
+
+    model = model.float().eval()
+    for module in model.modules():
+        # Whisper's Linear only adds a dtype cast in forward(), which is a
+        # no-op in float32; quantize_dynamic only accepts plain nn.Linear.
+        if type(module) is WhisperLinear:
+            module.__class__ = torch.nn.Linear
+    quantized_engine()
+    with warnings.catch_warnings():
+        # torch.ao quantization emits deprecation notices on every call.
+        warnings.simplefilter("ignore", UserWarning)
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _quantized_meta(source: Path) -> dict[str, Any]:
+    import torch
+
+    return {
+        "format_version": QUANTIZED_FORMAT_VERSION,
+        # Packed int8 weights are specific to the torch build and quantized engine.
+        "torch_version": torch.__version__,
+        "engine": quantized_engine(),
+        **_source_fingerprint(source),
+    }
+
+
+def _quantized_skeleton(dims):
+    """An int8 model with the right structure, ready for ``load_state_dict``.
+
+    Built from the meta skeleton with zeroed (not randomly initialized)
+    weights, since every one of them is overwritten by the saved state.
+    """
+    import torch
+
+    model = _build_meta_skeleton(dims).to_empty(device="cpu")
+    with torch.no_grad():
+        for param in model.parameters():
+            param.zero_()
+    _materialize_runtime_buffers(model, dims)
+    return quantize_model(model)
+
+
+def _load_quantized_artifact(artifact_path: Path, model_name: str):
+    import torch
+    import whisper
+    from whisper.model import ModelDimensions
+
+    checkpoint = torch.load(str(artifact_path), map_location="cpu", weights_only=True)
+    dims = ModelDimensions(**checkpoint["dims"])
+    model = _quantized_skeleton(dims)
+    model.load_state_dict(checkpoint["model_state_dict"])
+    alignment_heads = whisper._ALIGNMENT_HEADS.get(model_name)  # type: ignore[attr-defined]
+    if alignment_heads is not None:
+        model.set_alignment_heads(alignment_heads)
+    return model
+
+
+def load_quantized_model(model_name: str, model_dir: Path, load_float):
+    """Return the int8 variant of ``model_name``, building and caching it if needed.
+
+    ``load_float`` loads the float model; it is only called on a cache miss.
+    The artifact is a plain state dict (loaded with ``weights_only=True``,
+    never unpickling modules) and is rebuilt when the source checkpoint or
+    torch changes, or when it cannot be read.
+    """
+    import dataclasses
+
+    import torch
+
+    artifact_path, meta_path = quantized_artifact_paths(model_name, model_dir)
+    source = checkpoint_path(model_name, model_dir)
+    if artifact_path.is_file() and source.is_file() and _read_meta(meta_path) == _quantized_meta(source):
+        try:
+            return _load_quantized_artifact(artifact_path, model_name)
+        except (OSError, RuntimeError, KeyError, TypeError, pickle.UnpicklingError) as exc:
+            logging.getLogger(LOGGER_NAME).warning(
+                "Discarding unreadable int8 artifact %s: %s: %s", artifact_path, type(exc).__name__, exc
+            )
+
+    model = quantize_model(load_float())
+    tmp_path = artifact_path.with_suffix(artifact_path.suffix + ".tmp")
+    torch.save({"dims": dataclasses.asdict(model.dims), "model_state_dict": model.state_dict()}, str(tmp_path))
+    os.replace(tmp_path, artifact_path)
+    meta_path.write_text(json.dumps(_quantized_meta(source), indent=2), encoding="utf-8")
+    return model
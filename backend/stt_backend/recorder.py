@@ -3,13 +3,36 @@ from __future__ import annotations
 import json
 import os
 import signal
+import socket
 import subprocess
 import sys
+import tempfile
 import time
 from pathlib import Path
-from threading import Event
+from threading import Event, Thread
+
+from .ring_buffer import AudioRingBuffer
+from .streaming import StreamingTranscriber
 
 STATE_FILE_NAME = "recording_session.json"
+STANDBY_FILE_NAME = "standby_capture.json"
+# AF_UNIX paths are limited to ~104 bytes on macOS.
+MAX_SOCKET_PATH_BYTES = 100
+# An unused standby worker exits after this long so it never lingers forever.
+STANDBY_IDLE_TIMEOUT_SEC = 30 * 60
+STANDBY_BEGIN_TIMEOUT_SEC = 2.0
+# PortAudio snapshots the device list when it initializes; a standby claimed
+# after idling longer than this re-reads it, so the current default input
+# (e.g. a headset plugged in meanwhile) is used.
+STANDBY_DEVICE_REFRESH_SEC = 60.0
+# A control peer that connects but stalls must not hold up the stop handshake.
+CONTROL_READ_TIMEOUT_SEC = 2.0
+CAPTURE_BLOCK_FRAMES = 1024
+# Audio the ring holds while the writer thread is stalled (e.g. on disk I/O)
+# before frames are dropped; the writer drains it in blocks of this length.
+RING_BUFFER_SEC = 10.0
+WRITER_BLOCK_SEC = 0.5
+WRITER_POLL_SEC = 0.05
 
 
 def _state_path(state_dir: Path) -> Path:
@@ -35,6 +58,18 @@ def clear_state(state_dir: Path) -> None:
 
 
 def process_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    # A long-lived parent (the backend daemon) must reap capture children it
+    # spawned, otherwise they linger as zombies and still answer signal 0.
+    if os.name != "nt":
+        try:
+            reaped_pid, _ = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            pass
+        else:
+            if reaped_pid == pid:
+                return False
     try:
         os.kill(pid, 0)
     except OSError:
@@ -42,12 +77,183 @@ def process_alive(pid: int) -> bool:
     return True
 
 
+def control_socket_path(state_dir: Path, token: str) -> Path:
+    path = state_dir / f"capture_{token}.sock"
+    if len(os.fsencode(str(path))) < MAX_SOCKET_PATH_BYTES:
+        return path
+    return Path(tempfile.gettempdir()) / f"whisperclip_capture_{token}.sock"
+
+
+def _send_control_command(control_path: Path, command: dict, timeout_sec: float) -> dict | None:
+    """Send one JSON command to a capture process and wait for its reply.
+
+    Returns ``None`` if the capture process has no reachable control socket,
+    so callers can fall back to signals.
+    """
+    if not hasattr(socket, "AF_UNIX") or not control_path.exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout_sec)
+            sock.connect(str(control_path))
+            sock.sendall((json.dumps(command) + "\n").encode("utf-8"))
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+    try:
+        return json.loads(line.decode("utf-8"))
+    except ValueError:
+        return None
+
+
+def _open_control_socket(control_path: Path | None) -> socket.socket | None:
+    if control_path is None or not hasattr(socket, "AF_UNIX"):
+        return None
+    control_path.unlink(missing_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(control_path))
+    os.chmod(control_path, 0o600)
+    server.listen(4)
+    return server
+
+
+def _serve_control(server: socket.socket, stop_event: Event, stop_requests: list[socket.socket]) -> None:
+    while True:
+        try:
+            conn, _ = server.accept()
+        except OSError:
+            return
+        try:
+            conn.settimeout(CONTROL_READ_TIMEOUT_SEC)
+            with conn.makefile("rb") as stream:
+                command = json.loads(stream.readline().decode("utf-8") or "{}")
+        except (OSError, ValueError):
+            conn.close()
+            continue
+        if command.get("cmd") == "stop":
+            # Acknowledged from the main thread once the WAV is closed.
+            stop_requests.append(conn)
+            stop_event.set()
+        else:
+            try:
+                conn.sendall(b'{"status": "error", "error": "unknown_command"}\n')
+            finally:
+                conn.close()
+
+
+def standby_enabled() -> bool:
+    return (os.getenv("WHISPER_CLIP_STANDBY", "1") or "").strip().lower() not in {"0", "false", "no"}
+
+
+def _standby_idle_timeout_sec() -> float:
+    return float(os.getenv("WHISPER_CLIP_STANDBY_IDLE_SEC", str(STANDBY_IDLE_TIMEOUT_SEC)))
+
+
+def _standby_path(state_dir: Path) -> Path:
+    return state_dir / STANDBY_FILE_NAME
+
+
+def _spawn_capture(args: list[str]) -> subprocess.Popen:
+    cmd = [sys.executable, "-m", "stt_backend", "_capture", *args]
+    popen_kwargs = {
+        "stdout": subprocess.DEVNULL,
+        "stderr": subprocess.DEVNULL,
+        "stdin": subprocess.DEVNULL,
+        "start_new_session": True,
+    }
+    if os.name == "nt":
+        popen_kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP  # type: ignore[attr-defined]
+    return subprocess.Popen(cmd, **popen_kwargs)
+
+
+def ensure_standby(state_dir: Path, sample_rate: int, channels: int) -> dict | None:
+    """Make sure an initialized capture worker is waiting for the next session."""
+    if not standby_enabled():
+        return None
+
+    path = _standby_path(state_dir)
+    standby = _load_standby(path) if path.exists() else None
+    if standby is not None:
+        if (
+            process_alive(int(standby.get("pid", -1)))
+            and standby.get("sample_rate") == sample_rate
+            and standby.get("channels") == channels
+        ):
+            return standby
+        _discard_standby(standby)
+
+    token = f"standby_{int(time.time() * 1000)}"
+    control_path = control_socket_path(state_dir, token)
+    proc = _spawn_capture(
+        [
+            "--standby",
+            "--sample-rate",
+            str(sample_rate),
+            "--channels",
+            str(channels),
+            "--control-socket",
+            str(control_path),
+        ]
+    )
+    standby = {
+        "pid": proc.pid,
+        "control_socket": str(control_path),
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "created_at": time.time(),
+    }
+    path.write_text(json.dumps(standby), encoding="utf-8")
+    return standby
+
+
+def _discard_standby(standby: dict) -> None:
+    pid = int(standby.get("pid", -1))
+    if process_alive(pid):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    if standby.get("control_socket"):
+        Path(standby["control_socket"]).unlink(missing_ok=True)
+
+
+def _load_standby(path: Path) -> dict | None:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        path.unlink(missing_ok=True)
+        return None
+
+
+def _claim_standby(state_dir: Path, sample_rate: int, channels: int) -> dict | None:
+    path = _standby_path(state_dir)
+    if not standby_enabled() or not path.exists():
+        return None
+    standby = _load_standby(path)
+    path.unlink(missing_ok=True)
+    if standby is None:
+        return None
+    if standby.get("sample_rate") != sample_rate or standby.get("channels") != channels:
+        _discard_standby(standby)
+        return None
+    if not process_alive(int(standby.get("pid", -1))):
+        _discard_standby(standby)
+        return None
+    return standby
+
+
 def start_recording(
     state_dir: Path,
     sample_rate: int,
     channels: int,
     model: str,
     language: str,
+    streaming: bool = False,
+    model_dir: Path | None = None,
+    preset: str | None = None,
 ) -> dict:
     existing = load_state(state_dir)
     if existing and process_alive(int(existing.get("pid", -1))):
@@ -57,47 +263,80 @@ def start_recording(
             "details": "A recording session is already in progress.",
         }
 
-    audio_path = state_dir / f"recording_{int(time.time() * 1000)}.wav"
-
-    cmd = [
-        sys.executable,
-        "-m",
-        "stt_backend",
-        "_capture",
-        "--audio-path",
-        str(audio_path),
-        "--sample-rate",
-        str(sample_rate),
-        "--channels",
-        str(channels),
-    ]
-
-    popen_kwargs = {
-        "stdout": subprocess.DEVNULL,
-        "stderr": subprocess.DEVNULL,
-        "stdin": subprocess.DEVNULL,
-        "start_new_session": True,
-    }
-    if os.name == "nt":
-        popen_kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP  # type: ignore[attr-defined]
-
-    proc = subprocess.Popen(cmd, **popen_kwargs)
+    started_at = time.time()
+    token = str(int(started_at * 1000))
+    audio_path = state_dir / f"recording_{token}.wav"
+    streaming = streaming and model_dir is not None
+    stream_args: list[str] = []
+    if streaming:
+        stream_args = [
+            "--stream-model",
+            model,
+            "--stream-model-dir",
+            str(model_dir),
+            "--language",
+            language,
+        ]
+        if preset is not None:
+            stream_args += ["--preset", preset]
+
+    pid = -1
+    control_path = control_socket_path(state_dir, token)
+    standby = _claim_standby(state_dir, sample_rate, channels)
+    if standby is not None:
+        begin = {
+            "cmd": "begin",
+            "audio_path": str(audio_path),
+            "stream_model": model if streaming else None,
+            "stream_model_dir": str(model_dir) if streaming else None,
+            "language": language,
+            "preset": preset,
+        }
+        reply = _send_control_command(Path(standby["control_socket"]), begin, STANDBY_BEGIN_TIMEOUT_SEC)
+        if reply and reply.get("status") == "ok":
+            pid = int(standby["pid"])
+            control_path = Path(standby["control_socket"])
+        else:
+            _discard_standby(standby)
+            standby = None
+
+    if standby is None:
+        proc = _spawn_capture(
+            [
+                "--audio-path",
+                str(audio_path),
+                "--sample-rate",
+                str(sample_rate),
+                "--channels",
+                str(channels),
+                "--control-socket",
+                str(control_path),
+                *stream_args,
+            ]
+        )
+        pid = proc.pid
 
     payload = {
-        "pid": proc.pid,
+        "pid": pid,
         "audio_path": str(audio_path),
         "sample_rate": sample_rate,
         "channels": channels,
         "model": model,
         "language": language,
-        "started_at": time.time(),
+        "preset": preset,
+        "streaming": streaming,
+        "control_socket": str(control_path),
+        "standby": standby is not None,
+        "started_at": started_at,
     }
     save_state(state_dir, payload)
     return {
         "status": "ok",
         "recording": True,
-        "pid": proc.pid,
+        "pid": pid,
         "audio_path": str(audio_path),
+        "streaming": streaming,
+        "standby": standby is not None,
     }
 
 
@@ -119,7 +358,13 @@ def stop_recording(state_dir: Path, timeout_sec: float = 6.0) -> dict:
             "details": "Stored recording state is invalid.",
         }
 
-    if process_alive(pid):
+    control_path = Path(state["control_socket"]) if state.get("control_socket") else None
+    ack = None
+    if control_path is not None and process_alive(pid):
+        # Blocks until the capture process has flushed and closed the WAV.
+        ack = _send_control_command(control_path, {"cmd": "stop"}, timeout_sec)
+
+    if ack is None and process_alive(pid):
         try:
             os.kill(pid, signal.SIGTERM)
         except ProcessLookupError:
@@ -135,6 +380,14 @@ def stop_recording(state_dir: Path, timeout_sec: float = 6.0) -> dict:
 
     audio_path = Path(state.get("audio_path", ""))
     clear_state(state_dir)
+    if control_path is not None:
+        control_path.unlink(missing_ok=True)
+    if state.get("sample_rate") and state.get("channels"):
+        ensure_standby(state_dir, int(state["sample_rate"]), int(state["channels"]))
+
+    capture = (ack or {}).get("capture")
+    if capture and capture.get("first_sample_at") and state.get("started_at"):
+        capture["start_to_first_sample_ms"] = max(0, int((capture["first_sample_at"] - state["started_at"]) * 1000))
 
     if not audio_path.exists() or audio_path.stat().st_size == 0:
         return {
@@ -152,14 +405,67 @@ def stop_recording(state_dir: Path, timeout_sec: float = 6.0) -> dict:
         "audio_path": str(audio_path),
         "model": state.get("model"),
         "language": state.get("language"),
+        "preset": state.get("preset"),
+        "streaming": bool(state.get("streaming")),
+        "stop_handshake": "ack" if ack is not None else "signal",
+        "standby": bool(state.get("standby")),
+        "capture": capture,
     }
 
 
-def capture_loop(audio_path: Path, sample_rate: int, channels: int) -> int:
+def _wait_for_begin(server: socket.socket, stop_event: Event, idle_timeout_sec: float) -> dict | None:
+    """Block a standby worker until a ``begin`` command (or idle timeout)."""
+    deadline = time.time() + idle_timeout_sec
+    server.settimeout(0.5)
+    try:
+        while not stop_event.is_set() and time.time() < deadline:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            with conn:
+                conn.settimeout(STANDBY_BEGIN_TIMEOUT_SEC)
+                try:
+                    with conn.makefile("rb") as stream:
+                        command = json.loads(stream.readline().decode("utf-8") or "{}")
+                except (OSError, ValueError):
+                    continue
+                if command.get("cmd") == "begin" and command.get("audio_path"):
+                    conn.sendall(b'{"status": "ok"}\n')
+                    return command
+                conn.sendall(b'{"status": "error", "error": "standby_not_recording"}\n')
+        return None
+    finally:
+        server.settimeout(None)
+
+
+def _refresh_input_devices(sd) -> None:
+    # sounddevice has no public re-scan; re-initializing PortAudio is the
+    # documented workaround.
+    try:
+        sd._terminate()
+        sd._initialize()
+    except AttributeError:
+        return
+    sd.query_devices(kind="input")
+
+
+def capture_loop(
+    audio_path: Path | None,
+    sample_rate: int,
+    channels: int,
+    stream_model: str | None = None,
+    stream_model_dir: Path | None = None,
+    language: str = "auto",
+    preset: str | None = None,
+    control_path: Path | None = None,
+    standby: bool = False,
+) -> int:
     import sounddevice as sd
     import soundfile as sf
 
     stop_event = Event()
+    stop_requests: list[socket.socket] = []
 
     def _stop_handler(_signum, _frame):
         stop_event.set()
@@ -167,24 +473,137 @@ def capture_loop(audio_path: Path, sample_rate: int, channels: int) -> int:
     signal.signal(signal.SIGTERM, _stop_handler)
     signal.signal(signal.SIGINT, _stop_handler)
 
+    control = _open_control_socket(control_path)
+    if standby:
+        if control is None:
+            return 1
+        # Imports above already initialized PortAudio; also warm device lookup.
+        sd.query_devices(kind="input")
+        idle_since = time.time()
+        begin = _wait_for_begin(control, stop_event, _standby_idle_timeout_sec())
+        if begin is None:
+            control.close()
+            if control_path is not None:
+                control_path.unlink(missing_ok=True)
+            return 0
+        if time.time() - idle_since > STANDBY_DEVICE_REFRESH_SEC:
+            _refresh_input_devices(sd)
+        audio_path = Path(begin["audio_path"])
+        stream_model = begin.get("stream_model")
+        stream_model_dir = Path(begin["stream_model_dir"]) if begin.get("stream_model_dir") else None
+        language = begin.get("language") or language
+        preset = begin.get("preset") or preset
+    if audio_path is None:
+        raise ValueError("capture requires --audio-path unless started with --standby")
+
     audio_path.parent.mkdir(parents=True, exist_ok=True)
+    if control is not None:
+        Thread(target=_serve_control, args=(control, stop_event, stop_requests), daemon=True).start()
+
+    streamer = None
+    if stream_model and stream_model_dir is not None:
+        streamer = StreamingTranscriber(
+            audio_path=audio_path,
+            sample_rate=sample_rate,
+            model_name=stream_model,
+            model_dir=stream_model_dir,
+            language=language,
+            preset=preset,
+        )
+        streamer.start()
+
+    ring = AudioRingBuffer(int(sample_rate * RING_BUFFER_SEC), channels)
+    flags = {"overruns": 0, "underruns": 0}
+    first_sample_at: float | None = None
+    frames_written = 0
+    max_write_ms = 0.0
+    writer_error: str | None = None
+    capture_done = Event()
+
+    def callback(indata, _frames, _time_info, status):
+        # Real-time audio thread: no I/O, no allocation, just a copy into the ring.
+        nonlocal first_sample_at
+        if first_sample_at is None:
+            first_sample_at = time.time() - len(indata) / float(sample_rate)
+        if status:
+            # The flags mark a gap around this block; its samples are still valid.
+            flags["overruns"] += int(bool(status.input_overflow))
+            flags["underruns"] += int(bool(status.input_underflow))
+        ring.push(indata)
+
+    def writer(sink) -> None:
+        nonlocal frames_written, max_write_ms, writer_error
+        block_frames = max(CAPTURE_BLOCK_FRAMES, int(sample_rate * WRITER_BLOCK_SEC))
+        while True:
+            # Checked before draining, so frames pushed just before the stream
+            # closed are still written.
+            finished = capture_done.is_set()
+            block = ring.pop(block_frames)
+            if not len(block):
+                if finished:
+                    return
+                time.sleep(WRITER_POLL_SEC)
+                continue
+            write_start = time.perf_counter()
+            try:
+                sink.write(block)
+            except Exception as exc:
+                writer_error = f"{type(exc).__name__}: {exc}"[:300]
+                return
+            max_write_ms = max(max_write_ms, (time.perf_counter() - write_start) * 1000)
+            frames_written += len(block)
+            if streamer is not None:
+                # The pause segmenter works at callback granularity.
+                for offset in range(0, len(block), CAPTURE_BLOCK_FRAMES):
+                    streamer.feed(block[offset : offset + CAPTURE_BLOCK_FRAMES])
 
     with sf.SoundFile(
         str(audio_path), mode="w", samplerate=sample_rate, channels=channels, subtype="PCM_16"
     ) as sink:
-        def callback(indata, _frames, _time_info, status):
-            if status:
-                return
-            sink.write(indata)
-
-        with sd.InputStream(
-            samplerate=sample_rate,
-            channels=channels,
-            dtype="float32",
-            callback=callback,
-            blocksize=1024,
-        ):
-            while not stop_event.is_set():
-                sd.sleep(100)
-
+        writer_thread = Thread(target=writer, args=(sink,), name="capture-writer", daemon=True)
+        writer_thread.start()
+        try:
+            with sd.InputStream(
+                samplerate=sample_rate,
+                channels=channels,
+                dtype="float32",
+                callback=callback,
+                blocksize=CAPTURE_BLOCK_FRAMES,
+            ):
+                # Event.wait returns as soon as a stop command or signal arrives;
+                # the timeout only keeps the main thread responsive to signals.
+                while not stop_event.wait(1.0):
+                    pass
+        finally:
+            capture_done.set()
+            writer_thread.join()
+
+    if streamer is not None:
+        streamer.close()
+
+    capture = {
+        "frames": frames_written,
+        "duration_sec": round(frames_written / float(sample_rate), 3),
+        "first_sample_at": first_sample_at,
+        "overruns": flags["overruns"],
+        "underruns": flags["underruns"],
+        "dropped_frames": ring.dropped_frames,
+        "ring_overflows": ring.overflows,
+        "ring_high_water_ms": int(ring.high_water_frames * 1000 / sample_rate),
+        "max_write_ms": round(max_write_ms, 1),
+    }
+    if writer_error is not None:
+        capture["writer_error"] = writer_error
+    ack = {"status": "ok", "capture": capture}
+    for conn in stop_requests:
+        try:
+            conn.sendall((json.dumps(ack) + "\n").encode("utf-8"))
+        except OSError:
+            pass
+        finally:
+            conn.close()
+    if control is not None:
+        control.close()
+        if control_path is not None:
+            control_path.unlink(missing_ok=True)
     return 0
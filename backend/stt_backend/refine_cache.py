@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from .sqlite_lru import SqliteLRUCache
+
+CACHE_FILE_NAME = "refine_cache.sqlite3"
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_TTL_SEC = 7 * 24 * 3600
+
+
+def refine_cache_enabled() -> bool:
+    return (os.getenv("WHISPER_CLIP_REFINE_CACHE", "1") or "").strip().lower() not in {"0", "false", "no"}
+
+
+def cache_key(user_query: str, provider: str, model: str) -> str:
+    payload = json.dumps([user_query, provider, model], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RefineCache(SqliteLRUCache):
+    """On-disk LRU cache of smart-refine responses with size and TTL limits.
+
+    Entries are keyed by a hash of the full LLM query plus provider and model,
+    so any change to the template, glossary or transcript is a miss.
+    """
+
+    VALUE_COLUMNS = ("response TEXT NOT NULL", "provider TEXT", "model TEXT")
+
+    def __init__(
+        self,
+        state_dir: Path,
+        max_bytes: int | None = None,
+        ttl_sec: float | None = None,
+    ) -> None:
+        super().__init__(
+            state_dir / CACHE_FILE_NAME,
+            max_bytes=max_bytes if max_bytes is not None else int(
+                os.getenv("WHISPER_CLIP_REFINE_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES))
+            ),
+            ttl_sec=ttl_sec if ttl_sec is not None else float(
+                os.getenv("WHISPER_CLIP_REFINE_CACHE_TTL_SEC", str(DEFAULT_TTL_SEC))
+            ),
+        )
+
+    def get(self, key: str) -> str | None:
+        row = self._lookup(key, ("response",))
+        return None if row is None else str(row[0])
+
+    def put(self, key: str, response: str, provider: str, model: str) -> None:
+        values = {"response": response, "provider": provider, "model": model}
+        self._store(key, values, size=len(response.encode("utf-8")))
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+RECORDING_PREFIX = "recording_"
+LOCK_FILE_NAME = "retention.lock"
+DEFAULT_MAX_AGE_DAYS = 14.0
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+DEFAULT_MAX_COUNT = 200
+CODECS = ("none", "flac", "opus")
+# soundfile (format, subtype, suffix) per transcoding codec.
+_CODEC_FORMATS = {"flac": ("FLAC", "PCM_16", ".flac"), "opus": ("OGG", "OPUS", ".ogg")}
+_TRANSCODE_BLOCK_FRAMES = 1 << 16
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def retention_enabled() -> bool:
+    return (os.getenv("WHISPER_CLIP_RETENTION", "1") or "").strip().lower() not in {"0", "false", "no"}
+
+
+def retention_policy() -> dict[str, Any]:
+    """Limits from the environment; a limit of 0 disables that rule."""
+    codec = (os.getenv("WHISPER_CLIP_RETENTION_CODEC", "none") or "").strip().lower()
+    return {
+        "max_age_days": _env_float("WHISPER_CLIP_RETENTION_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS),
+        "max_bytes": int(_env_float("WHISPER_CLIP_RETENTION_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        "max_count": int(_env_float("WHISPER_CLIP_RETENTION_MAX_COUNT", DEFAULT_MAX_COUNT)),
+        "codec": codec if codec in CODECS else "none",
+    }
+
+
+def list_recordings(state_dir: Path) -> list[Path]:
+    """Captured recordings, oldest first (sidecar files excluded)."""
+    from .audio import AUDIO_SUFFIXES
+
+    recordings = [
+        path
+        for path in state_dir.glob(f"{RECORDING_PREFIX}*")
+        if path.suffix.lower() in AUDIO_SUFFIXES and len(path.suffixes) == 1 and path.is_file()
+    ]
+    return sorted(recordings, key=lambda path: path.stat().st_mtime)
+
+
+def _sidecars(audio_path: Path) -> list[Path]:
+    from .streaming import segments_path
+
+    return [segments_path(audio_path)]
+
+
+def transcode_recording(audio_path: Path, codec: str) -> Path:
+    """Re-encode ``audio_path`` with ``codec`` and delete the original.
+
+    Written to a temporary file first, so an interrupted run never leaves a
+    truncated recording behind. The modification time is carried over to
+    keep age-based retention anchored at capture time.
+    """
+    import soundfile as sf
+
+    file_format, subtype, suffix = _CODEC_FORMATS[codec]
+    target = audio_path.with_suffix(suffix)
+    tmp_path = target.with_name(f".{target.name}.tmp")
+    stat = audio_path.stat()
+    try:
+        with sf.SoundFile(str(audio_path)) as source, sf.SoundFile(
+            str(tmp_path),
+            mode="w",
+            samplerate=source.samplerate,
+            channels=source.channels,
+            format=file_format,
+            subtype=subtype,
+        ) as sink:
+            for block in source.blocks(blocksize=_TRANSCODE_BLOCK_FRAMES, dtype="float32"):
+                sink.write(block)
+        os.utime(tmp_path, (stat.st_atime, stat.st_mtime))
+        os.replace(tmp_path, target)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    # Sidecars are keyed by stem, so they stay valid for the new suffix.
+    audio_path.unlink()
+    return target
+
+
+def _delete_recording(path: Path) -> None:
+    for sidecar in _sidecars(path):
+        sidecar.unlink(missing_ok=True)
+    path.unlink(missing_ok=True)
+
+
+def apply_retention(
+    state_dir: Path,
+    policy: dict[str, Any] | None = None,
+    keep: set[Path] | None = None,
+) -> dict[str, Any]:
+    """Delete recordings over the age/count limits, transcode the survivors,
+    then delete more until the byte budget holds.
+
+    Oldest recordings go first. Paths in ``keep`` (the active session) are
+    never touched.
+    """
+    policy = policy or retention_policy()
+    keep = {path.resolve() for path in keep or set()}
+    summary: dict[str, Any] = {"deleted": 0, "transcoded": 0, "freed_bytes": 0, "errors": []}
+
+    recordings = [path for path in list_recordings(state_dir) if path.resolve() not in keep]
+    cutoff = time.time() - policy["max_age_days"] * 86400 if policy["max_age_days"] > 0 else None
+    survivors: list[Path] = []
+    for index, path in enumerate(recordings):
+        over_count = policy["max_count"] > 0 and len(recordings) - index > policy["max_count"]
+        if over_count or (cutoff is not None and path.stat().st_mtime < cutoff):
+            summary["freed_bytes"] += path.stat().st_size
+            summary["deleted"] += 1
+            _delete_recording(path)
+        else:
+            survivors.append(path)
+
+    if policy["codec"] != "none":
+        for index, path in enumerate(survivors):
+            if path.suffix.lower() != ".wav":
+                continue
+            before = path.stat().st_size
+            try:
+                survivors[index] = transcode_recording(path, policy["codec"])
+            except Exception as exc:
+                summary["errors"].append(f"{path.name}: {type(exc).__name__}: {exc}"[:300])
+                continue
+            summary["transcoded"] += 1
+            summary["freed_bytes"] += before - survivors[index].stat().st_size
+
+    sizes = [path.stat().st_size for path in survivors]
+    total_bytes = sum(sizes)
+    deleted = 0
+    while policy["max_bytes"] > 0 and total_bytes > policy["max_bytes"] and deleted < len(survivors):
+        _delete_recording(survivors[deleted])
+        total_bytes -= sizes[deleted]
+        summary["freed_bytes"] += sizes[deleted]
+        deleted += 1
+    summary["deleted"] += deleted
+    summary.update(kept=len(survivors) - deleted, kept_bytes=total_bytes, policy=policy)
+    return summary
+
+
+def run_retention(state_dir: Path, keep: list[Path] | None = None) -> dict[str, Any] | None:
+    """One retention pass, skipped (None) when another pass holds the lock.
+
+    Besides ``keep`` (the recording the stop just returned as ``audio_path``),
+    the active session's and the newest recording are left as they are.
+    """
+    import fcntl
+
+    from .recorder import load_state
+
+    with (state_dir / LOCK_FILE_NAME).open("w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return None
+        try:
+            state = load_state(state_dir)
+        except ValueError:
+            state = None
+        kept = set(keep or []) | set(list_recordings(state_dir)[-1:])
+        if state and state.get("audio_path"):
+            kept.add(Path(state["audio_path"]))
+        return apply_retention(state_dir, keep=kept)
+
+
+def spawn_retention(state_dir: Path, keep: Path | None = None) -> None:
+    """Run a retention pass in a detached process, off the dictation path;
+    ``keep`` is left untouched."""
+    if not retention_enabled():
+        return
+    argv = [sys.executable, "-m", "stt_backend", "_retention", "--state-dir", str(state_dir)]
+    if keep is not None:
+        argv += ["--keep", str(keep)]
+    subprocess.Popen(
+        argv,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        stdin=subprocess.DEVNULL,
+        start_new_session=True,
+    )
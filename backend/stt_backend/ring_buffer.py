@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+class AudioRingBuffer:
+    """Preallocated single-producer/single-consumer frame ring.
+
+    ``push`` is called from the PortAudio callback and only copies into the
+    preallocated array; ``pop`` is called from the writer thread. Each side
+    only advances its own counter (plain int stores, atomic under the GIL),
+    so neither ever waits on a lock held by the other. When the writer falls
+    behind, the frames that do not fit are dropped and counted.
+    """
+
+    def __init__(self, capacity_frames: int, channels: int) -> None:
+        import numpy as np
+
+        self.capacity = capacity_frames
+        self._data = np.zeros((capacity_frames, channels), dtype=np.float32)
+        # Monotonic frame counters; positions in the array are taken modulo capacity.
+        self._written = 0
+        self._read = 0
+        self.dropped_frames = 0
+        self.overflows = 0
+        self.high_water_frames = 0
+
+    def fill(self) -> int:
+        return self._written - self._read
+
+    def push(self, block: Any) -> None:
+        free = self.capacity - (self._written - self._read)
+        count = len(block)
+        if count > free:
+            self.overflows += 1
+            self.dropped_frames += count - free
+            count = free
+        start = self._written % self.capacity
+        first = min(count, self.capacity - start)
+        self._data[start : start + first] = block[:first]
+        self._data[: count - first] = block[first:count]
+        self._written += count
+        self.high_water_frames = max(self.high_water_frames, self._written - self._read)
+
+    def pop(self, max_frames: int) -> Any:
+        """Copy out up to ``max_frames`` frames (empty array when drained)."""
+        import numpy as np
+
+        count = min(max_frames, self._written - self._read)
+        start = self._read % self.capacity
+        first = min(count, self.capacity - start)
+        block = np.concatenate((self._data[start : start + first], self._data[: count - first]))
+        self._read += count
+        return block
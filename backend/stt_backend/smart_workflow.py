@@ -1,31 +1,97 @@
 from __future__ import annotations
 
+from pathlib import Path
+from typing import Any, Callable
+
+from .glossary_index import relevant_glossary_context
+from .llm_guard import CircuitBreaker, hedge_delay_sec, hedge_provider, refine_budget_sec, run_guarded
 from .prompt_templates import PROMPT_TEMPLATES, SMART_MODE_NORMAL
-from .user_glossary import build_glossary_context
-from .user_llm_bridge import query_llm
+from .refine_cache import RefineCache, cache_key, refine_cache_enabled
+from .user_llm_bridge import SUPPORTED_PROVIDERS, provider_identity, query_llm
 
 
 def should_refine(mode: str, smart_refine_enabled: bool) -> bool:
     return smart_refine_enabled and mode in PROMPT_TEMPLATES
 
 
-def build_user_query(mode: str, transcript: str) -> str:
+def build_user_query(mode: str, transcript: str, glossary_context: str | None = None) -> str:
     template = PROMPT_TEMPLATES[mode].strip()
     transcript = transcript.strip()
-    glossary_context = build_glossary_context()
+    if glossary_context is None:
+        glossary_context, _ = relevant_glossary_context(transcript)
     if glossary_context:
         return f"{template}\n\n{glossary_context}\n\nUser draft:\n{transcript}"
     return f"{template}\n\nUser draft:\n{transcript}"
 
 
-def refine_transcript(transcript: str, mode: str, smart_refine_enabled: bool) -> tuple[str, bool]:
+def _guarded_query(
+    query: str,
+    mode: str,
+    primary: str,
+    state_dir: Path | None,
+    on_delta: Callable[[str], None] | None,
+) -> tuple[str, dict[str, Any]]:
+    providers = [primary]
+    hedge = hedge_provider()
+    if hedge and hedge != primary and hedge in SUPPORTED_PROVIDERS:
+        providers.append(hedge)
+    return run_guarded(
+        # Resolved at call time so callers (e.g. the bench) can stub query_llm.
+        lambda provider, delta: query_llm(query, on_delta=delta, provider=provider),
+        providers=providers,
+        budget_sec=refine_budget_sec(mode),
+        hedge_after_sec=hedge_delay_sec(),
+        breaker=CircuitBreaker(state_dir),
+        on_delta=on_delta,
+    )
+
+
+def refine_transcript(
+    transcript: str,
+    mode: str,
+    smart_refine_enabled: bool,
+    state_dir: Path | None = None,
+    on_delta: Callable[[str], None] | None = None,
+) -> tuple[str, bool, dict[str, Any]]:
+    """Refine ``transcript`` with the selected LLM within the mode's budget.
+
+    Returns ``(text, refined, info)``; ``info`` holds extra payload fields
+    (LLM timings, ``refine_skipped`` when the raw transcript is returned, and
+    the refine cache outcome, ``glossary_prompt_chars_saved`` by sending only
+    the relevant glossary entries). ``state_dir`` enables the refine cache, the
+    persistent circuit breaker and the saved glossary index. ``on_delta`` receives partial refined text
+    while it streams in.
+    """
     normalized_mode = mode or SMART_MODE_NORMAL
     if not should_refine(normalized_mode, smart_refine_enabled):
-        return transcript, False
+        return transcript, False, {}
+
+    glossary_context, chars_saved = relevant_glossary_context(transcript, state_dir)
+    query = build_user_query(normalized_mode, transcript, glossary_context)
+    provider, model = provider_identity()
+    if state_dir is None or not refine_cache_enabled():
+        refined_text, info = _guarded_query(query, normalized_mode, provider, state_dir, on_delta)
+        info["glossary_prompt_chars_saved"] = chars_saved
+        if not refined_text:
+            return transcript, False, info
+        return refined_text, True, info
+
+    key = cache_key(query, provider, model)
+    with RefineCache(state_dir) as cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, True, {
+                "refine_cache": {"hit": True, **cache.counters()},
+                "glossary_prompt_chars_saved": chars_saved,
+            }
 
-    query = build_user_query(normalized_mode, transcript)
-    refined = query_llm(query)
-    refined_text = (refined or "").strip()
+        refined_text, info = _guarded_query(query, normalized_mode, provider, state_dir, on_delta)
+        if refined_text:
+            # A hedged answer belongs to the provider that actually produced it.
+            winner, winner_model = provider_identity(info.get("llm_provider") or provider)
+            cache.put(cache_key(query, winner, winner_model), refined_text, provider=winner, model=winner_model)
+        info["refine_cache"] = {"hit": False, **cache.counters()}
+    info["glossary_prompt_chars_saved"] = chars_saved
     if not refined_text:
-        return transcript, False
-    return refined_text, True
+        return transcript, False, info
+    return refined_text, True, info
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
+
+
+class SqliteLRUCache:
+    """Size-capped LRU table of entries in a sqlite file, with optional TTL.
+
+    Subclasses declare their value columns in ``VALUE_COLUMNS`` (SQL column
+    definitions) and wrap ``_lookup``/``_store`` in typed ``get``/``put``.
+    Hit and miss counts persist alongside the entries.
+    """
+
+    VALUE_COLUMNS: tuple[str, ...] = ()
+
+    def __init__(self, path: Path, max_bytes: int, ttl_sec: float | None = None, timeout_sec: float = 2.0) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self._conn = sqlite3.connect(str(path), timeout=timeout_sec)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, "
+            + "".join(f"{column}, " for column in self.VALUE_COLUMNS)
+            + "size INTEGER NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def _bump(self, name: str) -> None:
+        self._conn.execute(
+            "INSERT INTO counters(name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def counters(self) -> dict[str, int]:
+        values = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+        return {"hits": int(values.get("hits", 0)), "misses": int(values.get("misses", 0))}
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_sec is not None and now - created_at > self.ttl_sec
+
+    def _lookup(self, key: str, columns: tuple[str, ...]) -> tuple[Any, ...] | None:
+        """``columns`` of the entry for ``key``, or None on a miss (expired entries are dropped)."""
+        now = time.time()
+        row = self._conn.execute(
+            f"SELECT {', '.join(columns)}, created_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None and self._expired(row[-1], now):
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            row = None
+        if row is None:
+            self._bump("misses")
+            self._conn.commit()
+            return None
+        self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, key))
+        self._bump("hits")
+        self._conn.commit()
+        return row[:-1]
+
+    def _store(self, key: str, values: dict[str, Any], size: int) -> None:
+        now = time.time()
+        columns = ["key", *values, "size", "created_at", "last_used"]
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO entries({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            (key, *values.values(), size, now, now),
+        )
+        self._evict(now)
+        self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_sec is not None:
+            self._conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl_sec,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until the cache fits again.
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_used ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from .audio import WHISPER_SAMPLE_RATE, load_audio, to_whisper_input
+from .glossary_correction import glossary_prompt
+from .logging_utils import LOGGER_NAME
+from .transcriber import transcribe_audio
+from .vad import trim_silence, vad_enabled
+
+# Windows are cut at pauses once they are at least MIN_WINDOW_SEC long, and
+# forcibly cut before whisper's 30 s context is exceeded.
+MIN_WINDOW_SEC = 8.0
+MAX_WINDOW_SEC = 28.0
+PAUSE_SEC = 0.6
+# Tails shorter than this carry no words worth an extra decode.
+MIN_TAIL_SEC = 0.25
+
+
+def segments_path(audio_path: Path) -> Path:
+    return audio_path.with_suffix(".segments.jsonl")
+
+
+class PauseSegmenter:
+    """Split a live sample stream into windows that end in a pause.
+
+    Blocks are fed as they arrive; ``feed`` returns ``(start, end)`` sample
+    ranges of finished windows. Silence is judged relative to both the
+    quietest and the loudest blocks of the current window so the cut adapts
+    to room noise and microphone gain.
+    """
+
+    def __init__(self, sample_rate: int) -> None:
+        self.sample_rate = sample_rate
+        self.window_start = 0
+        self.position = 0
+        self._block_ends: list[int] = []
+        self._block_rms: list[float] = []
+
+    def feed(self, block) -> list[tuple[int, int]]:
+        import numpy as np
+
+        self.position += len(block)
+        self._block_ends.append(self.position)
+        self._block_rms.append(float(np.sqrt(np.mean(np.square(block, dtype=np.float64)))) if len(block) else 0.0)
+
+        window_len = (self.position - self.window_start) / self.sample_rate
+        if window_len < MIN_WINDOW_SEC:
+            return []
+
+        rms = np.asarray(self._block_rms)
+        floor, loud = np.percentile(rms, [5, 90])
+        threshold = max(0.005, min(3.0 * float(floor), 0.25 * float(loud)))
+        cut_index = self._pause_cut_index(rms, threshold)
+        if cut_index is None and window_len >= MAX_WINDOW_SEC:
+            # No clean pause: cut at the quietest block in the second half.
+            half = len(rms) // 2
+            cut_index = half + int(np.argmin(rms[half:]))
+        if cut_index is None:
+            return []
+
+        end = self._block_ends[cut_index]
+        window = (self.window_start, end)
+        self.window_start = end
+        self._block_ends = self._block_ends[cut_index + 1 :]
+        self._block_rms = self._block_rms[cut_index + 1 :]
+        return [window]
+
+    def _pause_cut_index(self, rms, threshold: float) -> int | None:
+        if not self._block_ends:
+            return None
+        block_sec = (self._block_ends[-1] - self.window_start) / self.sample_rate / len(self._block_ends)
+        needed = max(1, int(round(PAUSE_SEC / max(block_sec, 1e-6))))
+        if len(rms) < needed or not bool((rms[-needed:] < threshold).all()):
+            return None
+        return len(rms) - 1 - needed // 2
+
+
+class StreamingTranscriber:
+    """Transcribe finished windows in the background while capture continues.
+
+    ``feed`` is called from the capture side and only enqueues the block; the
+    worker thread segments the stream, decodes each finished window and
+    appends ``{"start", "end", "text", ...}`` lines to the segments file.
+    ``start``/``end`` are frame offsets at the capture sample rate. The stop
+    side decodes only the audio after the last committed window.
+    """
+
+    def __init__(
+        self,
+        audio_path: Path,
+        sample_rate: int,
+        model_name: str,
+        model_dir: Path,
+        language: str,
+        preset: str | None = None,
+    ) -> None:
+        self.output_path = segments_path(audio_path)
+        self.sample_rate = sample_rate
+        self.model_name = model_name
+        self.model_dir = model_dir
+        self.language = language
+        self.preset = preset
+        self._blocks: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="stt-streaming", daemon=True)
+
+    def start(self) -> None:
+        self.output_path.unlink(missing_ok=True)
+        self._thread.start()
+
+    def feed(self, block) -> None:
+        self._blocks.put(block)
+
+    def close(self) -> None:
+        # Do not wait for an in-flight window: the stop side re-decodes
+        # anything that was not committed to the segments file.
+        self._blocks.put(None)
+
+    def _run(self) -> None:
+        import logging
+
+        import numpy as np
+
+        logger = logging.getLogger(LOGGER_NAME)
+        segmenter = PauseSegmenter(self.sample_rate)
+        pending: list = []
+        pending_start = 0
+        while True:
+            block = self._blocks.get()
+            if block is None:
+                return
+            mono = block.mean(axis=1) if block.ndim > 1 else block
+            pending.append(mono.astype(np.float32, copy=False))
+            for start, end in segmenter.feed(mono):
+                samples = np.concatenate(pending)
+                window = samples[start - pending_start : end - pending_start]
+                pending = [samples[end - pending_start :]]
+                pending_start = end
+                try:
+                    self._commit_window(start, end, to_whisper_input(window, self.sample_rate))
+                except Exception as exc:
+                    logger.exception("Streaming window failed start=%s end=%s: %s", start, end, exc)
+                    return
+
+    def _commit_window(self, start: int, end: int, window) -> None:
+        result = transcribe_audio(
+            audio=window,
+            model_name=self.model_name,
+            model_dir=self.model_dir,
+            language=self.language,
+            preset=self.preset,
+            initial_prompt=glossary_prompt(),
+        )
+        if self.language == "auto" and result.get("language"):
+            # Pin the language detected on the first window; short windows
+            # are otherwise prone to flip-flopping between languages.
+            self.language = str(result["language"])
+        record = {
+            "start": start,
+            "end": end,
+            "text": result["text"],
+            "language": result["language"],
+            "latency_ms": result["latency_ms"],
+        }
+        with self.output_path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_committed_windows(audio_path: Path) -> list[dict[str, Any]]:
+    """Return the contiguous run of windows committed from sample 0."""
+    path = segments_path(audio_path)
+    if not path.exists():
+        return []
+
+    windows: list[dict[str, Any]] = []
+    expected_start = 0
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            # The capture process may have been stopped mid-write.
+            break
+        if int(record.get("start", -1)) != expected_start:
+            break
+        windows.append(record)
+        expected_start = int(record["end"])
+    return windows
+
+
+def _stitch(parts: list[str]) -> str:
+    return " ".join(part.strip() for part in parts if part and part.strip())
+
+
+def finish_streaming_transcription(
+    audio_path: Path,
+    model_name: str,
+    model_dir: Path,
+    language: str,
+    preset: str | None = None,
+    on_segment: Callable[[dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """Decode only the uncommitted tail of a streamed recording and stitch.
+
+    ``on_segment`` gets the committed windows first (they are already
+    decoded), then the tail's segments as they are decoded; times are in
+    seconds from the start of the recording.
+    """
+    windows = load_committed_windows(audio_path)
+    committed_end = int(windows[-1]["end"]) if windows else 0
+    tail_offset_sec = 0.0
+    if on_segment is not None and windows:
+        import soundfile as sf
+
+        capture_rate = float(sf.info(str(audio_path)).samplerate)
+        for index, window in enumerate(windows):
+            on_segment(
+                {
+                    "id": index,
+                    "start": int(window["start"]) / capture_rate,
+                    "end": int(window["end"]) / capture_rate,
+                    "text": str(window.get("text") or ""),
+                }
+            )
+        tail_offset_sec = committed_end / capture_rate
+    if language == "auto" and windows and windows[0].get("language"):
+        language = str(windows[0]["language"])
+
+    start = time.time()
+    tail = load_audio(audio_path, start=committed_end)
+    tail_sec = len(tail) / float(WHISPER_SAMPLE_RATE)
+
+    vad_info = None
+    if vad_enabled() and tail.size:
+        tail, vad_info = trim_silence(tail)
+
+    parts = [str(window.get("text") or "") for window in windows]
+    model_downloaded = False
+    tail_has_speech = vad_info is None or vad_info["speech"]
+    if tail_has_speech and (tail_sec >= MIN_TAIL_SEC or not windows):
+        on_tail_segment = None
+        if on_segment is not None:
+
+            def on_tail_segment(segment: dict[str, Any]) -> None:
+                on_segment(
+                    {
+                        **segment,
+                        "id": len(windows) + int(segment.get("id", 0)),
+                        "start": tail_offset_sec + float(segment["start"]),
+                        "end": tail_offset_sec + float(segment["end"]),
+                    }
+                )
+
+        result = transcribe_audio(
+            audio=tail,
+            model_name=model_name,
+            model_dir=model_dir,
+            language=language,
+            preset=preset,
+            on_segment=on_tail_segment,
+            initial_prompt=glossary_prompt(),
+        )
+        parts.append(result["text"])
+        model_downloaded = result["model_downloaded"]
+        language = result["language"]
+
+    payload = {
+        "text": _stitch(parts),
+        "latency_ms": int((time.time() - start) * 1000),
+        "model_downloaded": model_downloaded,
+        "language": language,
+        "streamed_windows": len(windows),
+        "tail_sec": round(tail_sec, 3),
+    }
+    if vad_info is not None:
+        payload["vad"] = vad_info
+        payload["no_speech"] = not windows and not tail_has_speech
+    return payload
+
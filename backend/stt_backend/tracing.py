@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import math
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+HISTORY_FILE_NAME = "latency_history.jsonl"
+# When the history grows past this size it is compacted to its newest half.
+HISTORY_MAX_BYTES = 2 * 1024 * 1024
+PERCENTILES = (50, 95, 99)
+
+
+class StageTimer:
+    """Collect wall-clock spans (in ms) for the stages of one request."""
+
+    def __init__(self) -> None:
+        self._started = time.perf_counter()
+        self.spans: dict[str, int] = {}
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def add(self, name: str, elapsed_ms: float) -> None:
+        self.spans[name] = self.spans.get(name, 0) + int(round(elapsed_ms))
+
+    def as_dict(self) -> dict[str, int]:
+        return {**self.spans, "total": int(round((time.perf_counter() - self._started) * 1000))}
+
+
+def history_path(state_dir: Path) -> Path:
+    return state_dir / HISTORY_FILE_NAME
+
+
+def append_history(state_dir: Path, record: dict[str, Any]) -> None:
+    path = history_path(state_dir)
+    line = json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write(line)
+
+    if path.stat().st_size > HISTORY_MAX_BYTES:
+        lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text("".join(lines[len(lines) // 2 :]), encoding="utf-8")
+        tmp_path.replace(path)
+
+
+def load_history(state_dir: Path, limit: int | None = None) -> list[dict[str, Any]]:
+    path = history_path(state_dir)
+    if not path.exists():
+        return []
+    records: list[dict[str, Any]] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return records[-limit:] if limit else records
+
+
+def _percentile(sorted_values: list[int], pct: float) -> int:
+    # Nearest-rank percentile: always an observed value.
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _summarize(records: list[dict[str, Any]]) -> dict[str, dict[str, int]]:
+    by_stage: dict[str, list[int]] = {}
+    for record in records:
+        for stage, value in (record.get("spans") or {}).items():
+            by_stage.setdefault(stage, []).append(int(value))
+
+    summary: dict[str, dict[str, int]] = {}
+    for stage, values in sorted(by_stage.items()):
+        values.sort()
+        summary[stage] = {"count": len(values), **{f"p{p}": _percentile(values, p) for p in PERCENTILES}}
+    return summary
+
+
+def latency_stats(records: list[dict[str, Any]]) -> dict[str, Any]:
+    """Per-stage p50/p95/p99 overall, per model and per smart mode."""
+    by_model: dict[str, list[dict[str, Any]]] = {}
+    by_mode: dict[str, list[dict[str, Any]]] = {}
+    for record in records:
+        by_model.setdefault(str(record.get("model")), []).append(record)
+        by_mode.setdefault(str(record.get("mode")), []).append(record)
+
+    return {
+        "count": len(records),
+        "stages": _summarize(records),
+        "by_model": {model: _summarize(group) for model, group in sorted(by_model.items())},
+        "by_mode": {mode: _summarize(group) for mode, group in sorted(by_mode.items())},
+    }
@@ -2,52 +2,180 @@ from __future__ import annotations
 
 import time
 from pathlib import Path
+from typing import Any
+
+from .audio import load_audio
+from .engines import Engine, SegmentCallback, get_engine
+from .transcript_cache import TranscriptCache, audio_cache_key, transcript_cache_enabled
 
 _MODEL_CACHE: dict[str, object] = {}
+# Per-process job settings of a pool worker, set once by ``init_worker``.
+WORKER_STATE: dict[str, Any] = {}
 
 
-def model_is_available_locally(model_name: str, model_dir: Path) -> bool:
-    import os
-    import whisper
+def _model_cache_key(engine: Engine, model_name: str, model_dir: Path) -> str:
+    return f"{engine.name}:{model_name}:{model_dir}"
 
-    if model_name in whisper._MODELS:  # type: ignore[attr-defined]
-        url = whisper._MODELS[model_name]  # type: ignore[attr-defined]
-        checkpoint_name = os.path.basename(url)
-        return (model_dir / checkpoint_name).is_file()
 
-    # If user passes a local checkpoint file path, treat it as available when present.
-    candidate = Path(model_name).expanduser()
-    return candidate.is_file()
+def model_is_available_locally(model_name: str, model_dir: Path, engine: str | None = None) -> bool:
+    return get_engine(engine).is_available(model_name=model_name, model_dir=model_dir)
 
 
-def ensure_model_available(model_name: str, model_dir: Path) -> bool:
-    import whisper
+def ensure_model_available(model_name: str, model_dir: Path, engine: str | None = None) -> bool:
+    """Load ``model_name`` with the selected engine (cached per process).
 
-    was_available_before = model_is_available_locally(model_name=model_name, model_dir=model_dir)
-    cache_key = f"{model_name}:{model_dir}"
-    model = _MODEL_CACHE.get(cache_key)
-    if model is None:
-        model = whisper.load_model(model_name, download_root=str(model_dir))
-        _MODEL_CACHE[cache_key] = model
-    return (not was_available_before) and model_is_available_locally(model_name=model_name, model_dir=model_dir)
+    Returns True when the model had to be downloaded first. A model that is
+    already loaded returns straight away, without touching the disk.
+    """
+    runtime = get_engine(engine)
+    cache_key = _model_cache_key(runtime, model_name, model_dir)
+    if cache_key in _MODEL_CACHE:
+        return False
+    downloaded = not runtime.is_available(model_name=model_name, model_dir=model_dir)
+    if downloaded:
+        runtime.download(model_name=model_name, model_dir=model_dir)
+    _MODEL_CACHE[cache_key] = runtime.load(model_name=model_name, model_dir=model_dir)
+    return downloaded
 
 
-def transcribe_file(
-    audio_path: Path,
+def init_worker(
+    model_name: str,
+    model_dir: str,
+    language: str,
+    torch_threads: int,
+    cache_dir: str | None,
+    preset: str | None = None,
+) -> None:
+    """Process pool initializer: split the cores, load the model once and
+    keep the job settings in ``WORKER_STATE``."""
+    import torch
+
+    torch.set_num_threads(max(1, torch_threads))
+    ensure_model_available(model_name=model_name, model_dir=Path(model_dir))
+    WORKER_STATE.update(
+        model_name=model_name,
+        model_dir=Path(model_dir),
+        language=language,
+        cache_dir=Path(cache_dir) if cache_dir else None,
+        preset=preset,
+    )
+
+
+def detect_language(audio: Any, model_name: str, model_dir: Path, engine: str | None = None) -> tuple[str, float]:
+    """Language of a 16 kHz array's first 30 s and its probability, loading the model if needed."""
+    runtime = get_engine(engine)
+    ensure_model_available(model_name=model_name, model_dir=model_dir, engine=runtime.name)
+    return runtime.detect_language(_MODEL_CACHE[_model_cache_key(runtime, model_name, model_dir)], audio)
+
+
+def transcribe_audio(
+    audio: Any,
     model_name: str,
     model_dir: Path,
     language: str,
-) -> tuple[str, int, bool]:
-    model_downloaded = ensure_model_available(model_name=model_name, model_dir=model_dir)
-    cache_key = f"{model_name}:{model_dir}"
-    model = _MODEL_CACHE[cache_key]
+    cache_dir: Path | None = None,
+    engine: str | None = None,
+    preset: str | None = None,
+    on_segment: SegmentCallback | None = None,
+    initial_prompt: str | None = None,
+) -> dict[str, Any]:
+    """Transcribe a file path or a 16 kHz mono float32 array.
+
+    Paths are decoded in-process with soundfile (no ffmpeg subprocess) and
+    only fall back to the engine's own (ffmpeg) loader for unsupported formats.
+    ``engine`` defaults to ``WHISPER_CLIP_ENGINE``; ``preset`` selects a
+    ``decode_presets`` entry (None: the engine's defaults); ``on_segment``
+    receives each segment as it is decoded (cached ones are replayed);
+    ``initial_prompt`` conditions the decoder (e.g. on glossary spellings).
+    Returns a dict with ``text``, ``latency_ms`` (inference only),
+    ``model_downloaded``, ``language`` (as detected or requested), the
+    engine's ``segments``, how the audio was decoded, and ``load_ms`` (time
+    to get the model into memory, ~0 when already warm).
 
-    kwargs: dict[str, object] = {"fp16": False}
-    if language != "auto":
-        kwargs["language"] = language
+    With ``cache_dir``, decoded PCM is looked up in the transcript cache
+    first; hits skip model loading and inference and set ``cache_hit``.
+    """
+    runtime = get_engine(engine)
+
+    decode_start = time.time()
+    decoder = "array"
+    if isinstance(audio, Path):
+        try:
+            audio = load_audio(audio)
+            decoder = "soundfile"
+        except RuntimeError:
+            # Formats libsndfile cannot read still go through the engine's ffmpeg loader.
+            audio = str(audio)
+            decoder = "ffmpeg"
+    decode_ms = int((time.time() - decode_start) * 1000)
+
+    cache_key = None
+    if cache_dir is not None and decoder != "ffmpeg" and transcript_cache_enabled():
+        options = runtime.decode_options(model_name, language, preset, initial_prompt)
+        checkpoint = runtime.checkpoint_fingerprint(model_name, model_dir)
+        cache_key = audio_cache_key(audio, model_name, options, checkpoint)
+        start = time.time()
+        with TranscriptCache(cache_dir) as cache:
+            cached = cache.get(cache_key)
+        if cached is not None:
+            if on_segment is not None:
+                for segment in cached["segments"]:
+                    on_segment(segment)
+            return {
+                "text": cached["text"],
+                "latency_ms": int((time.time() - start) * 1000),
+                "model_downloaded": False,
+                "language": cached["language"] or language,
+                "segments": cached["segments"],
+                "decoder": decoder,
+                "decode_ms": decode_ms,
+                "engine": runtime.name,
+                "cache_hit": True,
+            }
+
+    load_start = time.time()
+    model_downloaded = ensure_model_available(model_name=model_name, model_dir=model_dir, engine=runtime.name)
+    model = _MODEL_CACHE[_model_cache_key(runtime, model_name, model_dir)]
+    load_ms = int((time.time() - load_start) * 1000)
 
     start = time.time()
-    result = model.transcribe(str(audio_path), **kwargs)
+    result = runtime.transcribe(model, audio, language, preset, on_segment, initial_prompt)
     latency_ms = int((time.time() - start) * 1000)
-    text = (result.get("text") or "").strip()
-    return text, latency_ms, model_downloaded
+    payload = {
+        "text": result["text"],
+        "latency_ms": latency_ms,
+        "model_downloaded": model_downloaded,
+        "language": result["language"],
+        "segments": result["segments"],
+        "language_probability": result.get("language_probability"),
+        "engine": runtime.name,
+        "decoder": decoder,
+        "decode_ms": decode_ms,
+        "load_ms": load_ms,
+    }
+    if cache_key is not None:
+        payload["cache_hit"] = False
+        with TranscriptCache(cache_dir) as cache:
+            cache.put(cache_key, payload["text"], payload["language"], payload["segments"])
+    return payload
+
+
+def transcribe_file(
+    audio_path: Path,
+    model_name: str,
+    model_dir: Path,
+    language: str,
+    cache_dir: Path | None = None,
+    engine: str | None = None,
+    preset: str | None = None,
+) -> tuple[str, int, bool]:
+    result = transcribe_audio(
+        audio=audio_path,
+        model_name=model_name,
+        model_dir=model_dir,
+        language=language,
+        cache_dir=cache_dir,
+        engine=engine,
+        preset=preset,
+    )
+    return result["text"], result["latency_ms"], result["model_downloaded"]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from .sqlite_lru import SqliteLRUCache
+
+CACHE_FILE_NAME = "transcript_cache.sqlite3"
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+
+def transcript_cache_enabled() -> bool:
+    return (os.getenv("WHISPER_CLIP_TRANSCRIPT_CACHE", "1") or "").strip().lower() not in {"0", "false", "no"}
+
+
+def audio_cache_key(
+    samples, model_name: str, options: dict[str, Any], checkpoint: dict[str, Any] | None = None
+) -> str:
+    """Hash the PCM payload together with everything that changes the output.
+
+    ``options`` must hold the language and all decoding options passed to
+    whisper, so a different setting never returns a stale transcript;
+    ``checkpoint`` identifies the model files, so a re-downloaded or replaced
+    checkpoint does not either.
+    """
+    import numpy as np
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(np.ascontiguousarray(samples, dtype=np.float32).tobytes())
+    digest.update(json.dumps([model_name, options, checkpoint], sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class TranscriptCache(SqliteLRUCache):
+    """On-disk LRU cache of transcription results with a size cap."""
+
+    VALUE_COLUMNS = ("text TEXT NOT NULL", "language TEXT", "segments TEXT NOT NULL")
+
+    def __init__(self, state_dir: Path, max_bytes: int | None = None) -> None:
+        super().__init__(
+            state_dir / CACHE_FILE_NAME,
+            max_bytes=max_bytes if max_bytes is not None else int(
+                os.getenv("WHISPER_CLIP_TRANSCRIPT_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES))
+            ),
+            timeout_sec=5.0,
+        )
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        row = self._lookup(key, ("text", "language", "segments"))
+        if row is None:
+            return None
+        return {"text": row[0], "language": row[1], "segments": json.loads(row[2])}
+
+    def put(self, key: str, text: str, language: str | None, segments: list[dict[str, Any]]) -> None:
+        encoded_segments = json.dumps(segments, ensure_ascii=False, default=float)
+        size = len(text.encode("utf-8")) + len(encoded_segments.encode("utf-8"))
+        self._store(key, {"text": text, "language": language, "segments": encoded_segments}, size)
@@ -20,10 +20,23 @@ GLOSSARY: dict[str, list[str]] = {
 }
 
 
-def build_glossary_context() -> str:
+def glossary_entries() -> list[str]:
+    """Every non-empty glossary entry once, in glossary order."""
+    entries: dict[str, None] = {}
+    for section in GLOSSARY.values():
+        for entry in section:
+            if entry and entry.strip():
+                entries.setdefault(entry.strip(), None)
+    return list(entries)
+
+
+def build_glossary_context(only: set[str] | None = None) -> str:
+    """Glossary block for refine prompts, limited to ``only`` when given."""
     sections: list[str] = []
     for section_name, entries in GLOSSARY.items():
         cleaned = [entry.strip() for entry in entries if entry and entry.strip()]
+        if only is not None:
+            cleaned = [entry for entry in dict.fromkeys(cleaned) if entry in only]
         if not cleaned:
             continue
         title = section_name.replace("_", " ").title()
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import os
-from typing import Any
+import threading
+from pathlib import Path
+from typing import Any, Callable
 
 from .codex_cli_wrapper import ask_codex, check_codex_authentication, is_codex_installed, run_codex_login
+from .config import default_config
 
 LLM_PROVIDER_CODEX_CLI = "codex_cli"
 LLM_PROVIDER_OPENAI_API = "openai_api"
@@ -13,6 +16,10 @@ SUPPORTED_PROVIDERS = {
     LLM_PROVIDER_OPENAI_API,
     LLM_PROVIDER_AZURE_OPENAI,
 }
+CODEX_CACHE_FILE_NAME = "codex_cli_cache.json"
+
+_OPENAI_CLIENTS: dict[tuple[str, str | None], Any] = {}
+_OPENAI_CLIENTS_LOCK = threading.Lock()
 
 
 def _selected_provider() -> str:
@@ -20,27 +27,79 @@ def _selected_provider() -> str:
     return provider if provider in SUPPORTED_PROVIDERS else LLM_PROVIDER_CODEX_CLI
 
 
+def _openai_model() -> str:
+    return (os.getenv("WHISPER_CLIP_OPENAI_MODEL", "gpt-4o-mini") or "").strip() or "gpt-4o-mini"
+
+
+def provider_identity(provider: str | None = None) -> tuple[str, str]:
+    """Return ``(provider, model)`` identifying who would answer ``query_llm``."""
+    provider = provider or _selected_provider()
+    if provider == LLM_PROVIDER_OPENAI_API:
+        return provider, _openai_model()
+    if provider == LLM_PROVIDER_CODEX_CLI:
+        return provider, (os.getenv("CODEX_CMD", "codex") or "codex").strip()
+    return provider, ""
+
+
+def _codex_cache_path() -> Path:
+    return default_config().state_dir / CODEX_CACHE_FILE_NAME
+
+
 def _query_with_codex_cli(user_query: str) -> str:
-    response = ask_codex(user_query=user_query)
+    response = ask_codex(user_query=user_query, cache_path=_codex_cache_path())
     return (response or "").strip()
 
 
-def _query_with_openai_api(user_query: str) -> str:
+def _openai_client(api_key: str, base_url: str | None):
+    """Return the process-wide client for these credentials.
+
+    The SDK keeps an HTTP connection pool per client, so reusing it lets
+    consecutive refines skip TCP/TLS setup (the daemon keeps it warm).
+    """
+    key = (api_key, base_url)
+    with _OPENAI_CLIENTS_LOCK:
+        client = _OPENAI_CLIENTS.get(key)
+        if client is None:
+            try:
+                from openai import OpenAI
+            except Exception as exc:  # pragma: no cover - import guard
+                raise RuntimeError("The 'openai' package is not installed. Add it to requirements.txt.") from exc
+
+            client = OpenAI(api_key=api_key, base_url=base_url, max_retries=1)
+            _OPENAI_CLIENTS[key] = client
+        return client
+
+
+def _query_with_openai_api(user_query: str, on_delta: Callable[[str], None] | None = None) -> str:
     api_key = (os.getenv("WHISPER_CLIP_OPENAI_API_KEY", "") or "").strip()
     if not api_key:
         raise RuntimeError(
             "OpenAI API key is missing. Use 'Set API Credentials' in the app menu first."
         )
 
-    model = (os.getenv("WHISPER_CLIP_OPENAI_MODEL", "gpt-4o-mini") or "").strip() or "gpt-4o-mini"
-    try:
-        from openai import OpenAI
-    except Exception as exc:  # pragma: no cover - import guard
-        raise RuntimeError("The 'openai' package is not installed. Add it to requirements.txt.") from exc
-
-    client = OpenAI(api_key=api_key)
-    response = client.responses.create(model=model, input=user_query)
-    text = (getattr(response, "output_text", "") or "").strip()
+    model = _openai_model()
+    base_url = (os.getenv("WHISPER_CLIP_OPENAI_BASE_URL", "") or "").strip() or None
+    client = _openai_client(api_key, base_url)
+
+    # Always stream: total latency is the same, and the caller gets the
+    # first tokens (and time-to-first-token) as soon as they arrive.
+    chunks: list[str] = []
+    final_text = ""
+    stream = client.responses.create(model=model, input=user_query, stream=True)
+    for event in stream:
+        event_type = getattr(event, "type", "")
+        if event_type == "response.output_text.delta":
+            delta = getattr(event, "delta", "") or ""
+            if delta:
+                chunks.append(delta)
+                if on_delta is not None:
+                    on_delta(delta)
+        elif event_type == "response.completed":
+            final_text = getattr(getattr(event, "response", None), "output_text", "") or ""
+        elif event_type in {"response.failed", "error"}:
+            raise RuntimeError(f"OpenAI streaming request failed: {event}")
+
+    text = (final_text or "".join(chunks)).strip()
     if text:
         return text
 
@@ -53,7 +112,7 @@ def _query_with_azure_openai(user_query: str) -> str:
     )
 
 
-def codex_status() -> dict[str, Any]:
+def codex_status(refresh: bool = False) -> dict[str, Any]:
     installed = is_codex_installed()
     if not installed:
         return {
@@ -62,7 +121,7 @@ def codex_status() -> dict[str, Any]:
             "message": "Codex CLI not installed. Install it first: brew install codex",
         }
 
-    authenticated, detail = check_codex_authentication()
+    authenticated, detail = check_codex_authentication(cache_path=_codex_cache_path(), force=refresh)
     if authenticated:
         return {
             "installed": True,
@@ -89,7 +148,7 @@ def activate_codex() -> dict[str, Any]:
             "message": "Codex CLI not installed. Install it first: brew install codex",
         }
 
-    login = run_codex_login()
+    login = run_codex_login(cache_path=_codex_cache_path())
     if not login["ok"]:
         return {
             "installed": is_codex_installed(),
@@ -97,28 +156,42 @@ def activate_codex() -> dict[str, Any]:
             "message": f"Codex login failed. {login['message']}",
         }
 
-    updated = codex_status()
+    updated = codex_status(refresh=True)
     if updated["authenticated"]:
         return updated
 
     return {
         "installed": updated["installed"],
         "authenticated": updated["authenticated"],
-        "message": "Codex login command finished, but activation is still pending. Please complete login and try again.",
+        "message": (
+            "Codex login command finished, but activation is still pending. Please complete login and try again."
+        ),
     }
 
 
-def query_llm(user_query: str) -> str:
-    """Route smart refine requests to the selected LLM backend."""
+def query_llm(
+    user_query: str,
+    on_delta: Callable[[str], None] | None = None,
+    provider: str | None = None,
+) -> str:
+    """Route smart refine requests to ``provider`` (default: the selected one).
+
+    ``on_delta`` receives partial output as it streams in. Providers that
+    cannot stream deliver the whole response as a single delta.
+    """
     if not user_query.strip():
         return ""
 
-    provider = _selected_provider()
-    if provider == LLM_PROVIDER_CODEX_CLI:
-        return _query_with_codex_cli(user_query)
+    provider = provider or _selected_provider()
     if provider == LLM_PROVIDER_OPENAI_API:
-        return _query_with_openai_api(user_query)
-    if provider == LLM_PROVIDER_AZURE_OPENAI:
-        return _query_with_azure_openai(user_query)
-
-    raise RuntimeError(f"Unsupported LLM provider: {provider}")
+        return _query_with_openai_api(user_query, on_delta=on_delta)
+    if provider == LLM_PROVIDER_CODEX_CLI:
+        response = _query_with_codex_cli(user_query)
+    elif provider == LLM_PROVIDER_AZURE_OPENAI:
+        response = _query_with_azure_openai(user_query)
+    else:
+        raise RuntimeError(f"Unsupported LLM provider: {provider}")
+
+    if response and on_delta is not None:
+        on_delta(response)
+    return response
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from .audio import WHISPER_SAMPLE_RATE
+
+FRAME_SEC = 0.03
+# Keep a little context around speech so word onsets/endings survive trimming.
+PAD_SEC = 0.3
+# Less voiced audio than this is treated as an accidental hotkey press.
+MIN_SPEECH_SEC = 0.25
+# Frames must rise this far above the noise floor to count as speech.
+SPEECH_MARGIN_DB = 10.0
+# Anything quieter than this is silence regardless of the noise floor.
+ABSOLUTE_FLOOR_DBFS = -50.0
+
+
+def vad_enabled() -> bool:
+    return (os.getenv("WHISPER_CLIP_VAD", "1") or "").strip().lower() not in {"0", "false", "no"}
+
+
+def _frame_levels_db(samples, frame_len: int):
+    import numpy as np
+
+    frame_count = samples.size // frame_len
+    frames = samples[: frame_count * frame_len].reshape(frame_count, frame_len)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+
+def trim_silence(samples, sample_rate: int = WHISPER_SAMPLE_RATE) -> tuple[Any, dict[str, Any]]:
+    """Trim leading/trailing silence from a mono float32 clip.
+
+    Returns ``(trimmed_samples, info)``. ``info["speech"]`` is False when the
+    clip contains no speech at all, in which case inference should be skipped.
+    """
+    import numpy as np
+
+    original_ms = int(samples.size * 1000 / sample_rate)
+    frame_len = max(1, int(sample_rate * FRAME_SEC))
+    levels = _frame_levels_db(samples, frame_len)
+    if levels.size == 0:
+        return samples[:0], {"speech": False, "original_ms": original_ms, "speech_ms": 0, "trimmed_ms": original_ms}
+
+    floor, median, loud = np.percentile(levels, [10, 50, 90])
+    if loud - floor < SPEECH_MARGIN_DB:
+        # Flat level: either the whole clip is speech or all of it is silence.
+        voiced = levels > ABSOLUTE_FLOOR_DBFS if median > ABSOLUTE_FLOOR_DBFS else np.zeros_like(levels, dtype=bool)
+    else:
+        voiced = levels > max(floor + SPEECH_MARGIN_DB, ABSOLUTE_FLOOR_DBFS)
+
+    speech_ms = int(np.count_nonzero(voiced) * frame_len * 1000 / sample_rate)
+    if speech_ms < MIN_SPEECH_SEC * 1000:
+        info = {"speech": False, "original_ms": original_ms, "speech_ms": speech_ms, "trimmed_ms": original_ms}
+        return samples[:0], info
+
+    voiced_idx = np.flatnonzero(voiced)
+    pad = int(PAD_SEC * sample_rate)
+    start = max(0, int(voiced_idx[0]) * frame_len - pad)
+    end = min(samples.size, (int(voiced_idx[-1]) + 1) * frame_len + pad)
+    trimmed = samples[start:end]
+    return trimmed, {
+        "speech": True,
+        "original_ms": original_ms,
+        "speech_ms": speech_ms,
+        "trimmed_ms": original_ms - int(trimmed.size * 1000 / sample_rate),
+    }
@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+# The backend runs as ``PYTHONPATH=backend python -m stt_backend``; mirror that.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
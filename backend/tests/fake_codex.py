@@ -0,0 +1,55 @@
+"""Stand-in for the Codex CLI, driven by environment variables.
+
+``FAKE_CODEX_LOG``: file each invocation's argv is appended to (one JSON line).
+``FAKE_CODEX_EXEC``: ``ok`` (default), ``argv_only`` (the stdin form fails) or
+``hang`` (sleeps past any test timeout).
+``FAKE_CODEX_LOGIN``: ``ok`` (default), ``logged_out``, ``unsupported`` or ``hang``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+
+HANG_SEC = 30
+
+
+def main(argv: list[str]) -> int:
+    with open(os.environ["FAKE_CODEX_LOG"], "a", encoding="utf-8") as log:
+        log.write(json.dumps(argv) + "\n")
+
+    if argv[:2] == ["login", "status"]:
+        mode = os.getenv("FAKE_CODEX_LOGIN", "ok")
+        if mode == "hang":
+            time.sleep(HANG_SEC)
+        if mode == "unsupported":
+            print("error: unrecognized subcommand 'status'", file=sys.stderr)
+            return 2
+        if mode == "logged_out":
+            print("Not logged in")
+            return 1
+        print("Logged in using ChatGPT")
+        return 0
+
+    if argv[:1] == ["exec"]:
+        mode = os.getenv("FAKE_CODEX_EXEC", "ok")
+        if mode == "hang":
+            time.sleep(HANG_SEC)
+        prompt = argv[-1]
+        if prompt == "-":
+            if mode == "argv_only":
+                print("error: reading the prompt from stdin is not supported", file=sys.stderr)
+                return 2
+            prompt = sys.stdin.read()
+        output_path = argv[argv.index("--output-last-message") + 1]
+        with open(output_path, "w", encoding="utf-8") as output:
+            output.write("ready" if "ready" in prompt else "Refined draft.")
+        return 0
+
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
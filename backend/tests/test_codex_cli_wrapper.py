@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+import os
+import shlex
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from stt_backend import codex_cli_wrapper
+
+FAKE_CODEX = Path(__file__).with_name("fake_codex.py")
+
+
+@pytest.fixture
+def fake_codex(monkeypatch, tmp_path):
+    log_path = tmp_path / "invocations.jsonl"
+    monkeypatch.setenv("CODEX_CMD", f"{shlex.quote(sys.executable)} {shlex.quote(str(FAKE_CODEX))}")
+    monkeypatch.setenv("FAKE_CODEX_LOG", str(log_path))
+    monkeypatch.delenv("WHISPER_CLIP_CODEX_AUTH_TTL_SEC", raising=False)
+
+    def invocations() -> list[list[str]]:
+        if not log_path.exists():
+            return []
+        return [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+
+    return invocations
+
+
+def _cache(tmp_path: Path) -> dict:
+    return json.loads((tmp_path / "codex_cli_cache.json").read_text(encoding="utf-8"))
+
+
+def test_positive_auth_check_is_cached_until_ttl(fake_codex, monkeypatch, tmp_path):
+    cache_path = tmp_path / "codex_cli_cache.json"
+
+    assert codex_cli_wrapper.check_codex_authentication(cache_path=cache_path) == (True, "Codex is active.")
+    assert codex_cli_wrapper.check_codex_authentication(cache_path=cache_path)[0] is True
+    assert fake_codex() == [["login", "status"]]
+
+    monkeypatch.setenv("WHISPER_CLIP_CODEX_AUTH_TTL_SEC", "0")
+    assert codex_cli_wrapper.check_codex_authentication(cache_path=cache_path)[0] is True
+    assert fake_codex() == [["login", "status"], ["login", "status"]]
+
+
+def test_negative_auth_check_is_not_cached(fake_codex, monkeypatch, tmp_path):
+    cache_path = tmp_path / "codex_cli_cache.json"
+    monkeypatch.setenv("FAKE_CODEX_LOGIN", "logged_out")
+
+    for _ in range(2):
+        assert codex_cli_wrapper.check_codex_authentication(cache_path=cache_path)[0] is False
+    assert len(fake_codex()) == 2
+    assert "auth_checked_at" not in _cache(tmp_path)
+
+
+def test_unsupported_status_probe_falls_back_to_a_prompt(fake_codex, monkeypatch, tmp_path):
+    monkeypatch.setenv("FAKE_CODEX_LOGIN", "unsupported")
+
+    assert codex_cli_wrapper.check_codex_authentication(cache_path=tmp_path / "codex_cli_cache.json")[0] is True
+    assert [argv[0] for argv in fake_codex()] == ["login", "exec"]
+
+
+def test_working_invocation_is_remembered(fake_codex, monkeypatch, tmp_path):
+    cache_path = tmp_path / "codex_cli_cache.json"
+    monkeypatch.setenv("FAKE_CODEX_EXEC", "argv_only")
+
+    assert codex_cli_wrapper.ask_codex("fix my draft", cache_path=cache_path) == "Refined draft."
+    first = fake_codex()
+    assert [argv[-1] == "-" for argv in first] == [True, False]
+    assert _cache(tmp_path)["invocation"] == codex_cli_wrapper.INVOCATION_ARGV
+
+    assert codex_cli_wrapper.ask_codex("fix my draft", cache_path=cache_path) == "Refined draft."
+    second = fake_codex()[len(first) :]
+    assert len(second) == 1 and second[0][-1] != "-"
+
+
+def test_timeout_is_not_retried_and_drops_cached_auth(fake_codex, monkeypatch, tmp_path):
+    cache_path = tmp_path / "codex_cli_cache.json"
+    codex_cli_wrapper._update_cache(cache_path, os.environ["CODEX_CMD"], auth_checked_at=time.time())
+    monkeypatch.setenv("FAKE_CODEX_EXEC", "hang")
+
+    with pytest.raises(RuntimeError, match="timed out"):
+        codex_cli_wrapper.ask_codex("fix my draft", timeout_seconds=1, cache_path=cache_path)
+    assert len(fake_codex()) == 1
+    assert "auth_checked_at" not in _cache(tmp_path)
+
+
+def test_status_probe_timeout_is_inconclusive(fake_codex, monkeypatch):
+    monkeypatch.setenv("FAKE_CODEX_LOGIN", "hang")
+
+    assert codex_cli_wrapper.probe_codex_login(timeout_seconds=1) is None
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+import logging
+import socket
+import threading
+
+from stt_backend.cli import _parse_args
+from stt_backend.daemon import EXIT_KEY, _handle_connection, _patched_env
+
+LOGGER = logging.getLogger("test_daemon")
+
+
+def _request(argv: list[str]) -> bytes:
+    return (json.dumps({"argv": argv, "env": {}, "cwd": None}) + "\n").encode("utf-8")
+
+
+def _handler(argv: list[str]) -> int:
+    # Streams more than a socket buffer holds, as a long stop or refine does.
+    for index in range(20000):
+        print(json.dumps({"event": "partial", "index": index, "text": "x" * 40}))
+    print(json.dumps({"status": "ok", "argv": argv}))
+    return 0
+
+
+def test_client_disconnecting_mid_request_does_not_raise():
+    server, client = socket.socketpair()
+    client.sendall(_request(["record", "--stop"]))
+    client.close()
+    _handle_connection(server, _handler, LOGGER)
+    assert server.fileno() == -1
+
+
+def test_next_request_is_served_after_a_disconnect():
+    server, client = socket.socketpair()
+    client.sendall(_request(["record", "--stop"]))
+    client.close()
+    _handle_connection(server, _handler, LOGGER)
+
+    server, client = socket.socketpair()
+    client.sendall(_request(["model", "--status"]))
+    client.shutdown(socket.SHUT_WR)
+    received: list[bytes] = []
+
+    # Socket buffers are small, so the client drains while the handler writes.
+    reader = threading.Thread(target=lambda: received.append(client.makefile("rb").read()))
+    reader.start()
+    _handle_connection(server, _handler, LOGGER)
+    reader.join(timeout=10)
+    lines = [json.loads(line) for line in received[0].decode("utf-8").splitlines()]
+    assert lines[-2] == {"status": "ok", "argv": ["model", "--status"]}
+    assert lines[-1] == {EXIT_KEY: 0}
+
+
+def test_forwarded_model_and_language_reach_the_parser(monkeypatch):
+    monkeypatch.delenv("WHISPER_MODEL", raising=False)
+    monkeypatch.delenv("WHISPER_LANGUAGE", raising=False)
+    args = _parse_args(["record", "--start"])
+    assert (args.model, args.language) == ("small", "auto")
+    with _patched_env({"WHISPER_MODEL": "tiny", "WHISPER_LANGUAGE": "de"}):
+        args = _parse_args(["record", "--start"])
+    assert (args.model, args.language) == ("tiny", "de")
+    assert _parse_args(["transcribe", "x.wav", "--model", "base"]).model == "base"
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import pytest
+
+from stt_backend.bench import BENCH_FORMAT_VERSION, compare_with_baseline
+from stt_backend.decode_presets import (
+    DEFAULT_DICTATION_PRESET,
+    PRESET_ACCURATE,
+    PRESET_BALANCED,
+    PRESET_INTERACTIVE,
+    dictation_preset,
+    save_recommendations,
+)
+
+
+def _entry(language: str, preset: str, model: str = "small") -> dict:
+    return {"engine": "openai-whisper", "model": model, "language": language, "recommended_preset": preset}
+
+
+def test_dictation_preset_follows_saved_recommendation(tmp_path, monkeypatch):
+    monkeypatch.delenv("WHISPER_CLIP_PRESET", raising=False)
+    assert dictation_preset(tmp_path, "small", "openai-whisper") == DEFAULT_DICTATION_PRESET
+
+    comparison = [
+        _entry("en", PRESET_INTERACTIVE),
+        _entry("auto", PRESET_BALANCED),
+        _entry("en", PRESET_ACCURATE, "tiny"),
+    ]
+    saved = save_recommendations(tmp_path, comparison)
+    # The slowest recommendation across languages wins.
+    assert saved == {"openai-whisper/small": PRESET_BALANCED, "openai-whisper/tiny": PRESET_ACCURATE}
+    assert dictation_preset(tmp_path, "small", "openai-whisper") == PRESET_BALANCED
+    assert dictation_preset(tmp_path, "small", "faster-whisper") == DEFAULT_DICTATION_PRESET
+
+    monkeypatch.setenv("WHISPER_CLIP_PRESET", PRESET_ACCURATE)
+    assert dictation_preset(tmp_path, "small", "openai-whisper") == PRESET_ACCURATE
+
+
+def test_baseline_of_another_format_is_refused():
+    report = {"format_version": BENCH_FORMAT_VERSION, "cold_load": {}, "inference": []}
+    assert compare_with_baseline(report, dict(report), 0.1) == []
+    with pytest.raises(ValueError, match="format_version"):
+        compare_with_baseline(report, {**report, "format_version": BENCH_FORMAT_VERSION - 1}, 0.1)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import dataclasses
+import os
+from pathlib import Path
+
+import pytest
+
+from stt_backend.bench import synthetic_fixture
+from stt_backend.config import default_config
+from stt_backend.engines import (
+    ENGINE_FASTER_WHISPER,
+    ENGINE_OPENAI_WHISPER,
+    ENGINES,
+    Engine,
+    check_conformance,
+    get_engine,
+)
+from stt_backend.transcriber import transcribe_audio
+
+# faster-whisper has no offline way to build a model, so it runs against one
+# already in the app's model directory (or a CTranslate2 model directory).
+CT2_MODEL_ENV = "WHISPER_CLIP_TEST_CT2_MODEL"
+
+
+def _tiny_whisper_checkpoint(model_dir: Path) -> str:
+    """A randomly initialized one-layer whisper checkpoint (tiny's vocabulary)."""
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+
+    dims = ModelDimensions(
+        n_mels=80,
+        n_audio_ctx=1500,
+        n_audio_state=64,
+        n_audio_head=2,
+        n_audio_layer=1,
+        n_vocab=51865,
+        n_text_ctx=448,
+        n_text_state=64,
+        n_text_head=2,
+        n_text_layer=1,
+    )
+    torch.manual_seed(0)
+    model = Whisper(dims)
+    # Allocated with torch.empty upstream (always overwritten by real checkpoints).
+    torch.nn.init.normal_(model.decoder.positional_embedding, std=0.01)
+    path = model_dir / "conformance.pt"
+    torch.save({"dims": dataclasses.asdict(dims), "model_state_dict": model.state_dict()}, str(path))
+    return str(path)
+
+
+@pytest.fixture(params=sorted(ENGINES))
+def engine_model(request, tmp_path):
+    name = request.param
+    try:
+        engine = get_engine(name)
+    except RuntimeError:
+        pytest.skip(f"{name} is not installed")
+    if name == ENGINE_OPENAI_WHISPER:
+        return engine, _tiny_whisper_checkpoint(tmp_path), tmp_path
+    if name == ENGINE_FASTER_WHISPER:
+        model, model_dir = os.getenv(CT2_MODEL_ENV, "tiny"), default_config().model_dir
+        if not engine.is_available(model, model_dir):
+            pytest.skip(f"no local faster-whisper model; set {CT2_MODEL_ENV}")
+        return engine, model, model_dir
+    pytest.fail(f"no conformance model for engine {name!r}")
+
+
+@pytest.mark.parametrize("language", ["en", "auto"])
+def test_transcription_follows_the_engine_contract(engine_model, language):
+    engine, model_name, model_dir = engine_model
+    streamed: list[dict] = []
+
+    result = transcribe_audio(
+        synthetic_fixture(2.0),
+        model_name=model_name,
+        model_dir=model_dir,
+        language=language,
+        engine=engine.name,
+        preset="interactive",
+        on_segment=streamed.append,
+    )
+
+    assert check_conformance(result) == []
+    assert [segment["text"] for segment in streamed] == [segment["text"] for segment in result["segments"]]
+    if language == "auto":
+        assert 0.0 <= result["language_probability"] <= 1.0
+    else:
+        assert result["language"] == language
+    assert engine.checkpoint_fingerprint(model_name, model_dir) is not None
+
+
+def test_incomplete_engine_fails_at_instantiation():
+    class Incomplete(Engine):
+        name = "incomplete"
+
+        def is_available(self, model_name, model_dir):
+            return True
+
+    with pytest.raises(TypeError, match="abstract"):
+        Incomplete()
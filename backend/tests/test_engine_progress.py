@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+pytest.importorskip("whisper")
+
+from stt_backend.engines import OpenAIWhisperEngine  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+class _WindowModel:
+    """Stands in for a whisper model: three segments per window, in seconds."""
+
+    is_multilingual = False
+
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    def transcribe(self, audio, **kwargs):
+        length = len(audio) / SAMPLE_RATE
+        self.calls.append(
+            {
+                "length": length,
+                "prompt": kwargs.get("initial_prompt"),
+                "carry": kwargs.get("carry_initial_prompt"),
+            }
+        )
+        window = len(self.calls)
+        bounds = [0.0, length / 3, 2 * length / 3, length]
+        segments = [
+            {"id": i, "seek": 0, "start": start, "end": end, "text": f" w{window}s{i}"}
+            for i, (start, end) in enumerate(zip(bounds, bounds[1:]))
+        ]
+        return {"text": "".join(s["text"] for s in segments), "language": "en", "segments": segments}
+
+
+def test_progress_segments_are_reported_per_window():
+    model = _WindowModel()
+    seen: list[dict] = []
+    result = OpenAIWhisperEngine().transcribe(
+        model,
+        np.zeros(SAMPLE_RATE * 50, dtype=np.float32),
+        "en",
+        preset="interactive",
+        on_segment=seen.append,
+        initial_prompt="Kubernetes.",
+    )
+
+    # The first window's last segment (20-30 s) is decoded again with the next window.
+    assert [call["length"] for call in model.calls] == [30.0, 30.0]
+    assert [(round(s["start"], 1), round(s["end"], 1)) for s in seen] == [
+        (0.0, 10.0),
+        (10.0, 20.0),
+        (20.0, 30.0),
+        (30.0, 40.0),
+        (40.0, 50.0),
+    ]
+    assert [s["id"] for s in seen] == list(range(5))
+    assert result["segments"] == seen
+    # ``interactive`` does not condition on previous text, but the glossary
+    # prompt still primes every window.
+    assert [call["prompt"] for call in model.calls] == ["Kubernetes.", "Kubernetes."]
+    assert model.calls[1]["carry"] is True
+
+
+def test_progress_windows_condition_on_previous_text():
+    model = _WindowModel()
+    OpenAIWhisperEngine().transcribe(
+        model, np.zeros(SAMPLE_RATE * 50, dtype=np.float32), "en", preset="accurate", on_segment=lambda _s: None
+    )
+    assert model.calls[1]["prompt"] == "w1s0 w1s1"
+
+    model = _WindowModel()
+    OpenAIWhisperEngine().transcribe(
+        model,
+        np.zeros(SAMPLE_RATE * 50, dtype=np.float32),
+        "en",
+        preset="accurate",
+        on_segment=lambda _s: None,
+        initial_prompt="Kubernetes.",
+    )
+    # The glossary comes last, so a truncated prompt loses old text first.
+    assert model.calls[1]["prompt"] == "w1s0 w1s1 Kubernetes."
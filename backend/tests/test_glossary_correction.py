@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import pytest
+
+from stt_backend import glossary_correction, user_glossary
+from stt_backend.glossary_correction import correct_transcript
+
+GLOSSARY = {
+    "colleague_names": ["Alicia Zhang"],
+    "project_names": ["Codex", "Cloud", "Modal"],
+    "terms": ["Kubernetes", "PostgreSQL"],
+}
+ORDINARY = "Those codes run in the clouds, loud enough to win a medal."
+
+
+@pytest.fixture
+def glossary(tmp_path, monkeypatch):
+    words_file = tmp_path / "words"
+    words_file.write_text("\n".join(["code", "cloud", "loud", "medal", "win", "enough", "run"]) + "\n")
+    monkeypatch.setattr(user_glossary, "GLOSSARY", GLOSSARY)
+    monkeypatch.setenv("WHISPER_CLIP_WORDS_FILE", str(words_file))
+    glossary_correction._compile_patterns.cache_clear()
+    yield words_file
+    glossary_correction._compile_patterns.cache_clear()
+
+
+def test_correction_runs_unless_turned_off(glossary, monkeypatch):
+    monkeypatch.delenv("WHISPER_CLIP_GLOSSARY_CORRECT", raising=False)
+    assert correct_transcript("deploy it on kuber nettys")[0] == "deploy it on Kubernetes"
+    monkeypatch.setenv("WHISPER_CLIP_GLOSSARY_CORRECT", "0")
+    assert correct_transcript("deploy it on kuber nettys") == ("deploy it on kuber nettys", [])
+
+
+def test_near_misses_of_names_are_corrected(glossary):
+    text, corrections = correct_transcript("Ask Alisha Zhang to deploy it on kuber nettys with postgresql.")
+    assert text == "Ask Alicia Zhang to deploy it on Kubernetes with PostgreSQL."
+    assert [(c["from"], c["to"]) for c in corrections] == [
+        ("Alisha Zhang", "Alicia Zhang"),
+        ("kuber nettys", "Kubernetes"),
+        ("postgresql", "PostgreSQL"),
+    ]
+
+
+def test_ordinary_words_are_left_alone(glossary):
+    assert correct_transcript(ORDINARY) == (ORDINARY, [])
+    # Not even re-cased to a single-word entry.
+    assert correct_transcript("store it in the cloud") == ("store it in the cloud", [])
+
+
+def test_short_entries_need_a_near_exact_spelling(glossary, monkeypatch):
+    monkeypatch.setenv("WHISPER_CLIP_WORDS_FILE", str(glossary.with_name("missing")))
+    glossary_correction._compile_patterns.cache_clear()
+    assert correct_transcript(ORDINARY) == (ORDINARY, [])
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from stt_backend.language_prior import MIN_SAMPLES, dominant_language, record_language
+
+
+def test_prior_needs_enough_detected_runs(tmp_path):
+    for _ in range(MIN_SAMPLES - 1):
+        record_language(tmp_path, "en", 0.95, "detected")
+    assert dominant_language(tmp_path) is None
+
+    record_language(tmp_path, "en", 0.9, "redetected")
+    assert dominant_language(tmp_path) == "en"
+
+
+def test_prior_sourced_entries_do_not_reinforce_the_prior(tmp_path):
+    for _ in range(MIN_SAMPLES):
+        record_language(tmp_path, "de", 0.9, "detected")
+    # Entries written by older versions for decodes that only used the prior.
+    for _ in range(20):
+        record_language(tmp_path, "en", None, "prior")
+    assert dominant_language(tmp_path) == "de"
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import numpy as np
+
+from stt_backend import long_audio
+from stt_backend.long_audio import (
+    CHUNK_SEC,
+    CUT_SEARCH_SEC,
+    OVERLAP_SEC,
+    _drop_repeated_prefix,
+    long_audio_workers,
+    merge_chunk,
+    plan_chunks,
+)
+
+SAMPLE_RATE = 16000
+GIB = 1024**3
+
+
+def _noise_with_gaps(duration_sec: float, gaps_sec: list[float]) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    samples = (0.1 * rng.standard_normal(int(duration_sec * SAMPLE_RATE))).astype(np.float32)
+    for gap in gaps_sec:
+        samples[int(gap * SAMPLE_RATE) : int((gap + 0.2) * SAMPLE_RATE)] = 0.0
+    return samples
+
+
+def test_chunks_tile_the_clip_and_cut_in_silence():
+    samples = _noise_with_gaps(150.0, [57.0, 119.0])
+    chunks = plan_chunks(samples, SAMPLE_RATE)
+
+    assert chunks[0]["keep_start"] == 0
+    assert chunks[-1]["keep_end"] == samples.size
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert previous["keep_end"] == chunk["keep_start"]
+    cuts = [chunk["keep_start"] / SAMPLE_RATE for chunk in chunks[1:]]
+    assert len(cuts) == 2
+    assert 57.0 <= cuts[0] <= 57.2
+    assert 119.0 <= cuts[1] <= 119.2
+    for chunk in chunks:
+        assert chunk["start"] == max(0, chunk["keep_start"] - int(OVERLAP_SEC * SAMPLE_RATE))
+        assert chunk["end"] == min(samples.size, chunk["keep_end"] + int(OVERLAP_SEC * SAMPLE_RATE))
+
+
+def test_short_tail_stays_in_the_last_chunk():
+    samples = _noise_with_gaps(CHUNK_SEC + CUT_SEARCH_SEC - 1.0, [])
+    assert len(plan_chunks(samples, SAMPLE_RATE)) == 1
+
+
+def test_repeated_words_at_a_cut_are_dropped():
+    segment = {"start": 60.0, "end": 62.0, "text": " the quick brown fox jumps"}
+    assert _drop_repeated_prefix("He saw the quick", segment)["text"] == " brown fox jumps"
+    assert _drop_repeated_prefix("He saw the quick brown fox jumps.", segment) is None
+    # A single shared word is not treated as a repeat.
+    assert _drop_repeated_prefix("He saw the", segment) == segment
+
+
+def test_merge_keeps_segments_centred_in_the_keep_range():
+    rate = 10
+    first = {"start": 0, "end": 70, "keep_start": 0, "keep_end": 60}
+    second = {"start": 50, "end": 120, "keep_start": 60, "keep_end": 120}
+    merged: list[dict] = []
+    merge_chunk(
+        merged,
+        first,
+        {"segments": [{"start": 0.0, "end": 4.0, "text": " one two"}, {"start": 4.0, "end": 7.0, "text": " three"}]},
+        rate,
+    )
+    added = merge_chunk(
+        merged,
+        second,
+        {"segments": [{"start": 0.0, "end": 1.5, "text": " three"}, {"start": 1.5, "end": 7.0, "text": " four"}]},
+        rate,
+    )
+
+    # The second chunk's 5-6.5 s segment lies before the cut at 6 s and is
+    # the first chunk's; its 6.5-12 s segment is shifted and kept.
+    assert [(s["start"], s["end"], s["text"]) for s in merged] == [
+        (0.0, 4.0, " one two"),
+        (4.0, 7.0, " three"),
+        (6.5, 12.0, " four"),
+    ]
+    assert added == merged[2:]
+    assert [s["id"] for s in merged] == [0, 1, 2]
+
+
+def test_workers_are_capped_by_memory(monkeypatch):
+    monkeypatch.delenv("WHISPER_CLIP_LONG_AUDIO_WORKERS", raising=False)
+    monkeypatch.setattr(long_audio.os, "cpu_count", lambda: 16)
+    monkeypatch.setattr(long_audio, "_physical_memory_bytes", lambda: 8 * GIB)
+    assert long_audio_workers() == 4
+    assert long_audio_workers(int(0.5 * GIB)) == 3
+    # medium (1.5 GB checkpoint) leaves room for a single worker on 8 GB.
+    assert long_audio_workers(3 * GIB) == 1
+    monkeypatch.setenv("WHISPER_CLIP_LONG_AUDIO_WORKERS", "3")
+    assert long_audio_workers(3 * GIB) == 3
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from stt_backend.model_artifacts import _quantized_meta, quantize_model  # noqa: E402
+
+
+@pytest.fixture
+def no_quantized_engine(monkeypatch):
+    # Builds without a default engine report "none" until one is selected.
+    quantized = SimpleNamespace(engine="none", supported_engines=["onednn", "qnnpack"])
+    monkeypatch.setattr(torch.backends, "quantized", quantized)
+    return quantized
+
+
+def test_freshness_meta_matches_the_engine_used_to_quantize(tmp_path, no_quantized_engine):
+    source = tmp_path / "small.pt"
+    source.write_bytes(b"checkpoint")
+    # Checked before anything is quantized, as on a cold start.
+    meta = _quantized_meta(source)
+    assert meta["engine"] == "qnnpack"
+
+    quantize_model(torch.nn.Sequential(torch.nn.Linear(4, 4)))
+    assert _quantized_meta(source) == meta
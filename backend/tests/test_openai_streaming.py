@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("openai")
+
+from stt_backend import user_llm_bridge  # noqa: E402
+
+DELTAS = ["Refined ", "text ", "here."]
+
+
+class _ResponsesHandler(BaseHTTPRequestHandler):
+    """Stand-in for ``POST /v1/responses`` streaming server-sent events."""
+
+    protocol_version = "HTTP/1.1"
+    seen: list[tuple[str, int]] = []
+
+    def log_message(self, *_args) -> None:
+        pass
+
+    def _send_event(self, event: dict) -> None:
+        data = f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).seen.append((self.path, self.client_address[1]))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        response = {
+            "id": "resp_1",
+            "object": "response",
+            "created_at": 0,
+            "model": body["model"],
+            "output": [],
+            "status": "in_progress",
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+        }
+        self._send_event({"type": "response.created", "response": response, "sequence_number": 0})
+        for index, delta in enumerate(DELTAS, start=1):
+            time.sleep(0.01)
+            self._send_event(
+                {
+                    "type": "response.output_text.delta",
+                    "item_id": "msg_1",
+                    "output_index": 0,
+                    "content_index": 0,
+                    "delta": delta,
+                    "logprobs": [],
+                    "sequence_number": index,
+                }
+            )
+        message = {
+            "type": "message",
+            "id": "msg_1",
+            "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": "".join(DELTAS), "annotations": []}],
+        }
+        completed = {**response, "status": "completed", "output": [message]}
+        self._send_event({"type": "response.completed", "response": completed, "sequence_number": len(DELTAS) + 1})
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+@pytest.fixture
+def responses_server(monkeypatch):
+    _ResponsesHandler.seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ResponsesHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("WHISPER_CLIP_OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WHISPER_CLIP_OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setattr(user_llm_bridge, "_OPENAI_CLIENTS", {})
+    yield _ResponsesHandler
+    server.shutdown()
+    server.server_close()
+
+
+def test_streams_deltas_in_order_and_returns_final_text(responses_server):
+    deltas: list[str] = []
+
+    text = user_llm_bridge.query_llm(
+        "fix my draft", on_delta=deltas.append, provider=user_llm_bridge.LLM_PROVIDER_OPENAI_API
+    )
+
+    assert deltas == DELTAS
+    assert text == "Refined text here."
+    assert [path for path, _port in responses_server.seen] == ["/v1/responses"]
+
+
+def test_reuses_one_pooled_client_and_connection(responses_server):
+    for _ in range(2):
+        user_llm_bridge.query_llm("fix my draft", provider=user_llm_bridge.LLM_PROVIDER_OPENAI_API)
+
+    assert len(user_llm_bridge._OPENAI_CLIENTS) == 1
+    # Both requests came in over the same kept-alive client socket.
+    ports = {port for _path, port in responses_server.seen}
+    assert len(responses_server.seen) == 2 and len(ports) == 1
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+
+from stt_backend import smart_workflow
+from stt_backend.refine_cache import CACHE_FILE_NAME
+from stt_backend.user_llm_bridge import LLM_PROVIDER_CODEX_CLI, LLM_PROVIDER_OPENAI_API
+
+
+def _stub_llm(calls: list[str]):
+    def query_llm(user_query, on_delta=None, provider=None):
+        calls.append(provider)
+        if provider == LLM_PROVIDER_CODEX_CLI:
+            time.sleep(0.5)
+            return "Primary answer."
+        return "Hedge answer."
+
+    return query_llm
+
+
+def test_primary_answer_is_served_from_cache(monkeypatch, tmp_path):
+    calls: list[str] = []
+    monkeypatch.setenv("WHISPER_CLIP_LLM_PROVIDER", LLM_PROVIDER_CODEX_CLI)
+    monkeypatch.delenv("WHISPER_CLIP_LLM_HEDGE_PROVIDER", raising=False)
+    monkeypatch.setattr(smart_workflow, "query_llm", _stub_llm(calls))
+
+    first = smart_workflow.refine_transcript("draft", "email", True, state_dir=tmp_path)
+    second = smart_workflow.refine_transcript("draft", "email", True, state_dir=tmp_path)
+
+    assert first[0] == second[0] == "Primary answer."
+    assert second[2]["refine_cache"]["hit"] is True
+    assert calls == [LLM_PROVIDER_CODEX_CLI]
+
+
+def test_hedged_answer_is_not_cached_as_the_primary_provider(monkeypatch, tmp_path):
+    calls: list[str] = []
+    monkeypatch.setenv("WHISPER_CLIP_LLM_PROVIDER", LLM_PROVIDER_CODEX_CLI)
+    monkeypatch.setenv("WHISPER_CLIP_LLM_HEDGE_PROVIDER", LLM_PROVIDER_OPENAI_API)
+    monkeypatch.setenv("WHISPER_CLIP_LLM_HEDGE_DELAY_SEC", "0.01")
+    monkeypatch.setattr(smart_workflow, "query_llm", _stub_llm(calls))
+
+    text, refined, info = smart_workflow.refine_transcript("draft", "email", True, state_dir=tmp_path)
+    assert (text, refined, info["llm_provider"]) == ("Hedge answer.", True, LLM_PROVIDER_OPENAI_API)
+
+    with sqlite3.connect(str(tmp_path / CACHE_FILE_NAME)) as conn:
+        assert conn.execute("SELECT response, provider FROM entries").fetchall() == [
+            ("Hedge answer.", LLM_PROVIDER_OPENAI_API)
+        ]
+    # A lookup for the primary provider must not return the hedge's output.
+    monkeypatch.delenv("WHISPER_CLIP_LLM_HEDGE_PROVIDER")
+    again = smart_workflow.refine_transcript("draft", "email", True, state_dir=tmp_path)
+    assert again[0] == "Primary answer."
+    assert again[2]["refine_cache"]["hit"] is False
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from stt_backend.retention import apply_retention, list_recordings, run_retention
+
+DAY = 86400
+
+
+def _policy(**limits) -> dict:
+    return {"max_age_days": 0, "max_bytes": 0, "max_count": 0, "codec": "none", **limits}
+
+
+@pytest.fixture
+def recordings(tmp_path):
+    """Five one-second recordings captured a day apart, oldest first."""
+    sf = pytest.importorskip("soundfile")
+    now = time.time()
+    paths = []
+    for age_days in range(5, 0, -1):
+        path = tmp_path / f"recording_{age_days}.wav"
+        sf.write(str(path), np.zeros(16000, dtype=np.float32), 16000, subtype="PCM_16")
+        os.utime(path, (now - age_days * DAY, now - age_days * DAY))
+        paths.append(path)
+    return paths
+
+
+def test_count_limit_deletes_the_oldest(tmp_path, recordings):
+    summary = apply_retention(tmp_path, _policy(max_count=2))
+    assert summary["deleted"] == 3
+    assert list_recordings(tmp_path) == recordings[-2:]
+
+
+def test_age_limit_deletes_older_recordings(tmp_path, recordings):
+    summary = apply_retention(tmp_path, _policy(max_age_days=2.5))
+    assert summary["deleted"] == 3
+    assert list_recordings(tmp_path) == recordings[-2:]
+
+
+def test_kept_recordings_are_not_deleted(tmp_path, recordings):
+    apply_retention(tmp_path, _policy(max_count=1), keep={recordings[0]})
+    assert list_recordings(tmp_path) == [recordings[0], recordings[-1]]
+
+
+def test_latest_recordings_are_not_transcoded(tmp_path, recordings, monkeypatch):
+    monkeypatch.setenv("WHISPER_CLIP_RETENTION_CODEC", "flac")
+    summary = run_retention(tmp_path, keep=[recordings[1]])
+
+    assert summary["transcoded"] == 3
+    # The stop's ``audio_path`` and the newest recording keep their paths.
+    assert recordings[1].is_file()
+    assert recordings[-1].is_file()
+    assert sorted(path.suffix for path in list_recordings(tmp_path)) == [".flac"] * 3 + [".wav"] * 2
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import numpy as np
+
+from stt_backend.ring_buffer import AudioRingBuffer
+
+
+def _block(start: int, frames: int, channels: int = 1) -> np.ndarray:
+    values = np.arange(start, start + frames, dtype=np.float32)
+    return np.repeat(values[:, None], channels, axis=1)
+
+
+def test_frames_come_out_in_order_across_the_wrap():
+    ring = AudioRingBuffer(8, 2)
+    ring.push(_block(0, 6, 2))
+    assert np.array_equal(ring.pop(4), _block(0, 4, 2))
+    # Written at positions 6, 7, 0, 1, 2.
+    ring.push(_block(6, 5, 2))
+    assert ring.fill() == 7
+    assert np.array_equal(ring.pop(100), _block(4, 7, 2))
+    assert ring.pop(4).shape == (0, 2)
+    assert (ring.overflows, ring.dropped_frames, ring.high_water_frames) == (0, 0, 7)
+
+
+def test_frames_that_do_not_fit_are_dropped_and_counted():
+    ring = AudioRingBuffer(8, 1)
+    ring.push(_block(0, 5))
+    ring.push(_block(5, 5))
+    ring.push(_block(10, 2))
+
+    assert ring.overflows == 2
+    assert ring.dropped_frames == 2 + 2
+    assert ring.high_water_frames == 8
+    # The frames already queued are kept; the newest are the ones lost.
+    assert np.array_equal(ring.pop(8), _block(0, 8))
+
+    ring.push(_block(20, 3))
+    assert np.array_equal(ring.pop(8), _block(20, 3))
+    assert ring.overflows == 2
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from stt_backend import streaming
+from stt_backend.streaming import (
+    MAX_WINDOW_SEC,
+    MIN_WINDOW_SEC,
+    PauseSegmenter,
+    StreamingTranscriber,
+    finish_streaming_transcription,
+    load_committed_windows,
+    segments_path,
+)
+
+SAMPLE_RATE = 16000
+BLOCK = SAMPLE_RATE // 10
+
+
+def _speech(blocks: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(blocks)
+    return [(0.2 * rng.standard_normal(BLOCK)).astype(np.float32) for _ in range(blocks)]
+
+
+def _pause(blocks: int) -> list[np.ndarray]:
+    return [np.zeros(BLOCK, dtype=np.float32) for _ in range(blocks)]
+
+
+def _feed(segmenter: PauseSegmenter, blocks: list[np.ndarray]) -> list[tuple[int, int]]:
+    return [window for block in blocks for window in segmenter.feed(block)]
+
+
+def test_window_is_cut_inside_the_first_pause_after_the_minimum():
+    segmenter = PauseSegmenter(SAMPLE_RATE)
+    # A pause before MIN_WINDOW_SEC does not end the window.
+    assert _feed(segmenter, _speech(30) + _pause(10) + _speech(50)) == []
+    windows = _feed(segmenter, _pause(10))
+
+    assert len(windows) == 1
+    start, end = windows[0]
+    assert start == 0
+    # Cut in the middle of the trailing 0.6 s of silence.
+    assert 9.0 * SAMPLE_RATE < end <= 9.7 * SAMPLE_RATE
+    assert segmenter.window_start == end
+    # The next window only starts counting from the cut.
+    assert _feed(segmenter, _speech(10) + _pause(10)) == []
+
+
+def test_window_without_a_pause_is_forced_before_whisper_context():
+    segmenter = PauseSegmenter(SAMPLE_RATE)
+    blocks = _speech(int(MAX_WINDOW_SEC * 10) + 5)
+    blocks[200] = np.zeros(BLOCK, dtype=np.float32)
+    windows = _feed(segmenter, blocks)
+
+    assert windows == [(0, 201 * BLOCK)]
+    assert windows[0][1] >= MIN_WINDOW_SEC * SAMPLE_RATE
+
+
+@pytest.fixture
+def fake_decoder(monkeypatch):
+    calls: list[dict] = []
+
+    def transcribe_audio(audio, model_name, model_dir, language, preset=None, on_segment=None, initial_prompt=None):
+        calls.append({"samples": len(audio), "language": language})
+        if on_segment is not None:
+            on_segment({"id": 0, "start": 0.0, "end": len(audio) / SAMPLE_RATE, "text": f" part{len(calls)}"})
+        return {
+            "text": f"part{len(calls)}",
+            "language": "de" if language == "auto" else language,
+            "latency_ms": 5,
+            "model_downloaded": False,
+        }
+
+    monkeypatch.setattr(streaming, "transcribe_audio", transcribe_audio)
+    monkeypatch.setattr(streaming, "glossary_prompt", lambda: None)
+    return calls
+
+
+def test_finished_windows_are_committed_in_order(tmp_path, fake_decoder):
+    audio_path = tmp_path / "recording_1.wav"
+    streamer = StreamingTranscriber(audio_path, SAMPLE_RATE, "small", tmp_path, "auto")
+    streamer.start()
+    for block in _speech(90) + _pause(10) + _speech(90) + _pause(10) + _speech(5):
+        streamer.feed(block[:, None])
+    streamer.close()
+    streamer._thread.join(timeout=10)
+
+    windows = load_committed_windows(audio_path)
+    assert [window["text"] for window in windows] == ["part1", "part2"]
+    assert windows[0]["start"] == 0
+    assert windows[1]["start"] == windows[0]["end"]
+    assert [call["samples"] for call in fake_decoder] == [window["end"] - window["start"] for window in windows]
+    # The first window's language is pinned for the rest of the session.
+    assert [call["language"] for call in fake_decoder] == ["auto", "de"]
+
+
+def test_committed_run_stops_at_a_gap_or_a_torn_line(tmp_path):
+    audio_path = tmp_path / "recording_1.wav"
+    records = [{"start": 0, "end": 100, "text": "a"}, {"start": 100, "end": 200, "text": "b"}]
+    lines = [json.dumps(record) for record in records]
+    segments_path(audio_path).write_text("\n".join(lines + ['{"start": 200, "en']) + "\n")
+    assert load_committed_windows(audio_path) == records
+
+    gap = [*records, {"start": 250, "end": 300, "text": "c"}]
+    segments_path(audio_path).write_text("\n".join(json.dumps(record) for record in gap) + "\n")
+    assert load_committed_windows(audio_path) == records
+
+
+def test_stop_decodes_only_the_uncommitted_tail(tmp_path, fake_decoder, monkeypatch):
+    sf = pytest.importorskip("soundfile")
+    monkeypatch.setenv("WHISPER_CLIP_VAD", "0")
+    audio_path = tmp_path / "recording_1.wav"
+    sf.write(str(audio_path), np.concatenate(_speech(120)), SAMPLE_RATE)
+    committed = {"start": 0, "end": 9 * SAMPLE_RATE, "text": "Hello there.", "language": "en"}
+    segments_path(audio_path).write_text(json.dumps(committed) + "\n")
+    seen: list[dict] = []
+
+    result = finish_streaming_transcription(audio_path, "small", tmp_path, "auto", on_segment=seen.append)
+
+    assert fake_decoder == [{"samples": 3 * SAMPLE_RATE, "language": "en"}]
+    assert result["text"] == "Hello there. part1"
+    assert (result["streamed_windows"], result["tail_sec"]) == (1, 3.0)
+    assert [(s["id"], s["start"], s["end"]) for s in seen] == [(0, 0.0, 9.0), (1, 9.0, 12.0)]
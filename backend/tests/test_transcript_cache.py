@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from stt_backend import transcriber
+from stt_backend.engines import Engine
+from stt_backend.transcriber import transcribe_audio
+from stt_backend.transcript_cache import audio_cache_key
+
+SAMPLE_RATE = 16000
+CHECKPOINT = {"path": "/models/small.pt", "source_size": 1, "source_mtime_ns": 1}
+
+
+class _CountingEngine(Engine):
+    name = "counting"
+
+    def __init__(self) -> None:
+        self.loads = 0
+        self.transcribes = 0
+
+    def is_available(self, model_name, model_dir):
+        return True
+
+    def download(self, model_name, model_dir):
+        raise AssertionError("nothing to download")
+
+    def load(self, model_name, model_dir):
+        self.loads += 1
+        return object()
+
+    def checkpoint_fingerprint(self, model_name, model_dir):
+        return CHECKPOINT
+
+    def detect_language(self, model, audio):
+        return "en", 1.0
+
+    def transcribe(self, model, audio, language, preset=None, on_segment=None, initial_prompt=None):
+        self.transcribes += 1
+        segments = [{"id": 0, "start": 0.0, "end": len(audio) / SAMPLE_RATE, "text": " Hello there."}]
+        for segment in segments:
+            if on_segment is not None:
+                on_segment(segment)
+        return {"text": "Hello there.", "language": "en", "segments": segments, "language_probability": None}
+
+
+def _audio(seed: int = 0) -> np.ndarray:
+    return (0.1 * np.random.default_rng(seed).standard_normal(SAMPLE_RATE)).astype(np.float32)
+
+
+def test_key_covers_audio_model_options_and_checkpoint():
+    options = {"engine": "openai-whisper", "language": "en", "beam_size": 5}
+    key = audio_cache_key(_audio(), "small", options, CHECKPOINT)
+
+    assert audio_cache_key(_audio().astype(np.float64), "small", dict(reversed(options.items())), CHECKPOINT) == key
+    assert audio_cache_key(_audio(1), "small", options, CHECKPOINT) != key
+    assert audio_cache_key(_audio(), "base", options, CHECKPOINT) != key
+    assert audio_cache_key(_audio(), "small", {**options, "language": "de"}, CHECKPOINT) != key
+    assert audio_cache_key(_audio(), "small", options, {**CHECKPOINT, "source_mtime_ns": 2}) != key
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    runtime = _CountingEngine()
+    monkeypatch.setattr(transcriber, "get_engine", lambda name=None: runtime)
+    monkeypatch.setattr(transcriber, "_MODEL_CACHE", {})
+    monkeypatch.delenv("WHISPER_CLIP_TRANSCRIPT_CACHE", raising=False)
+    return runtime
+
+
+def test_repeated_audio_is_served_from_the_cache(tmp_path, engine):
+    first = transcribe_audio(_audio(), "small", tmp_path, "en", cache_dir=tmp_path, preset="balanced")
+    replayed: list[dict] = []
+    second = transcribe_audio(
+        _audio(), "small", tmp_path, "en", cache_dir=tmp_path, preset="balanced", on_segment=replayed.append
+    )
+
+    assert (first["cache_hit"], second["cache_hit"]) == (False, True)
+    assert (engine.loads, engine.transcribes) == (1, 1)
+    assert second["text"] == first["text"]
+    assert second["segments"] == replayed == first["segments"]
+
+    # Another preset decodes differently, so it is a miss.
+    third = transcribe_audio(_audio(), "small", tmp_path, "en", cache_dir=tmp_path, preset="accurate")
+    assert third["cache_hit"] is False
+    assert engine.transcribes == 2
+
+
+def test_cache_can_be_turned_off(tmp_path, engine, monkeypatch):
+    monkeypatch.setenv("WHISPER_CLIP_TRANSCRIPT_CACHE", "0")
+    for _ in range(2):
+        assert "cache_hit" not in transcribe_audio(_audio(), "small", tmp_path, "en", cache_dir=tmp_path)
+    assert engine.transcribes == 2
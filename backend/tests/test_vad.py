@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import numpy as np
+
+from stt_backend.vad import PAD_SEC, trim_silence
+
+SAMPLE_RATE = 16000
+
+
+def _tone(duration_sec: float, amplitude: float = 0.3) -> np.ndarray:
+    t = np.arange(int(duration_sec * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _silence(duration_sec: float) -> np.ndarray:
+    noise = np.random.default_rng(0).standard_normal(int(duration_sec * SAMPLE_RATE))
+    return (1e-4 * noise).astype(np.float32)
+
+
+def test_leading_and_trailing_silence_is_trimmed_with_padding():
+    samples = np.concatenate([_silence(2.0), _tone(1.0), _silence(3.0)])
+    trimmed, info = trim_silence(samples, SAMPLE_RATE)
+
+    assert info["speech"] is True
+    assert info["original_ms"] == 6000
+    assert abs(info["speech_ms"] - 1000) <= 30
+    # One second of speech plus PAD_SEC of context on each side survives.
+    assert abs(trimmed.size / SAMPLE_RATE - (1.0 + 2 * PAD_SEC)) <= 0.05
+    assert info["trimmed_ms"] == 6000 - int(trimmed.size * 1000 / SAMPLE_RATE)
+    assert np.abs(trimmed).max() > 0.2
+
+
+def test_silence_and_short_blips_are_not_speech():
+    for samples in (_silence(3.0), np.concatenate([_silence(2.0), _tone(0.1), _silence(2.0)])):
+        trimmed, info = trim_silence(samples, SAMPLE_RATE)
+        assert info["speech"] is False
+        assert trimmed.size == 0
+        assert info["trimmed_ms"] == info["original_ms"]
+
+
+def test_clip_that_is_all_speech_is_kept_whole():
+    samples = _tone(2.0)
+    trimmed, info = trim_silence(samples, SAMPLE_RATE)
+    assert info["speech"] is True
+    assert trimmed.size == samples.size
+    assert info["trimmed_ms"] == 0
+
+
+def test_empty_clip_has_no_speech():
+    trimmed, info = trim_silence(np.zeros(0, dtype=np.float32), SAMPLE_RATE)
+    assert info == {"speech": False, "original_ms": 0, "speech_ms": 0, "trimmed_ms": 0}
+    assert trimmed.size == 0
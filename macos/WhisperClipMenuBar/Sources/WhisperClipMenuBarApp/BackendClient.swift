@@ -75,6 +75,9 @@ final class BackendClient {
             "WHISPER_CLIP_OPENAI_API_KEY": openAIApiKey,
             "WHISPER_CLIP_OPENAI_MODEL": openAIModel,
         ])
+        if (payload["status"] as? String) == "no_speech" {
+            throw BackendError.commandFailed("No speech detected")
+        }
         if (payload["status"] as? String) != "ok" {
             throw BackendError.commandFailed(payload["error"] as? String ?? "record stop failed")
         }
@@ -7,4 +7,15 @@ cd "$ROOT_DIR/macos/WhisperClipMenuBar"
 export WHISPER_CLIP_REPO_ROOT="$ROOT_DIR"
 export WHISPER_CLIP_PYTHON="${WHISPER_CLIP_PYTHON:-$ROOT_DIR/.venv/bin/python3}"
 
+# Keep Whisper models warm between hotkey presses; CLI calls fall back to
+# in-process execution if the daemon is not running.
+if [[ "${WHISPER_CLIP_NO_DAEMON:-}" != "1" ]]; then
+  # Same state dir the app passes to every call (BackendClient.stateDir), so
+  # the standby capture worker started here is the one record --start claims.
+  APP_STATE_DIR="$HOME/Library/Application Support/WhisperClipMac/state"
+  PYTHONPATH="$ROOT_DIR/backend" "$WHISPER_CLIP_PYTHON" -m stt_backend serve --state-dir "$APP_STATE_DIR" &
+  DAEMON_PID=$!
+  trap 'kill "$DAEMON_PID" 2>/dev/null || true' EXIT
+fi
+
 swift run